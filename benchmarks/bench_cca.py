@@ -0,0 +1,80 @@
+import argparse
+import time
+import numpy as np
+from sklearn.cross_decomposition import CCA
+import src.processing.cca as cca
+
+
+# Compares the closed-form CCA engine
+# with the former per-frequency sklearn CCA fit
+# On-line BASIL SSVEP BCI
+
+
+# Synthetic SSVEP trial (channels x samples)
+# and sin/cos references (targets x 2 * harmonics x samples)
+def make_data(n_channels, s_rate, length, frequencies, n_harmonics=2, seed=0):
+    rng = np.random.RandomState(seed)
+    t = np.arange(int(length * s_rate)) / s_rate
+    eeg_data = rng.randn(n_channels, t.size)
+    eeg_data += 0.3 * np.sin(2 * np.pi * frequencies[0] * t)
+
+    references = []
+    for freq in frequencies:
+        reference = []
+        for harmonic in range(1, n_harmonics + 1):
+            reference.append(np.sin(2 * np.pi * harmonic * freq * t))
+            reference.append(np.cos(2 * np.pi * harmonic * freq * t))
+        references.append(reference)
+    return eeg_data, np.array(references)
+
+
+# The former EEGProcessor.find_corr implementation
+def sklearn_corr(eeg_data, references, n_components):
+    model = CCA(n_components)
+    result = np.zeros(references.shape[0])
+    corr = np.zeros(n_components)
+    for i in range(0, references.shape[0]):
+        model.fit(eeg_data.T, references[i].T)
+        x_scores, y_scores = model.transform(eeg_data.T, references[i].T)
+        for j in range(0, n_components):
+            corr[j] = np.corrcoef(x_scores[:, j], y_scores[:, j])[0, 1]
+        result[i] = np.max(corr)
+    return result
+
+
+def closed_form_corr(eeg_data, references, n_components):
+    return np.max(cca.cca(eeg_data, references, n_components), axis=1)
+
+
+# Median run time [ms] of a function
+def timeit(function, repeats, *args):
+    times = []
+    for i in range(0, repeats):
+        start = time.perf_counter()
+        result = function(*args)
+        times.append(time.perf_counter() - start)
+    return 1000 * np.median(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='CCA engine benchmark')
+    parser.add_argument('--channels', type=int, nargs='+', default=[8, 32])
+    parser.add_argument('--s-rate', type=int, default=1000)
+    parser.add_argument('--lengths', type=float, nargs='+', default=[2, 5, 20])
+    parser.add_argument('--components', type=int, default=1)
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    frequencies = [10, 12, 15]
+    print('channels length[s]  sklearn[ms]  closed-form[ms]  speedup  max|diff|')
+    for n_channels in args.channels:
+        for length in args.lengths:
+            eeg_data, references = make_data(n_channels, args.s_rate, length, frequencies)
+            t_old, r_old = timeit(sklearn_corr, args.repeats, eeg_data, references, args.components)
+            t_new, r_new = timeit(closed_form_corr, args.repeats, eeg_data, references, args.components)
+            print('%8d %9.1f  %11.2f  %15.2f  %6.1fx  %9.2e' % (n_channels, length, t_old, t_new, t_old / t_new,
+                                                            np.max(np.abs(r_old - r_new))))
+
+
+if __name__ == '__main__':
+    main()
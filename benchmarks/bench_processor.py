@@ -0,0 +1,163 @@
+import argparse
+import itertools
+import json
+import platform
+import subprocess
+import time
+import tracemalloc
+import numpy as np
+import scipy
+import src.data.config as config
+from src.processing.eeg_process import EEGProcessor
+
+
+# Benchmark of EEGProcessor.process and its stages
+# with synthetic SSVEP data across channel counts, sampling rates,
+# window lengths and numbers of targets
+# Reports latency percentiles and peak memory as JSON so that
+# revisions can be compared (no Qt event loop or LSL needed).
+# On-line BASIL SSVEP BCI
+STAGES = ['process', 'calc_psd', 'evaluate_spectral', 'evaluate_spectral_diffs', 'evaluate_corr', 'evaluate_fbcca']
+
+
+# Target frequencies for n_targets targets
+# (the configured ones first, then further frequencies up to 25 Hz)
+def target_frequencies(n_targets):
+    extra = [f for f in np.arange(8, 25.5, 0.5) if f not in config.frequencies]
+    return (list(config.frequencies) + extra)[:n_targets]
+
+
+# Synthetic SSVEP trial (channels x samples): noise plus
+# the first target frequency and its second harmonic
+def make_trial(n_channels, s_rate, length, frequency, seed=0):
+    rng = np.random.RandomState(seed)
+    t = np.arange(int(length * s_rate)) / float(s_rate)
+    eeg_data = rng.randn(n_channels, t.size)
+    eeg_data += 0.2 * np.sin(2 * np.pi * frequency * t) + 0.1 * np.sin(4 * np.pi * frequency * t)
+    return eeg_data.astype(np.float32)
+
+
+# Functions running the individual stages on one trial
+def make_stages(processor, eeg_data, s_rate):
+    processor.s_rate = s_rate
+    rows = np.vstack((eeg_data, np.mean(eeg_data, axis=0)))
+    freqs, ps = processor.calc_psd(rows)
+
+    def reset():
+        processor.predicted_classes = []
+        processor.predicted_classes_weights = []
+
+    return {
+        'process': lambda: processor.process(eeg_data, s_rate),
+        'calc_psd': lambda: processor.calc_psd(rows),
+        'evaluate_spectral': lambda: (reset(), processor.evaluate_spectral(freqs, ps)),
+        'evaluate_spectral_diffs': lambda: (reset(), processor.evaluate_spectral_diffs(freqs, ps)),
+        'evaluate_corr': lambda: (reset(), processor.evaluate_corr(eeg_data)),
+        'evaluate_fbcca': lambda: (reset(), processor.evaluate_fbcca(eeg_data)),
+    }
+
+
+# Latencies [ms] of repeated runs (after one warm-up run)
+# and peak traced memory [kB] of a single run
+def measure(function, repeats):
+    function()
+    latencies = []
+    for i in range(0, repeats):
+        start = time.perf_counter()
+        function()
+        latencies.append(1000 * (time.perf_counter() - start))
+
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return np.array(latencies), peak / 1024.0
+
+
+def revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    processor = EEGProcessor()
+    original_frequencies = config.frequencies
+    results = []
+
+    try:
+        for n_targets, n_channels, s_rate, length in itertools.product(args.targets, args.channels,
+                                                                       args.s_rates, args.lengths):
+            config.frequencies = target_frequencies(n_targets)
+            eeg_data = make_trial(n_channels, s_rate, length, config.frequencies[0])
+            stages = make_stages(processor, eeg_data, s_rate)
+
+            for stage in args.stages:
+                latencies, peak = measure(stages[stage], args.repeats)
+                result = {'stage': stage, 'targets': n_targets, 'channels': n_channels, 's_rate': s_rate,
+                          'length': length, 'repeats': args.repeats,
+                          'p50_ms': float(np.percentile(latencies, 50)),
+                          'p90_ms': float(np.percentile(latencies, 90)),
+                          'p99_ms': float(np.percentile(latencies, 99)),
+                          'max_ms': float(np.max(latencies)),
+                          'peak_kb': peak}
+                results.append(result)
+                print('%-24s targets=%-2d channels=%-2d s_rate=%-4d length=%-4g p50=%8.2f ms p99=%8.2f ms '
+                      'peak=%9.0f kB' % (stage, n_targets, n_channels, s_rate, length, result['p50_ms'],
+                                         result['p99_ms'], peak))
+    finally:
+        config.frequencies = original_frequencies
+
+    return {'meta': {'revision': revision(), 'python': platform.python_version(), 'numpy': np.__version__,
+                     'scipy': scipy.__version__, 'machine': platform.platform(),
+                     'date': time.strftime('%Y-%m-%d %H:%M:%S')},
+            'results': results}
+
+
+# Prints p50 latency ratios (new / old) of matching workloads
+def compare(old_path, new_path):
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+
+    def key(result):
+        return result['stage'], result['targets'], result['channels'], result['s_rate'], result['length']
+
+    old_results = {key(result): result for result in old['results']}
+    print('%-24s %7s %8s %6s %6s  %10s %10s  %6s' % ('stage', 'targets', 'channels', 's_rate', 'length',
+                                                     'old p50', 'new p50', 'ratio'))
+    for result in new['results']:
+        previous = old_results.get(key(result))
+        if previous is None:
+            continue
+        print('%-24s %7d %8d %6d %6g  %10.2f %10.2f  %6.2f' % (key(result) + (previous['p50_ms'], result['p50_ms'],
+                                                                              result['p50_ms'] / previous['p50_ms'])))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='EEGProcessor benchmark')
+    parser.add_argument('--channels', type=int, nargs='+', default=[8, 16, 32, 64])
+    parser.add_argument('--s-rates', type=int, nargs='+', default=[250, 500, 1000, 2000])
+    parser.add_argument('--lengths', type=float, nargs='+', default=[1, 5, 20])
+    parser.add_argument('--targets', type=int, nargs='+', default=[3, 6])
+    parser.add_argument('--stages', nargs='+', default=STAGES, choices=STAGES)
+    parser.add_argument('--repeats', type=int, default=20)
+    parser.add_argument('--output', help='save results to a JSON file')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help='compare two saved result files')
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    report = run(args)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=1)
+
+
+if __name__ == '__main__':
+    main()
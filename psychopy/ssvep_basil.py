@@ -3,7 +3,7 @@ import random
 from datetime import datetime
 
 # LAB STREAMING LAYER
-from pylsl import StreamInfo, StreamOutlet
+from pylsl import StreamInfo, StreamOutlet, StreamInlet, resolve_byprop
 
 from psychopy import event
     
@@ -13,6 +13,9 @@ from psychopy import event
 WINWIDTH = 1920
 WINHEIGHT = 1200
 REFRESH_RATE = 60
+# the classifier sends this marker once it has made a decision
+FEEDBACK_STREAM = 'basil_feedback'
+EARLY_STOP_MARKER = 'S  3'
 
 
 def get_keypress():
@@ -23,6 +26,29 @@ def get_keypress():
         return None
         
 
+# Connect to the classifier feedback stream (if available)
+def connect_feedback():
+    streams = resolve_byprop('name', FEEDBACK_STREAM, timeout=0.2)
+    if streams:
+        inlet = StreamInlet(streams[0])
+        inlet.open_stream()
+        return inlet
+    return None
+
+
+# Discard markers received before the current trial
+def flush_feedback(inlet):
+    marker, timestamp = inlet.pull_sample(timeout=0.0)
+    while marker is not None:
+        marker, timestamp = inlet.pull_sample(timeout=0.0)
+
+
+# The classifier requested to end the flicker
+def early_stop_requested(inlet):
+    marker, timestamp = inlet.pull_sample(timeout=0.0)
+    return marker is not None and marker[0] == EARLY_STOP_MARKER
+
+
 def shutdown(win):
     win.close()
     core.quit()
@@ -49,7 +75,13 @@ imageStim3 = visual.ImageStim(main_win, size=(400, 400), pos=(0, -350),units='pi
 
 #grating.color = 'black'
 
+feedback = None
+
 for i in range(1, 7):
+    if feedback is None:
+        feedback = connect_feedback()
+    else:
+        flush_feedback(feedback)
   
     # start
     outlet.push_sample(['S  1'])
@@ -57,6 +89,8 @@ for i in range(1, 7):
         key_press = get_keypress()
         if key_press == 'q':
             shutdown(main_win)
+        if feedback is not None and early_stop_requested(feedback):
+            break
         if frameN % 5 < 3: # 12 Hz
             #rectangle.draw() 
             imageStim1.draw()
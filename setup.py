@@ -3,7 +3,7 @@ from setuptools import setup
 setup(
     name='basil-ssvep-online',
     version='1.0',
-    packages=['src', 'src.gui', 'src.data', 'src.processing'],
+    packages=['src', 'src.gui', 'src.data', 'src.processing', 'src.engine'],
     url='',
     license='',
     author='Lukas Vareka',
@@ -1,39 +1,280 @@
+import os
 import threading
-from pylsl import StreamInlet, resolve_stream
+import time
+from datetime import datetime
+import numpy as np
+from pylsl import StreamInlet, resolve_stream, cf_float32
 import src.data.config as config
-from PyQt5.QtCore import QThread
+from src.data.ring_buffer import RingBuffer
+from src.data.eeg_spool import EegSpool
+import src.processing.artifacts as artifacts
+import src.processing.decimation as decimation
+import src.processing.preprocessing as preprocessing
+from src.engine.signal import Signal
+from src.engine.thread import Thread
+
+
+# Clock offsets of the EEG and marker inlets
+# (LSL time_correction: added to the timestamps of the inlet to get the local clock)
+# The EEG timestamps are kept as received; marker timestamps are converted
+# into the EEG clock by the latest estimates of both inlets. Until both
+# inlets have an estimate, marker timestamps are left unchanged, so the
+# epochs are never cut with only one of the streams corrected.
+class ClockOffsets:
+    STREAMS = ('eeg', 'markers')
+
+    def __init__(self, settings=config):
+        self.config = settings
+        self.lock = threading.Lock()
+        # stream -> latest offset [s], time of the latest attempt
+        self.offsets = dict()
+        self.updated = dict()
+
+    # Refresh the offset of the inlet of the stream ('eeg' / 'markers'),
+    # at most once per second (liblsl keeps its estimate up to date)
+    def update(self, stream, inlet, timeout=None):
+        if not self.config.lsl_time_correction or time.time() - self.updated.get(stream, 0) < 1:
+            return
+        self.updated[stream] = time.time()
+        try:
+            offset = inlet.time_correction(timeout=self.config.chunk_timeout if timeout is None else timeout)
+        except Exception:  # no estimate yet (TimeoutError), lost stream: keep the previous one
+            return
+        with self.lock:
+            self.offsets[stream] = offset
+
+    # Marker timestamp in the clock of the EEG timestamps
+    def marker_to_eeg(self, timestamp):
+        with self.lock:
+            if any(stream not in self.offsets for stream in self.STREAMS):
+                return timestamp
+            return timestamp + self.offsets['markers'] - self.offsets['eeg']
 
 
 # Collects EEG samples and sampling rate.
 # On-line BASIL SSVEP BCI
 # Lukas Vareka, 2020
-class CollectLslEeg(QThread):
+class CollectLslEeg(Thread):
     recording = True
     running = False
     s_rate = 0
     eeg_data = []
+    ring_buffer = None
+    stream_classifier = None
+    artifact_detector = None
+    session_recorder = None
+    replay = None
 
-    # reference towards a window
-    def __init__(self):
+    # settings - pipeline settings (see src/engine/settings.py), config by default
+    def __init__(self, settings=None):
         super(CollectLslEeg, self).__init__()
+        self.config = settings if settings is not None else config
+        # status message (str)
+        self.add_status_signal = Signal()
+        # epochs cut by timestamps: start of the next trial (set by the marker
+        # collector), timestamp of the latest buffered sample; the buffer is
+        # accessed under the condition by both threads
+        self.trial_start = None
+        self.latest_timestamp = None
+        self.condition = threading.Condition()
+        # clock offsets of the EEG inlet and of the marker inlet (updated by the marker collector)
+        self.clock_offsets = ClockOffsets(self.config)
+        # the running classification and the artifact detection have been reset
+        # for a trial (samples before the first start marker are only buffered)
+        self.trial_reset = False
+
+    # True if trials are cut from the buffer by timestamps (see get_epoch())
+    def cuts_epochs(self):
+        return self.config.epoch_by_timestamps and (self.config.chunked_acquisition or self.replay is not None)
 
     def run(self):
         self.eeg_data = []
-        streams = resolve_stream('name', config.eeg_stream_name)
-        print('EEG streams', streams)
-        inlet = StreamInlet(streams[0])
+        self.latest_timestamp = None
+        self.trial_reset = False
+        if self.replay is not None:
+            inlet = self.replay.eeg_inlet()
+        else:
+            streams = resolve_stream('name', self.config.eeg_stream_name)
+            inlet = StreamInlet(streams[0])
         self.s_rate = inlet.info().nominal_srate()
 
+        # replayed sessions are always read in chunks
+        if self.config.chunked_acquisition or self.replay is not None:
+            self.run_chunked(inlet)
+            return
+
         while self.running:
             if self.recording:
                 # get a new sample (you can also omit the timestamp part if you're not
                 # interested in it)
-                sample, timestamp = inlet.pull_sample(timeout=config.collector_timeout)
+                sample, timestamp = inlet.pull_sample(timeout=self.config.collector_timeout)
                 if sample is None:
                     self.running = False
                 else:
                     self.eeg_data.append(sample)
 
+    # Pulls chunks of samples directly into
+    # a preallocated ring buffer (or the memory-mapped spool)
+    # (decimated and preprocessed on the way, s_rate is the decimated rate)
+    def run_chunked(self, inlet):
+        info = inlet.info()
+        n_channels = info.channel_count()
+        if self.session_recorder is not None:
+            self.session_recorder.write_stream_info(n_channels, self.s_rate)
+        decimator = None
+        factor = decimation.decimation_factor(self.s_rate, self.config)
+        if factor > 1:
+            decimator = decimation.StreamDecimator(n_channels, factor, self.config)
+            self.s_rate = self.s_rate / factor
+
+        if self.config.spool_eeg:
+            os.makedirs(self.config.spool_directory, exist_ok=True)
+            path = os.path.join(self.config.spool_directory, 'eeg_' + datetime.now().strftime('%Y%m%d_%H%M%S'))
+            self.ring_buffer = EegSpool(path, n_channels, self.s_rate, int(self.config.spool_block * self.s_rate))
+        else:
+            self.ring_buffer = RingBuffer(n_channels, int(self.config.buffer_capacity * self.s_rate))
+        preprocessor = None
+        if preprocessing.enabled(self.config):
+            try:
+                preprocessor = preprocessing.StreamPreprocessor(n_channels, self.s_rate, self.config)
+            except ValueError as error:
+                self.add_status_signal.emit('Preprocessing: %s. Stopping the EEG collection.' % error)
+                self.running = False
+                with self.condition:
+                    self.condition.notify_all()
+                raise
+        self.artifact_detector = None
+        if self.config.artifact_handling != 'off':
+            self.artifact_detector = artifacts.ArtifactDetector(n_channels, self.s_rate, self.config)
+
+        # float32 streams are pulled without any intermediate Python lists
+        chunk = None
+        if info.channel_format() == cf_float32:
+            chunk = np.zeros((self.config.chunk_max_samples, n_channels), dtype=np.float32)
+
+        last_sample_time = time.time()
+        while self.running:
+            samples, timestamps = inlet.pull_chunk(timeout=self.config.chunk_timeout,
+                                                   max_samples=self.config.chunk_max_samples, dest_obj=chunk)
+            if not timestamps:
+                if time.time() - last_sample_time > self.config.collector_timeout:
+                    self.running = False
+                continue
+            last_sample_time = time.time()
+            if chunk is not None:
+                samples = chunk[:len(timestamps)]
+            self.clock_offsets.update('eeg', inlet)
+            timestamps = np.asarray(timestamps)
+            if self.session_recorder is not None:
+                self.session_recorder.write_chunk(samples, timestamps)
+            # all chunks pass the filters, so their state is continuous
+            if decimator is not None:
+                samples, timestamps = decimator.process(samples, timestamps)
+                if len(timestamps) == 0:
+                    continue
+            if preprocessor is not None:
+                samples = preprocessor.process(samples)
+
+            if self.cuts_epochs():
+                self.append_continuous(samples, timestamps, n_channels)
+            # samples received outside of the trial are dropped
+            elif self.recording:
+                if self.ring_buffer.count == 0:
+                    if self.stream_classifier is not None:
+                        self.stream_classifier.reset(n_channels, self.s_rate)
+                    if self.artifact_detector is not None:
+                        self.artifact_detector.reset()
+                self.ring_buffer.append(samples, np.asarray(timestamps))
+                if self.artifact_detector is not None:
+                    self.artifact_detector.process(samples, timestamps)
+
+                # update the running classification with the new samples only
+                if self.stream_classifier is not None:
+                    n_new = len(timestamps)
+                    self.stream_classifier.update(self.ring_buffer.view(self.stream_classifier.window + n_new), n_new)
+
+        if self.config.spool_eeg:
+            self.ring_buffer.close()
+        with self.condition:
+            self.condition.notify_all()
+
+    # Buffers every chunk; the samples before the start of a new trial
+    # are released, trials are cut by get_epoch()
+    def append_continuous(self, samples, timestamps, n_channels):
+        n_new = len(timestamps)
+        with self.condition:
+            start, self.trial_start = self.trial_start, None
+            self.ring_buffer.append(samples, timestamps)
+            if start is not None:
+                self.ring_buffer.release(start)
+                # all samples of the trial are new for the running classification
+                n_new = len(self.ring_buffer)
+
+        if start is not None:
+            if self.stream_classifier is not None:
+                self.stream_classifier.reset(n_channels, self.s_rate)
+            if self.artifact_detector is not None:
+                self.artifact_detector.reset()
+            self.trial_reset = True
+        if self.recording and self.trial_reset and n_new > 0:
+            if self.artifact_detector is not None:
+                self.artifact_detector.process(self.ring_buffer.view(n_new).T, self.ring_buffer.timestamps_view(n_new))
+            if self.stream_classifier is not None:
+                self.stream_classifier.update(self.ring_buffer.view(self.stream_classifier.window + n_new), n_new)
+
+        with self.condition:
+            self.latest_timestamp = timestamps[-1]
+            self.condition.notify_all()
+
+    # A trial starts at the timestamp (marker collector)
+    def start_trial(self, timestamp):
+        with self.condition:
+            self.trial_start = timestamp
+        self.recording = True
+
+    # Waits until the samples up to the timestamp have been buffered
+    # Returns False if they have not arrived within the timeout
+    def wait_for_samples(self, timestamp, timeout):
+        deadline = time.time() + timeout
+        with self.condition:
+            while self.latest_timestamp is None or self.latest_timestamp < timestamp:
+                remaining = deadline - time.time()
+                if remaining <= 0 or not self.running:
+                    return False
+                self.condition.wait(remaining)
+        return True
+
+    # Returns the buffered samples with first <= timestamp < last
+    # (channels x samples) and their timestamps
+    def get_epoch(self, first, last):
+        with self.condition:
+            if self.ring_buffer is None:
+                return np.empty((0, 0)), np.zeros(0)
+            return self.ring_buffer.epoch(first, last)
+
+    # True if the data returned by get_eeg_data() are never overwritten
+    # by new samples (i.e. they do not have to be copied)
+    def is_eeg_data_stable(self):
+        return isinstance(self.ring_buffer, EegSpool)
+
+    # Returns the EEG data recorded so far (channels x samples)
+    def get_eeg_data(self):
+        if self.ring_buffer is not None:
+            return self.ring_buffer.view()
+        if not self.eeg_data:
+            return np.empty((0, 0))
+        return np.transpose(self.eeg_data)
+
+    # Returns True for samples of get_eeg_data() (or with the given timestamps)
+    # within segments contaminated by artifacts (None if there are none or the detection is off)
+    def get_artifact_mask(self, timestamps=None):
+        if self.artifact_detector is None or self.ring_buffer is None:
+            return None
+        return self.artifact_detector.mask(self.ring_buffer.timestamps_view() if timestamps is None else timestamps)
+
     def clear_eeg_data(self):
         self.eeg_data = []
+        # (samples before an epoch are released at the start of the next trial)
+        if self.ring_buffer is not None and not self.cuts_epochs():
+            self.ring_buffer.clear()
 
@@ -1,9 +1,10 @@
 from pylsl import StreamInlet, resolve_stream
 import time
-import threading
 import numpy as np
 import src.data.config as config
-from PyQt5.QtCore import pyqtSignal, QThread
+from src.processing.worker import TrialJob
+from src.engine.signal import Signal
+from src.engine.thread import Thread
 
 
 # Collects start / stop LSL markers
@@ -11,32 +12,55 @@ from PyQt5.QtCore import pyqtSignal, QThread
 # on demand.
 # On-line BASIL SSVEP BCI
 # Lukas Vareka, 2020
-class CollectLslMarkers(QThread):
+class CollectLslMarkers(Thread):
     running = True
     marker_list = []
     lsl_eeg_collector = None
-    add_status_signal = pyqtSignal(str)
-    send_timeout_signal = pyqtSignal(int)
-    set_feedback_status = pyqtSignal(bool)
+    session_recorder = None
+    replay = None
 
     # connects to data source and processor
-    def __init__(self, controller, lsl_eeg, eeg_processor):
+    # (trials are classified synchronously unless a processing worker is given)
+    def __init__(self, controller, lsl_eeg, eeg_processor, processing_worker=None, settings=None):
         super(CollectLslMarkers, self).__init__()
+        self.config = settings if settings is not None else config
+        # status message (str), marker timeout in progress (int, 0 = none),
+        # feedback buttons state (bool), trial classified synchronously (TrialJob, latency [ms])
+        self.add_status_signal = Signal()
+        self.send_timeout_signal = Signal()
+        self.set_feedback_status = Signal()
+        self.trial_done = Signal()
         self.controller = controller
         self.lsl_eeg_collector = lsl_eeg
         self.eeg_processor = eeg_processor
+        self.processing_worker = processing_worker
+        self.trial_id = 0
+        self.start_timestamp = None
 
     # Execution of the entire on-line workflow
     def run(self):
-        markers = resolve_stream('name', config.marker_stream_name)
-        inlet = StreamInlet(markers[0])
+        if self.replay is not None:
+            inlet = self.replay.marker_inlet()
+        else:
+            markers = resolve_stream('name', self.config.marker_stream_name)
+            inlet = StreamInlet(markers[0])
+        clock_offsets = self.lsl_eeg_collector.clock_offsets
+        clock_offsets.update('markers', inlet, timeout=1)
 
         while self.running:
             # get a new sample (you can also omit the timestamp part if you're not
             # interested in it)
-            self.send_timeout_signal.emit(int(config.collector_timeout))
-            marker, timestamp = inlet.pull_sample(timeout=config.collector_timeout)
+            self.send_timeout_signal.emit(int(self.config.collector_timeout))
+            marker, timestamp = inlet.pull_sample(timeout=self.config.collector_timeout)
             self.send_timeout_signal.emit(0)
+            received = time.perf_counter()
+
+            # (all timestamps are in the clock of the EEG stream)
+            if marker is not None:
+                clock_offsets.update('markers', inlet)
+                timestamp = clock_offsets.marker_to_eeg(timestamp)
+            if marker is not None and self.session_recorder is not None:
+                self.session_recorder.write_marker(marker[0], timestamp)
 
             if marker is None:
                 self.controller.stop()
@@ -44,25 +68,58 @@ class CollectLslMarkers(QThread):
                 self.add_status_signal.emit('Timeout passed with no marker received. Stopping the execution.')
 
             if marker == ['S  1']:  # start -> collect EEG samples
-                self.lsl_eeg_collector.recording = True
+                if self.lsl_eeg_collector.cuts_epochs():
+                    self.lsl_eeg_collector.start_trial(timestamp)
+                else:
+                    self.lsl_eeg_collector.recording = True
+                self.start_timestamp = timestamp
                 self.set_feedback_status.emit(False)
 
                 # self.lslEEG.terminate()
             if marker == ['S  2']:  # stop -> obtain EEG samples, stop collecting,
                                     # evaluate EEG frequencies
-                self.lsl_eeg_collector.recording = False
-
-                eeg_data = self.lsl_eeg_collector.eeg_data
+                if self.lsl_eeg_collector.cuts_epochs():
+                    if self.start_timestamp is None:
+                        continue
+                    # the trial is cut as soon as the samples up to the stop marker are buffered
+                    covered = self.lsl_eeg_collector.wait_for_samples(timestamp, self.config.collector_timeout)
+                    self.lsl_eeg_collector.recording = False
+                    eeg_data, epoch_timestamps = self.lsl_eeg_collector.get_epoch(self.start_timestamp, timestamp)
+                    if not covered:
+                        received_length = epoch_timestamps[-1] - self.start_timestamp if len(epoch_timestamps) else 0
+                        self.add_status_signal.emit('Trial truncated: EEG samples received only for %.2f of %.2f s'
+                                                    % (received_length, timestamp - self.start_timestamp))
+                    artifacts = self.lsl_eeg_collector.get_artifact_mask(epoch_timestamps)
+                else:
+                    self.lsl_eeg_collector.recording = False
+                    eeg_data = self.lsl_eeg_collector.get_eeg_data()
+                    artifacts = self.lsl_eeg_collector.get_artifact_mask()
                 s_rate = self.lsl_eeg_collector.s_rate
 
-                if not eeg_data:
+                if eeg_data.size == 0:
+                    continue
+
+                self.trial_id = self.trial_id + 1
+                if self.processing_worker is not None:
+                    # the ring buffer is reused by the collector, the job gets its own copy
+                    # (spooled data are never overwritten and are passed without copying)
+                    if not self.lsl_eeg_collector.is_eeg_data_stable():
+                        eeg_data = np.array(eeg_data)
+                    job = TrialJob(self.trial_id, eeg_data, s_rate, self.start_timestamp, timestamp, received,
+                                   artifacts)
+                    self.lsl_eeg_collector.clear_eeg_data()
+                    self.processing_worker.submit(job)
                     continue
 
-                eeg_data = np.transpose(eeg_data)
                 self.add_status_signal.emit('Processing received data package..')
-                self.eeg_processor.process(eeg_data, s_rate)
+                # the calibration needs the trial data after the buffer has been cleared
+                job = TrialJob(self.trial_id, np.array(eeg_data) if self.config.trca_calibration else None, s_rate,
+                               self.start_timestamp, timestamp, received)
+                self.eeg_processor.process(eeg_data, s_rate, self.trial_id, artifacts)
+                latency = 1000 * (time.perf_counter() - job.received)
+                self.add_status_signal.emit('Processing took %.1f ms' % latency)
                 self.lsl_eeg_collector.clear_eeg_data()
-                self.set_feedback_status.emit(True)
+                self.trial_done.emit(job, latency)
 
     # Terminate the whole workflow
     def terminate(self):
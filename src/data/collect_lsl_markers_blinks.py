@@ -3,7 +3,7 @@ from pylsl import StreamInlet, resolve_stream
 import time
 from PyQt5 import QtCore
 import threading
-import numpy as np
+import src.data.config as config
 
 
 # Collects start / stop LSL markers
@@ -26,9 +26,11 @@ class CollectLslMarkersBlinks(threading.Thread):
     def run(self):
         markers = resolve_stream('name', 'psychopy_stimuli')
         inlet = StreamInlet(markers[0])
+        clock_offsets = self.lsl_eeg_collector.clock_offsets
         startt = 0
         self.lsl_eeg_collector.recording = True
         last_marker = None
+        last_timestamp = None
 
         while self.running:
             # get a new sample (you can also omit the timestamp part if you're not
@@ -36,15 +38,27 @@ class CollectLslMarkersBlinks(threading.Thread):
             print('Waiting for marker..')
             marker, timestamp = inlet.pull_sample()
             print(marker)
+            clock_offsets.update('markers', inlet)
+            timestamp = clock_offsets.marker_to_eeg(timestamp)
 
-            eeg_data = self.lsl_eeg_collector.eeg_data
+            # the buffer holds all samples, the data since the previous marker are cut from it
+            if self.lsl_eeg_collector.cuts_epochs():
+                if last_marker:
+                    self.lsl_eeg_collector.wait_for_samples(timestamp, config.collector_timeout)
+                    eeg_data, epoch_timestamps = self.lsl_eeg_collector.get_epoch(last_timestamp, timestamp)
+                    if eeg_data.size > 0:
+                        self.eeg_processor.process(eeg_data, self.lsl_eeg_collector.s_rate, last_marker)
+                self.lsl_eeg_collector.start_trial(timestamp)
+                last_marker, last_timestamp = marker, timestamp
+                continue
+
+            eeg_data = self.lsl_eeg_collector.get_eeg_data()
             s_rate = self.lsl_eeg_collector.s_rate
 
-            if not eeg_data:
+            if eeg_data.size == 0:
                 continue
 
             if last_marker:
-                eeg_data = np.transpose(eeg_data)
                 self.eeg_processor.process(eeg_data, s_rate, last_marker)
                 self.lsl_eeg_collector.clear_eeg_data()
             last_marker = marker
@@ -8,6 +8,8 @@ weights_classifier = dict()
 weights_classifier['spectral'] = 0
 weights_classifier['spectral_diff'] = 0.5
 weights_classifier['cca'] = 0.5
+weights_classifier['fbcca'] = 0
+weights_classifier['trca'] = 0
 
 # for spectral diff method:
 # default:
@@ -16,3 +18,187 @@ weights_classifier['cca'] = 0.5
 
 fq_interval = 0.3
 fq_baseline = 1
+
+
+# acquisition:
+# pull EEG in chunks into a preallocated ring buffer
+# (False = collect sample by sample into a Python list)
+chunked_acquisition = True
+# ring buffer capacity [s]
+buffer_capacity = 60
+# maximum number of samples pulled at once
+chunk_max_samples = 1024
+# maximum time to wait for a chunk [s]
+chunk_timeout = 0.05
+# buffer all samples and cut the trials by the LSL timestamps of the start / stop markers
+# (requires chunked_acquisition; False = the samples received between the handling of the markers)
+epoch_by_timestamps = True
+# convert the marker timestamps into the clock of the EEG stream by the clock offsets
+# of both stream sources (applied once both offsets are known)
+lsl_time_correction = True
+
+# streaming preprocessing of every pulled chunk (see src/processing/preprocessing.py)
+# (requires chunked_acquisition; sessions are recorded raw)
+# IIR band-pass [low, high] Hz (None = disabled) and its order
+preprocess_bandpass = None
+preprocess_bandpass_order = 4
+# line noise notch filter [Hz] (None = disabled) and its quality factor
+preprocess_notch = None
+preprocess_notch_quality = 30
+# common average reference (the mean of all channels is subtracted)
+preprocess_car = False
+
+# decimation of every pulled chunk (see src/processing/decimation.py)
+# (requires chunked_acquisition; sessions are recorded at the original rate)
+# factor: 1 = disabled, 0 = the largest safe factor for the target frequencies and harmonics
+# (the preprocessing filters must stay below the decimated Nyquist frequency)
+decimation_factor = 1
+# highest frequency in use as a fraction of the decimated Nyquist frequency
+decimation_passband = 0.8
+# length of the anti-aliasing FIR filter per decimated sample
+decimation_taps = 32
+
+# detection of blinks and other artifacts in every chunk of the trial (see src/processing/artifacts.py)
+# (requires chunked_acquisition)
+# 'off', 'exclude' (contaminated segments are removed from the trial)
+# or 'weight' (contaminated segments are scaled by artifact_weight)
+artifact_handling = 'off'
+# segment length [s]; a segment is contaminated when the peak-to-peak amplitude
+# of the checked channels (averaged over the channels) exceeds the threshold
+artifact_segment = 0.25
+artifact_threshold = 150
+# checked channels (None = all)
+artifact_channels = None
+artifact_weight = 0.1
+# segments are not removed if less than this share of the trial would remain
+artifact_min_clean = 0.5
+
+# number of canonical components computed by CCA
+cca_components = 1
+
+# number of harmonics in CCA reference templates
+n_harmonics = 2
+# maximum number of cached reference templates
+reference_cache_size = 64
+
+# filter-bank CCA (weights_classifier['fbcca']):
+# sub-bands [Hz] (upper edges are limited by the Nyquist frequency)
+fbcca_bands = [(8, 50), (18, 50), (28, 50)]
+# order of the Butterworth band-pass filters
+fbcca_order = 4
+# zero-padding of the filtered data [s] (longer than the filter impulse responses)
+fbcca_padding = 0.5
+# number of harmonics in the reference templates
+fbcca_harmonics = 3
+# weight of the n-th sub-band: n^(-a) + b
+fbcca_weight_a = 1.25
+fbcca_weight_b = 0.25
+
+# TRCA classifier (weights_classifier['trca']) learned from calibration trials:
+# collect trials labelled by the feedback buttons and (re)train the model
+trca_calibration = False
+# trials per target required for training (at least 2)
+trca_calibration_trials = 5
+# trained model (loaded on start if it exists)
+trca_model_path = 'trca_model.npz'
+
+# power spectra:
+# zero-pad signals to a fast FFT length
+psd_fast_length = False
+# average spectra over Welch segments
+psd_welch = False
+# Welch segment length [s]
+psd_welch_segment = 2
+# number of FFT worker threads (-1 = all CPUs)
+fft_workers = 1
+
+# run the spectral methods (in blocks of channels), CCA and FBCCA
+# concurrently in a process pool sharing the trial data (see src/processing/parallel.py)
+parallel_methods = False
+# number of worker processes (0 = all CPUs)
+parallel_workers = 0
+
+# continuous classification during the stimulation
+# (requires chunked_acquisition)
+streaming_classification = False
+# interval between two running estimates [ms]
+streaming_interval = 500
+# sliding window length [s]
+streaming_window = 4
+
+# dynamic stopping: end the stimulation once the running estimate
+# keeps the same class with sufficient confidence and margin
+# (requires streaming_classification)
+dynamic_stopping = False
+# minimum confidence of the running estimate (share of the winning score)
+stopping_confidence = 0.7
+# minimum difference between the best and the second best normalized score
+stopping_margin = 0.5
+# how long the thresholds must hold [s]
+stopping_dwell = 1.5
+# earliest possible decision [s]
+stopping_min_time = 2
+# LSL marker stream listened to by the stimulation
+feedback_stream_name = 'basil_feedback'
+early_stop_marker = 'S  3'
+
+# session recording: raw EEG, timestamps and markers
+# (requires chunked_acquisition)
+record_sessions = False
+session_directory = 'sessions'
+# replay a recorded session file instead of LSL streams (None = use LSL)
+replay_session = None
+# replay speed: 1 = real time, N = N times faster, 0 = as fast as possible
+replay_speed = 1
+
+# classify trials in a separate worker thread
+# (marker reception is never blocked by processing)
+asynchronous_processing = True
+# maximum number of trials waiting for processing
+processing_queue_size = 2
+# when the queue is full: 'block' (wait up to processing_block_timeout [s]),
+# 'drop_oldest' or 'drop_newest' (live LSL input only, replayed trials are never dropped;
+# dropped trials are logged with dropped = 1)
+processing_queue_policy = 'drop_oldest'
+processing_block_timeout = 5
+
+# background LSL stream discovery:
+# interval between checks of the available streams [ms]
+discovery_interval = 200
+# a stream is considered gone when not seen for this time [s]
+discovery_forget_after = 2
+
+# live spectrum plot during the recording:
+# refresh rate [frames per second] (0 = disabled)
+live_plot_fps = 5
+# length of the displayed data [s]
+live_plot_window = 2
+
+# typed trial results log (see src/data/results_log.py)
+results_directory = 'results'
+# records written at once
+results_batch_size = 16
+# maximum time a record waits before being written [s]
+results_flush_interval = 2
+# fsync: 'never', 'batch' (after each written batch) or 'always' (after each record)
+results_fsync = 'batch'
+
+# spool all acquired samples into a memory-mapped file instead of the ring buffer
+# (trials are processed without copying, raw data are kept for later analysis, see src/data/eeg_spool.py)
+spool_eeg = False
+spool_directory = 'spool'
+# the spool file is extended by blocks of this length [s]
+spool_block = 60
+
+# headless mode (src/headless.py): LSL stream publishing the trial results as JSON strings
+results_stream_name = 'basil_results'
+
+# running estimates during the stimulation (one line per estimate)
+stream_results_path = 'stream_results.csv'
+
+# independent pipelines in one process (see src/engine/pipelines.py), e.g. one per booth;
+# each profile is a dict with a unique 'name' and the settings that differ from this file, e.g.
+# {'name': 'booth1', 'eeg_stream_name': 'BASIL_1', 'marker_stream_name': 'Markers_1'}
+# results, sessions, spooled EEG and the TRCA model of a pipeline are stored separately
+# (see src/engine/settings.py); empty = a single pipeline configured by this file
+pipelines = []
@@ -0,0 +1,139 @@
+import json
+import os
+import numpy as np
+
+
+# Append-only, memory-mapped spool of raw EEG samples
+# All acquired samples of a session are kept in a file
+# (path + '.eeg': float32 samples x channels, path + '.ts': float64 LSL timestamps,
+# path + '.json': channel count and sampling rate).
+# It offers the same interface as RingBuffer, i.e. views (channels x samples)
+# of the samples since the last clear() / release(). The views are transposed windows
+# into the mapped file, so the samples are never copied and stay valid
+# after clear() (spooled samples are never overwritten).
+# Only the region from the start of the current trial is mapped;
+# the file is extended (and remapped) by blocks of block_size samples,
+# so the resident memory stays bounded by the trial length.
+# On-line BASIL SSVEP BCI
+class EegSpool:
+
+    def __init__(self, path, n_channels, s_rate, block_size, dtype=np.float32):
+        self.path = path
+        self.n_channels = int(n_channels)
+        self.block_size = max(1, int(block_size))
+        self.dtype = np.dtype(dtype)
+        # samples in the file, file index of the first sample of the trial
+        self.total = 0
+        self.start = 0
+        # mapped region (file index of its first sample, number of samples)
+        self.offset = 0
+        self.capacity = 0
+        self.data = None
+        self.timestamps = None
+
+        with open(path + '.json', 'w') as f:
+            json.dump({'n_channels': self.n_channels, 's_rate': s_rate, 'dtype': self.dtype.str}, f)
+        self.data_file = open(path + '.eeg', 'w+b')
+        self.timestamps_file = open(path + '.ts', 'w+b')
+
+    # Number of samples since the last clear()
+    @property
+    def count(self):
+        return self.total - self.start
+
+    def __len__(self):
+        return self.count
+
+    # Start a new trial (spooled samples are kept in the file)
+    def clear(self):
+        self.start = self.total
+
+    # Extend the files and map the region from the start of the trial
+    def remap(self, required):
+        self.offset = self.start
+        self.capacity = (required - self.offset) + self.block_size
+        end = self.offset + self.capacity
+        self.data_file.truncate(end * self.n_channels * self.dtype.itemsize)
+        self.timestamps_file.truncate(end * 8)
+        self.data = np.memmap(self.data_file, dtype=self.dtype, mode='r+',
+                              offset=self.offset * self.n_channels * self.dtype.itemsize,
+                              shape=(self.capacity, self.n_channels))
+        self.timestamps = np.memmap(self.timestamps_file, dtype=np.float64, mode='r+',
+                                    offset=self.offset * 8, shape=(self.capacity,))
+
+    # Append a chunk of samples
+    # chunk - samples x channels (as returned by pull_chunk)
+    # timestamps - one LSL timestamp per sample
+    def append(self, chunk, timestamps):
+        chunk = np.asarray(chunk)
+        n_samples = chunk.shape[0]
+        if n_samples == 0:
+            return
+
+        if self.data is None or self.total + n_samples > self.offset + self.capacity:
+            self.remap(self.total + n_samples)
+        position = self.total - self.offset
+        self.data[position:position + n_samples] = chunk
+        self.timestamps[position:position + n_samples] = timestamps
+        self.total += n_samples
+
+    # View (channels x samples) of the latest n_samples of the trial
+    # (all samples of the trial by default)
+    def view(self, n_samples=None):
+        if n_samples is None or n_samples > self.count:
+            n_samples = self.count
+        if self.data is None:
+            return np.zeros((self.n_channels, 0), dtype=self.dtype)
+        end = self.total - self.offset
+        return self.data[end - n_samples:end].T
+
+    # Timestamps corresponding to view(n_samples)
+    def timestamps_view(self, n_samples=None):
+        if n_samples is None or n_samples > self.count:
+            n_samples = self.count
+        if self.data is None:
+            return np.zeros(0)
+        end = self.total - self.offset
+        return self.timestamps[end - n_samples:end]
+
+    # Forget the samples older than the timestamp
+    # (they stay in the file, the mapping starts from the next sample)
+    def release(self, timestamp):
+        timestamps = self.timestamps_view()
+        self.start = self.total - timestamps.size + int(np.searchsorted(timestamps, timestamp, side='left'))
+
+    # Views of the samples with first <= timestamp < last
+    # Returns data (channels x samples) and timestamps, found by binary search
+    # (no copying, spooled samples are never overwritten).
+    def epoch(self, first, last):
+        if self.data is None:
+            return np.zeros((self.n_channels, 0), dtype=self.dtype), np.zeros(0)
+        timestamps = self.timestamps_view()
+        start, stop = np.searchsorted(timestamps, [first, last], side='left')
+        begin = self.total - self.offset - timestamps.size
+        return self.data[begin + start:begin + stop].T, timestamps[start:stop]
+
+    # Cut the files to the spooled samples and close them
+    # (views returned before keep their own mapping)
+    def close(self):
+        if self.data is not None:
+            self.data.flush()
+            self.timestamps.flush()
+        self.data_file.truncate(self.total * self.n_channels * self.dtype.itemsize)
+        self.timestamps_file.truncate(self.total * 8)
+        self.data_file.close()
+        self.timestamps_file.close()
+
+
+# Opens a spooled session for reading
+# Returns read-only maps: data (channels x samples), timestamps and the sampling rate
+def load_spool(path):
+    with open(path + '.json') as f:
+        meta = json.load(f)
+    timestamps = np.memmap(path + '.ts', dtype=np.float64, mode='r') \
+        if os.path.getsize(path + '.ts') > 0 else np.zeros(0)
+    n_samples = timestamps.size
+    if n_samples == 0:
+        return np.zeros((meta['n_channels'], 0), dtype=meta['dtype']), timestamps, meta['s_rate']
+    data = np.memmap(path + '.eeg', dtype=meta['dtype'], mode='r', shape=(n_samples, meta['n_channels']))
+    return data.T, timestamps, meta['s_rate']
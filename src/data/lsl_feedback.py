@@ -0,0 +1,17 @@
+from pylsl import StreamInfo, StreamOutlet
+import src.data.config as config
+
+
+# Sends markers back to the stimulation
+# (e.g. to end the flicker once a decision is made)
+# On-line BASIL SSVEP BCI
+class LslFeedback:
+
+    def __init__(self, settings=None):
+        self.config = settings if settings is not None else config
+        info = StreamInfo(name=self.config.feedback_stream_name, type='Markers', channel_count=1,
+                          channel_format='string', source_id=self.config.feedback_stream_name + '_001')
+        self.outlet = StreamOutlet(info)
+
+    def send(self, marker):
+        self.outlet.push_sample([marker])
@@ -1,6 +1,5 @@
 import threading
 import json
-import requests
 import base64
 import sys
 
@@ -78,6 +77,8 @@ class Netio (threading.Thread):
 		string = username + ":" + password
 		writeAutorization = "Basic " + str(base64.b64encode(string.encode("utf-8")), "utf-8")
 		headers = {'Authorization' : writeAutorization}
+		# imported on use, it slows down the start of the application
+		import requests
 		requests.post('http://'+self.ip+'/netio.json', data=toggleOrderJson, headers= headers)
 		return 0
 
@@ -86,6 +87,7 @@ class Netio (threading.Thread):
 		Get the state of the netio Plugs. Returns a Json with the states of the sockets.
 		'''
 		#print("GETSTATES")
+		import requests
 		try:
 			r = requests.get('http://'+self.ip+'/netio.json')
 		except requests.exceptions.RequestException as e:
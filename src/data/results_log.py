@@ -0,0 +1,126 @@
+import glob
+import json
+import os
+import queue
+import struct
+import threading
+import time
+import numpy as np
+import src.data.config as config
+
+
+# Typed, columnar log of trial results
+# Each trial is one fixed-size record of a NumPy structured dtype;
+# the dtype itself is stored in the file header, so that logs can be
+# loaded directly into NumPy arrays without any parsing.
+#
+# File format: magic b'BRES', header length (uint32),
+# JSON header ({'descr': dtype description}), records
+# On-line BASIL SSVEP BCI
+MAGIC = b'BRES'
+
+# per-stage processing latencies
+LATENCIES = ['psd_ms', 'spectral_ms', 'cca_ms', 'fbcca_ms', 'trca_ms', 'process_ms', 'total_ms']
+
+
+# Record dtype for the given classification methods and number of targets
+def results_dtype(methods, n_targets):
+    fields = [('trial_id', '<i4'), ('time', '<f8'), ('start_timestamp', '<f8'), ('stop_timestamp', '<f8')]
+    fields += [(method, '<f4', (n_targets,)) for method in methods]
+    fields += [('result', '<f4', (n_targets,)), ('predicted_class', '<i2'), ('confidence', '<f4'),
+               ('feedback', '<i2'), ('artifact_fraction', '<f4'), ('dropped', '<i1')]
+    fields += [(latency, '<f4') for latency in LATENCIES]
+    return np.dtype(fields)
+
+
+# Writes trial records from a background thread in batches
+# fsync policy: 'never', 'batch' (after each written batch) or 'always' (after each record)
+class ResultsLogger:
+
+    # settings - pipeline settings (see src/engine/settings.py), config by default
+    def __init__(self, path, methods=None, n_targets=None, settings=None):
+        self.config = settings if settings is not None else config
+        if methods is None:
+            methods = list(self.config.weights_classifier.keys())
+        if n_targets is None:
+            n_targets = len(self.config.frequencies)
+        self.methods = methods
+        self.dtype = results_dtype(methods, n_targets)
+        self.path = path
+        self.records = queue.Queue()
+
+        self.f = open(path, 'wb')
+        header = json.dumps({'descr': np.lib.format.dtype_to_descr(self.dtype)}).encode('utf-8')
+        self.f.write(MAGIC + struct.pack('<I', len(header)) + header)
+        self.f.flush()
+
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    # Enqueue one trial (dict of column values, missing columns are left empty)
+    def log(self, values):
+        record = np.zeros(1, dtype=self.dtype)
+        record['start_timestamp'] = np.nan
+        record['stop_timestamp'] = np.nan
+        for latency in LATENCIES:
+            record[latency] = np.nan
+        for name, value in values.items():
+            if name in self.dtype.names:
+                record[name] = value
+        self.records.put(record)
+
+    def run(self):
+        batch = []
+        last_write = time.time()
+        running = True
+
+        while running:
+            try:
+                record = self.records.get(timeout=self.config.results_flush_interval)
+                if record is None:
+                    running = False
+                else:
+                    batch.append(record)
+            except queue.Empty:
+                pass
+
+            if batch and (not running or len(batch) >= self.config.results_batch_size or
+                          self.config.results_fsync == 'always' or
+                          time.time() - last_write >= self.config.results_flush_interval):
+                self.write(batch)
+                batch = []
+                last_write = time.time()
+
+    def write(self, batch):
+        self.f.write(np.concatenate(batch).tobytes())
+        self.f.flush()
+        if self.config.results_fsync != 'never':
+            os.fsync(self.f.fileno())
+
+    # Write all pending records and close the file
+    def close(self):
+        self.records.put(None)
+        self.thread.join()
+        self.f.close()
+
+
+# Loads one or more result logs (paths or glob patterns)
+# into one structured NumPy array (columns accessible by name)
+def load_results(*paths):
+    arrays = []
+    for pattern in paths:
+        for path in sorted(glob.glob(pattern)):
+            with open(path, 'rb') as f:
+                if f.read(4) != MAGIC:
+                    raise ValueError('Not a results log: ' + path)
+                header_length, = struct.unpack('<I', f.read(4))
+                header = json.loads(f.read(header_length).decode('utf-8'))
+                # JSON turns the field tuples into lists
+                dtype = np.lib.format.descr_to_dtype([tuple(field) for field in header['descr']])
+                arrays.append(np.fromfile(f, dtype=dtype))
+
+    if not arrays:
+        return np.zeros(0, dtype=results_dtype(list(config.weights_classifier.keys()), len(config.frequencies)))
+    if any(array.dtype != arrays[0].dtype for array in arrays):
+        raise ValueError('Result logs with different columns cannot be merged')
+    return np.concatenate(arrays)
@@ -0,0 +1,91 @@
+import numpy as np
+
+
+# Preallocated ring buffer for multichannel EEG samples
+# (channels x capacity, float32) with LSL timestamps alongside.
+# Every sample is written twice (at i and i + capacity), so that
+# the most recent samples are always available as one contiguous
+# view without any copying or reordering.
+# On-line BASIL SSVEP BCI
+class RingBuffer:
+
+    def __init__(self, n_channels, capacity, dtype=np.float32):
+        self.n_channels = int(n_channels)
+        self.capacity = int(capacity)
+        self.data = np.zeros((self.n_channels, 2 * self.capacity), dtype=dtype)
+        self.timestamps = np.zeros(2 * self.capacity, dtype=np.float64)
+        self.position = 0
+        self.count = 0
+
+    # Number of samples currently available
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    # Forget all stored samples
+    def clear(self):
+        self.position = 0
+        self.count = 0
+
+    # Append a chunk of samples
+    # chunk - samples x channels (as returned by pull_chunk)
+    # timestamps - one LSL timestamp per sample
+    def append(self, chunk, timestamps):
+        chunk = np.asarray(chunk)
+        n_samples = chunk.shape[0]
+        if n_samples == 0:
+            return
+
+        # only the latest samples fit into the buffer
+        if n_samples > self.capacity:
+            chunk = chunk[-self.capacity:]
+            timestamps = timestamps[-self.capacity:]
+            self.count += n_samples - self.capacity
+            n_samples = self.capacity
+
+        chunk = chunk.T
+        first = min(n_samples, self.capacity - self.position)
+        for offset in (0, self.capacity):
+            start = self.position + offset
+            self.data[:, start:start + first] = chunk[:, :first]
+            self.timestamps[start:start + first] = timestamps[:first]
+            if first < n_samples:
+                # wrap around the end of the buffer
+                rest = n_samples - first
+                self.data[:, offset:offset + rest] = chunk[:, first:]
+                self.timestamps[offset:offset + rest] = timestamps[first:]
+
+        self.position = (self.position + n_samples) % self.capacity
+        self.count += n_samples
+
+    # Contiguous view (channels x samples) of the latest n_samples
+    # (all available samples by default)
+    def view(self, n_samples=None):
+        available = len(self)
+        if n_samples is None or n_samples > available:
+            n_samples = available
+        end = self.position + self.capacity
+        return self.data[:, end - n_samples:end]
+
+    # Timestamps corresponding to view(n_samples)
+    def timestamps_view(self, n_samples=None):
+        available = len(self)
+        if n_samples is None or n_samples > available:
+            n_samples = available
+        end = self.position + self.capacity
+        return self.timestamps[end - n_samples:end]
+
+    # Forget the samples older than the timestamp
+    # (timestamps are increasing, found by binary search)
+    def release(self, timestamp):
+        timestamps = self.timestamps_view()
+        self.count = timestamps.size - int(np.searchsorted(timestamps, timestamp, side='left'))
+
+    # Views of the samples with first <= timestamp < last
+    # Returns data (channels x samples) and timestamps, found by binary search
+    # (no copying; valid until the samples are overwritten).
+    def epoch(self, first, last):
+        available = len(self)
+        end = self.position + self.capacity
+        timestamps = self.timestamps[end - available:end]
+        start, stop = np.searchsorted(timestamps, [first, last], side='left')
+        return self.data[:, end - available + start:end - available + stop], timestamps[start:stop]
@@ -0,0 +1,247 @@
+import struct
+import threading
+import time
+import numpy as np
+from pylsl import cf_float32
+
+
+# Recording and replay of whole sessions
+# (raw EEG chunks, LSL timestamps and markers)
+#
+# Session file format (little endian):
+# header: magic b'BSSN', version (uint16)
+# records: record type (uint8) followed by
+#   STREAM_INFO: channel count (uint16), sampling rate (float64)
+#   EEG_CHUNK: sample count (uint32), channel count (uint16),
+#              timestamps (float64 x samples), data (float32 x samples x channels)
+#   MARKER: timestamp (float64), length (uint16), marker (utf-8)
+# On-line BASIL SSVEP BCI
+MAGIC = b'BSSN'
+VERSION = 1
+STREAM_INFO = 0
+EEG_CHUNK = 1
+MARKER = 2
+
+
+# Writes EEG chunks and markers from both collector threads
+# into one session file
+class SessionRecorder:
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.f = open(path, 'wb')
+        self.f.write(MAGIC + struct.pack('<H', VERSION))
+
+    def write_stream_info(self, n_channels, s_rate):
+        with self.lock:
+            self.f.write(struct.pack('<BHd', STREAM_INFO, n_channels, s_rate))
+
+    # samples - samples x channels, timestamps - one per sample
+    def write_chunk(self, samples, timestamps):
+        samples = np.asarray(samples, dtype='<f4')
+        timestamps = np.asarray(timestamps, dtype='<f8')
+        with self.lock:
+            self.f.write(struct.pack('<BIH', EEG_CHUNK, samples.shape[0], samples.shape[1]))
+            self.f.write(timestamps.tobytes())
+            self.f.write(samples.tobytes())
+
+    def write_marker(self, marker, timestamp):
+        encoded = marker.encode('utf-8')
+        with self.lock:
+            self.f.write(struct.pack('<BdH', MARKER, timestamp, len(encoded)))
+            self.f.write(encoded)
+
+    def close(self):
+        with self.lock:
+            self.f.close()
+
+
+# Reads a session file into a list of events
+# (record type, first timestamp, payload)
+def read_session(path):
+    with open(path, 'rb') as f:
+        content = f.read()
+    if content[:4] != MAGIC:
+        raise ValueError('Not a session file: ' + path)
+
+    n_channels = 0
+    s_rate = 0
+    events = []
+    position = 6
+    while position < len(content):
+        record_type = content[position]
+        position += 1
+        if record_type == STREAM_INFO:
+            n_channels, s_rate = struct.unpack_from('<Hd', content, position)
+            position += struct.calcsize('<Hd')
+        elif record_type == EEG_CHUNK:
+            n_samples, n_chunk_channels = struct.unpack_from('<IH', content, position)
+            position += struct.calcsize('<IH')
+            timestamps = np.frombuffer(content, dtype='<f8', count=n_samples, offset=position)
+            position += 8 * n_samples
+            samples = np.frombuffer(content, dtype='<f4', count=n_samples * n_chunk_channels, offset=position)
+            position += 4 * n_samples * n_chunk_channels
+            if n_samples > 0:
+                events.append((EEG_CHUNK, timestamps[0], (samples.reshape(n_samples, n_chunk_channels),
+                                                          timestamps)))
+        elif record_type == MARKER:
+            timestamp, length = struct.unpack_from('<dH', content, position)
+            position += struct.calcsize('<dH')
+            marker = content[position:position + length].decode('utf-8')
+            position += length
+            events.append((MARKER, timestamp, marker))
+        else:
+            raise ValueError('Corrupted session file: ' + path)
+    return n_channels, s_rate, events
+
+
+# Feeds a recorded session to the collectors instead of LSL
+# speed - 1 = real time, N = N times faster, 0 = as fast as possible
+# Events are delivered strictly in the recorded order; a marker
+# is only passed once the marker collector asks for the next one,
+# so that the EEG collector never runs ahead of marker handling
+# (e.g. processing) and replays are deterministic.
+class SessionReplay:
+
+    # hold_markers - EEG chunks after a marker are delivered only once the marker
+    # has been handled (i.e. the next marker is requested); not needed when
+    # trials are cut by timestamps
+    def __init__(self, path, speed=1, hold_markers=True):
+        self.n_channels, self.s_rate, self.events = read_session(path)
+        self.speed = speed
+        self.hold_markers = hold_markers
+        self.position = 0
+        self.chunk_offset = 0
+        self.marker_pending = False
+        self.start_time = None
+        self.condition = threading.Condition()
+
+    def eeg_inlet(self):
+        return ReplayEegInlet(self)
+
+    def marker_inlet(self):
+        return ReplayMarkerInlet(self)
+
+    # Time to wait until the event can be delivered (paced replay)
+    def delay(self, event):
+        if self.speed == 0:
+            return 0
+        if self.start_time is None:
+            self.start_time = time.time()
+        event_time = (event[1] - self.events[0][1]) / float(self.speed)
+        return self.start_time + event_time - time.time()
+
+    # Waits for the next event of the given type
+    # Returns the event or None if it is not available in time
+    def wait_for(self, record_type, timeout):
+        deadline = time.time() + timeout
+        with self.condition:
+            while True:
+                remaining = deadline - time.time()
+                if self.position >= len(self.events):
+                    # the session is over: the marker collector stops immediately,
+                    # the EEG collector waits for its own timeout
+                    if record_type == EEG_CHUNK and remaining > 0:
+                        self.condition.wait(remaining)
+                    return None
+                event = self.events[self.position]
+                if event[0] == record_type and not self.marker_pending:
+                    delay = self.delay(event)
+                    if delay <= 0:
+                        return event
+                    if delay > remaining:
+                        self.condition.wait(max(remaining, 0))
+                        return None
+                    self.condition.wait(delay)
+                    continue
+                if remaining <= 0:
+                    return None
+                self.condition.wait(remaining)
+
+    def advance(self):
+        self.position += 1
+        self.chunk_offset = 0
+        self.condition.notify_all()
+
+
+# Replay stream information
+class ReplayStreamInfo:
+
+    def __init__(self, replay):
+        self.replay = replay
+
+    def nominal_srate(self):
+        return self.replay.s_rate
+
+    def channel_count(self):
+        return self.replay.n_channels
+
+    def channel_format(self):
+        return cf_float32
+
+
+# Imitates the EEG StreamInlet
+class ReplayEegInlet:
+
+    def __init__(self, replay):
+        self.replay = replay
+
+    def info(self):
+        return ReplayStreamInfo(self.replay)
+
+    # replayed timestamps need no clock correction
+    def time_correction(self, timeout=None):
+        return 0.0
+
+    def pull_chunk(self, timeout=0.0, max_samples=1024, dest_obj=None):
+        replay = self.replay
+        event = replay.wait_for(EEG_CHUNK, timeout)
+        if event is None:
+            return [], []
+
+        with replay.condition:
+            samples, timestamps = event[2]
+            start = replay.chunk_offset
+            stop = min(start + max_samples, len(timestamps))
+            samples = samples[start:stop]
+            timestamps = timestamps[start:stop]
+            if stop == len(event[2][1]):
+                replay.advance()
+            else:
+                replay.chunk_offset = stop
+
+        if dest_obj is not None:
+            dest_obj[:len(timestamps)] = samples
+            return None, list(timestamps)
+        return samples.tolist(), list(timestamps)
+
+
+# Imitates the marker StreamInlet
+class ReplayMarkerInlet:
+
+    def __init__(self, replay):
+        self.replay = replay
+
+    def pull_sample(self, timeout=32000000.0):
+        replay = self.replay
+        # the previous marker has been handled
+        with replay.condition:
+            if replay.marker_pending:
+                replay.marker_pending = False
+                replay.advance()
+
+        event = replay.wait_for(MARKER, timeout)
+        if event is None:
+            return None, None
+
+        with replay.condition:
+            if replay.hold_markers:
+                replay.marker_pending = True
+            else:
+                replay.advance()
+        return [event[2]], event[1]
+
+    # replayed timestamps need no clock correction
+    def time_correction(self, timeout=None):
+        return 0.0
@@ -0,0 +1,53 @@
+from collections import namedtuple
+from pylsl import ContinuousResolver
+from PyQt5.QtCore import pyqtSignal, QThread
+import src.data.config as config
+
+# Metadata of one available LSL stream
+StreamMetadata = namedtuple('StreamMetadata', ['name', 'type', 'channel_count', 'nominal_srate', 'source_id',
+                                               'hostname'])
+
+
+# Verifies if requested streams are among
+# the available stream names
+# Returns (EEG stream available, marker stream available).
+def check_streams(stream_names):
+    # a replayed session needs no LSL streams
+    if config.replay_session:
+        return True, True
+
+    eeg_status = config.eeg_stream_name in stream_names
+    marker_status = config.marker_stream_name in stream_names
+    return eeg_status, marker_status
+
+
+# Keeps an up-to-date list of available LSL streams
+# using a continuous resolver running in the background,
+# so that the GUI thread never waits for stream resolution
+# Changes are announced by the streams_changed signal
+# (dict stream name -> StreamMetadata).
+# On-line BASIL SSVEP BCI
+class StreamDiscovery(QThread):
+    streams_changed = pyqtSignal(object)
+
+    def __init__(self):
+        super(StreamDiscovery, self).__init__()
+        self.running = False
+        self.streams = {}
+
+    def run(self):
+        self.running = True
+        resolver = ContinuousResolver(forget_after=config.discovery_forget_after)
+
+        while self.running:
+            streams = {}
+            for info in resolver.results():
+                streams[info.name()] = StreamMetadata(info.name(), info.type(), info.channel_count(),
+                                                      info.nominal_srate(), info.source_id(), info.hostname())
+            if streams != self.streams:
+                self.streams = streams
+                self.streams_changed.emit(dict(streams))
+            self.msleep(config.discovery_interval)
+
+    def stop(self):
+        self.running = False
@@ -0,0 +1,283 @@
+import argparse
+import json
+import sys
+import threading
+import time
+import numpy as np
+from pylsl import StreamInfo, StreamOutlet, local_clock
+import src.data.config as config
+
+
+# Synthetic EEG and marker source for load testing
+# Pushes timed chunks of synthetic EEG (SSVEP responses to scripted
+# targets, white or pink noise, line noise and blinks) together with
+# the start / stop markers of the trials, for any number of channels,
+# sampling rates and streams, without any hardware.
+# The number of samples pushed follows the clock (not the sleeps),
+# so the nominal rate is kept even when the process is late.
+# Usage (from the repository root):
+#   python -m src.data.synthetic_source [--channels 64] [--rate 2000] [--streams 4] ...
+# On-line BASIL SSVEP BCI
+
+# marker announcing the target of the next trial (label 1 .. n_targets)
+LABEL_MARKER = 'L%3d'
+
+
+# Synthetic multichannel EEG generated chunk by chunk
+# (the signals continue seamlessly from chunk to chunk)
+class SyntheticEeg:
+
+    def __init__(self, n_channels, s_rate, frequencies, n_harmonics=2, amplitude=2.0, noise='pink',
+                 noise_level=10.0, line_frequency=50.0, line_level=0.0, blink_rate=0.0, blink_amplitude=200.0,
+                 seed=0):
+        self.n_channels = n_channels
+        self.s_rate = float(s_rate)
+        self.frequencies = list(frequencies)
+        self.amplitude = amplitude
+        self.noise = noise
+        self.noise_level = noise_level
+        self.line_frequency = line_frequency
+        self.line_level = line_level
+        self.blink_rate = blink_rate
+        self.blink_amplitude = blink_amplitude
+        self.rng = np.random.RandomState(seed)
+
+        # SSVEP strength and phase per channel (strongest on the last, i.e. occipital, channels)
+        self.gains = np.linspace(0.3, 1, n_channels) * self.rng.uniform(0.8, 1.2, n_channels)
+        self.phases = self.rng.uniform(0, 2 * np.pi, n_channels)
+        # harmonics with decreasing amplitude
+        self.harmonics = np.arange(1, n_harmonics + 1)
+        self.harmonic_gains = 1.0 / self.harmonics
+        # blinks: strongest on the first (frontal) channels
+        self.blink_gains = np.exp(-np.arange(n_channels) / 2.0)
+        self.blink_shape = np.hanning(max(3, int(0.3 * self.s_rate)))
+        # blink samples still to be added to the next chunks (samples x channels)
+        self.pending_blink = np.zeros((0, n_channels))
+
+        self.pink_sos = None
+        self.pink_state = None
+        if noise == 'pink':
+            from scipy.signal import tf2sos, sosfilt
+            # approximately 1/f noise from white noise (filter by P. Kellet),
+            # scaled to the unit standard deviation
+            self.pink_sos = tf2sos([0.049922035, -0.095993537, 0.050612699, -0.004408786],
+                                   [1, -2.494956002, 2.017265875, -0.522189400])
+            impulse = np.zeros(100000)
+            impulse[0] = 1
+            self.pink_scale = 1.0 / np.sqrt(np.sum(sosfilt(self.pink_sos, impulse) ** 2))
+            self.pink_state = np.zeros((self.pink_sos.shape[0], 2, n_channels))
+        # index of the next sample
+        self.n = 0
+
+    # Next n_samples samples (samples x channels, float32)
+    # target - index of the attended target (None = no stimulation)
+    def chunk(self, n_samples, target=None):
+        t = (self.n + np.arange(n_samples)) / self.s_rate
+        data = self.rng.randn(n_samples, self.n_channels)
+        if self.pink_sos is not None:
+            from scipy.signal import sosfilt
+            data, self.pink_state = sosfilt(self.pink_sos, data, axis=0, zi=self.pink_state)
+            data *= self.pink_scale
+        data *= self.noise_level
+
+        if target is not None:
+            frequency = self.frequencies[target]
+            # time x harmonics x channels
+            angles = 2 * np.pi * frequency * t[:, np.newaxis, np.newaxis] * self.harmonics[:, np.newaxis] + \
+                self.phases * self.harmonics[:, np.newaxis]
+            response = np.dot(np.sin(angles).transpose(0, 2, 1), self.harmonic_gains)
+            data += self.amplitude * self.gains * response
+
+        if self.line_level > 0:
+            data += self.line_level * np.sin(2 * np.pi * self.line_frequency * t)[:, np.newaxis]
+
+        self.add_blinks(data)
+        self.n += n_samples
+        return np.ascontiguousarray(data, dtype=np.float32)
+
+    # Blinks start at random (Poisson) times, a blink may continue into the next chunks
+    def add_blinks(self, data):
+        n_samples = data.shape[0]
+        pending = self.pending_blink
+        if self.blink_rate > 0:
+            onsets = np.flatnonzero(self.rng.rand(n_samples) < self.blink_rate / self.s_rate)
+            if onsets.size:
+                length = max(pending.shape[0], onsets[-1] + self.blink_shape.size)
+                pending = np.vstack((pending, np.zeros((length - pending.shape[0], self.n_channels))))
+                for onset in onsets:
+                    pending[onset:onset + self.blink_shape.size] += \
+                        self.blink_amplitude * np.outer(self.blink_shape, self.blink_gains)
+        n_blink = min(n_samples, pending.shape[0])
+        data[:n_blink] += pending[:n_blink]
+        self.pending_blink = pending[n_blink:]
+
+
+# Scripted trials: label (0-based target index) of each trial,
+# stimulation and rest lengths [s]
+# Returns the target of every sample range as a list of
+# (first sample, last sample + 1, target or None) and the markers
+# as a list of (sample, marker).
+def make_script(labels, trial_length, rest_length, s_rate):
+    segments, markers = [], []
+    n = int(rest_length * s_rate)
+    segments.append((0, n, None))
+    for label in labels:
+        trial = int(trial_length * s_rate)
+        rest = int(rest_length * s_rate)
+        markers.append((n, LABEL_MARKER % (label + 1)))
+        markers.append((n, 'S  1'))
+        markers.append((n + trial, 'S  2'))
+        segments.append((n, n + trial, label))
+        segments.append((n + trial, n + trial + rest, None))
+        n += trial + rest
+    return segments, markers
+
+
+# One EEG stream with its marker stream, pushed by its own thread
+class SyntheticSource(threading.Thread):
+
+    def __init__(self, eeg_name, marker_name, generator, labels, trial_length, rest_length, chunk_length,
+                 loop=False):
+        super(SyntheticSource, self).__init__(daemon=True)
+        self.generator = generator
+        self.eeg_name = eeg_name
+        self.marker_name = marker_name
+        self.s_rate = generator.s_rate
+        self.loop = loop
+        self.segments, self.markers = make_script(labels, trial_length, rest_length, self.s_rate)
+        self.script_length = self.segments[-1][1]
+
+        info = StreamInfo(eeg_name, 'EEG', generator.n_channels, self.s_rate, 'float32', eeg_name + '_synthetic')
+        self.eeg_outlet = StreamOutlet(info)
+        info = StreamInfo(marker_name, 'Markers', 1, 0, 'string', marker_name + '_synthetic')
+        self.marker_outlet = StreamOutlet(info)
+
+        self.chunk_samples = max(1, int(chunk_length * self.s_rate))
+        self.running = True
+        self.sent = 0
+        self.late_chunks = 0
+        self.start_time = None
+        self.end_time = None
+
+    # Script segment (first, last, target) containing sample n of the script
+    def segment_at(self, n):
+        return next(segment for segment in self.segments if segment[0] <= n < segment[1])
+
+    # Sample and marker k (markers of the repeated script follow the first ones)
+    def marker_at(self, k):
+        sample, marker = self.markers[k % len(self.markers)]
+        return sample + (k // len(self.markers)) * self.script_length, marker
+
+    def run(self):
+        # LSL time of sample 0
+        self.start_time = local_clock()
+        end = None if self.loop else self.script_length
+        next_marker = 0
+        while self.running and (end is None or self.sent < end):
+            # samples due by now
+            due = int((local_clock() - self.start_time) * self.s_rate)
+            if end is not None:
+                due = min(due, end)
+            if due - self.sent < self.chunk_samples and due != end:
+                time.sleep(max(0.0, (self.sent + self.chunk_samples) / self.s_rate -
+                               (local_clock() - self.start_time)))
+                continue
+            if due - self.sent > 2 * self.chunk_samples:
+                self.late_chunks += 1
+
+            # the due samples are split at the trial boundaries
+            while self.sent < due:
+                offset = self.sent % self.script_length
+                first, last, target = self.segment_at(offset)
+                n_samples = min(due - self.sent, last - offset)
+
+                # markers up to the end of this part, timestamped by their sample
+                while next_marker < len(self.markers) or (self.loop and self.markers):
+                    sample, marker = self.marker_at(next_marker)
+                    if sample >= self.sent + n_samples:
+                        break
+                    self.marker_outlet.push_sample([marker], self.start_time + sample / self.s_rate)
+                    next_marker += 1
+
+                chunk = self.generator.chunk(n_samples, target)
+                self.sent += n_samples
+                self.eeg_outlet.push_chunk(chunk, self.start_time + (self.sent - 1) / self.s_rate)
+        self.end_time = local_clock()
+
+    def stop(self):
+        self.running = False
+
+    # Achieved rate [samples / s] since the start
+    def achieved_rate(self):
+        if self.start_time is None:
+            return 0.0
+        elapsed = (self.end_time if self.end_time is not None else local_clock()) - self.start_time
+        return self.sent / elapsed if elapsed > 0 else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Synthetic SSVEP EEG and marker streams for load testing')
+    parser.add_argument('--channels', type=int, default=8, help='number of EEG channels')
+    parser.add_argument('--rate', type=float, default=1000, help='sampling rate [Hz]')
+    parser.add_argument('--chunk', type=float, default=0.02, help='chunk length [s]')
+    parser.add_argument('--streams', type=int, default=1,
+                        help='number of stream pairs (several pairs are named <name>_1, <name>_2, ...)')
+    parser.add_argument('--frequencies', type=float, nargs='+', default=config.frequencies,
+                        help='target frequencies [Hz]')
+    parser.add_argument('--harmonics', type=int, default=2, help='number of harmonics of the SSVEP response')
+    parser.add_argument('--amplitude', type=float, default=2.0, help='SSVEP amplitude [uV]')
+    parser.add_argument('--noise', choices=['white', 'pink'], default='pink', help='background noise model')
+    parser.add_argument('--noise-level', type=float, default=10.0, help='noise standard deviation [uV]')
+    parser.add_argument('--line-level', type=float, default=0.0, help='line noise amplitude [uV]')
+    parser.add_argument('--line-frequency', type=float, default=50.0, help='line noise frequency [Hz]')
+    parser.add_argument('--blink-rate', type=float, default=0.0, help='blinks per second')
+    parser.add_argument('--blink-amplitude', type=float, default=200.0, help='blink amplitude [uV]')
+    parser.add_argument('--labels', type=int, nargs='+',
+                        help='attended targets of the trials (1 .. number of targets), random by default')
+    parser.add_argument('--trials', type=int, default=6, help='number of random trials (without --labels)')
+    parser.add_argument('--trial-length', type=float, default=4, help='stimulation length [s]')
+    parser.add_argument('--rest-length', type=float, default=2, help='pause between trials [s]')
+    parser.add_argument('--loop', action='store_true', help='repeat the trials until interrupted')
+    parser.add_argument('--seed', type=int, default=0, help='random seed')
+    parser.add_argument('--profiles', help='write pipeline profiles for the streams (see config.pipelines)')
+    args = parser.parse_args()
+
+    sources = []
+    profiles = []
+    for index in range(args.streams):
+        rng = np.random.RandomState(args.seed + index)
+        if args.labels:
+            labels = [label - 1 for label in args.labels]
+        else:
+            labels = list(rng.randint(0, len(args.frequencies), args.trials))
+        suffix = '' if args.streams == 1 else '_' + str(index + 1)
+        generator = SyntheticEeg(args.channels, args.rate, args.frequencies, args.harmonics, args.amplitude,
+                                 args.noise, args.noise_level, args.line_frequency, args.line_level,
+                                 args.blink_rate, args.blink_amplitude, args.seed + index)
+        sources.append(SyntheticSource(config.eeg_stream_name + suffix, config.marker_stream_name + suffix,
+                                       generator, labels, args.trial_length, args.rest_length, args.chunk,
+                                       args.loop))
+        profiles.append({'name': 'synthetic' + suffix, 'eeg_stream_name': config.eeg_stream_name + suffix,
+                         'marker_stream_name': config.marker_stream_name + suffix})
+        print(json.dumps({'stream': config.eeg_stream_name + suffix, 'labels': [int(label) + 1 for label in labels]}))
+        sys.stdout.flush()
+
+    if args.profiles:
+        with open(args.profiles, 'w') as f:
+            json.dump(profiles, f, indent=1)
+
+    for source in sources:
+        source.start()
+    try:
+        while any(source.is_alive() for source in sources):
+            time.sleep(1)
+            for source in sources:
+                print('%s: %d samples, %.1f Hz, %d late' % (source.eeg_name, source.sent, source.achieved_rate(),
+                                                            source.late_chunks), file=sys.stderr)
+    except KeyboardInterrupt:
+        for source in sources:
+            source.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,242 @@
+import csv
+import os
+import threading
+import time
+from datetime import datetime
+import src.data.config as config
+import src.processing.eeg_process as eeg_process
+import src.processing.streaming as streaming
+import src.processing.stopping as stopping
+import src.processing.trca as trca
+import src.processing.worker as worker
+from src.data import colect_lsl_eeg, collect_lsl_markers, lsl_feedback, session, results_log
+from src.engine.signal import Signal
+
+
+# Qt-free on-line classification engine
+# Connects EEG and marker collection, processing, streaming
+# classification, dynamic stopping, session recording, calibration
+# and result logging. Results are published by plain signals
+# (callbacks called in the collector / worker threads), so the engine
+# runs without any GUI (see src/headless.py) and the GUI forwards
+# them to its own thread (see src/processing/controller.py).
+# Several engines with their own settings run in one process
+# as independent pipelines (see src/engine/pipelines.py).
+# On-line BASIL SSVEP BCI
+class Engine:
+
+    # settings - pipeline settings (see src/engine/settings.py), config by default
+    def __init__(self, settings=None):
+        self.config = settings if settings is not None else config
+        # pipeline name (None for the single pipeline configured by config)
+        self.name = settings.name if settings is not None else None
+
+        # Connects marker collector with EEG data source and processor
+        self.eeg_collector = colect_lsl_eeg.CollectLslEeg(settings)
+        self.eeg_processor = eeg_process.EEGProcessor(settings)
+        self.processing_worker = None
+        if self.config.asynchronous_processing:
+            self.processing_worker = worker.ProcessingWorker(self.eeg_processor, settings)
+        self.marker_collector = collect_lsl_markers.CollectLslMarkers(self, self.eeg_collector, self.eeg_processor,
+                                                                      self.processing_worker, settings)
+        self.stream_classifier = None
+        if self.config.streaming_classification and self.config.chunked_acquisition:
+            self.stream_classifier = streaming.StreamingClassifier(settings)
+            self.eeg_collector.stream_classifier = self.stream_classifier
+
+        # ends the stimulation as soon as the running estimate is confident enough
+        self.dynamic_stopping = None
+        self.feedback = None
+        if self.stream_classifier is not None and self.config.dynamic_stopping:
+            self.dynamic_stopping = stopping.DynamicStopping(settings)
+            self.feedback = lsl_feedback.LslFeedback(settings)
+        self.running = False
+
+        # replay a recorded session instead of LSL streams,
+        # or record the current one
+        self.session_recorder = None
+        if self.config.replay_session:
+            replay = session.SessionReplay(self.config.replay_session, self.config.replay_speed,
+                                           not self.config.epoch_by_timestamps)
+            self.eeg_collector.replay = replay
+            self.marker_collector.replay = replay
+        elif self.config.record_sessions:
+            os.makedirs(self.config.session_directory, exist_ok=True)
+            self.session_recorder = session.SessionRecorder(os.path.join(
+                self.config.session_directory, 'session_' + datetime.now().strftime('%Y%m%d_%H%M%S') + '.bssn'))
+            self.eeg_collector.session_recorder = self.session_recorder
+            self.marker_collector.session_recorder = self.session_recorder
+
+        # labelled trials for the TRCA model
+        self.calibration = None
+        self.calibration_trial = None
+        if self.config.trca_calibration:
+            self.calibration = trca.TrcaCalibration(self.config.frequencies, self.config.trca_calibration_trials)
+
+        # published signals:
+        # predicted class, result, frequencies, power spectrum, confidence
+        self.results = Signal()
+        # complete record of a classified trial (dict, see src/data/results_log.py)
+        self.trial_result = Signal()
+        # elapsed time [s], predicted class, result, confidence, decided (dynamic stopping)
+        self.stream_results = Signal()
+        # feedback (correct class) expected (bool)
+        self.feedback_status = Signal()
+        # status messages (str)
+        self.status = Signal()
+        # method name, method results
+        self.partial_results = self.eeg_processor.set_partial_results
+        # marker timeout in progress [s] (0 = none)
+        self.timeout = self.marker_collector.send_timeout_signal
+
+        self.eeg_processor.set_results_signal.connect(self.results.emit)
+        self.eeg_processor.set_trial_record.connect(self.set_trial_record)
+        self.marker_collector.trial_done.connect(self.job_done)
+        self.marker_collector.add_status_signal.connect(self.status.emit)
+        self.eeg_collector.add_status_signal.connect(self.status.emit)
+        self.marker_collector.set_feedback_status.connect(self.set_feedback_status)
+        if self.processing_worker is not None:
+            self.processing_worker.add_status_signal.connect(self.status.emit)
+            self.processing_worker.job_done.connect(self.job_done)
+            self.processing_worker.job_dropped.connect(self.job_dropped)
+        if self.stream_classifier is not None:
+            self.stream_classifier.set_stream_results.connect(self.set_stream_results)
+
+        # typed trial records (trial id -> column values) waiting for the user feedback
+        # (updated from the collector and worker threads)
+        self.lock = threading.Lock()
+        self.trial_records = dict()
+        self.last_trial_id = None
+        os.makedirs(self.config.results_directory, exist_ok=True)
+        self.results_log = results_log.ResultsLogger(os.path.join(
+            self.config.results_directory, 'results_' + datetime.now().strftime('%Y%m%d_%H%M%S') + '.bres'),
+            settings=settings)
+        self.logs_closed = False
+
+        # time series of running estimates during the stimulation
+        self.stream_f = None
+        self.stream_writer = None
+        if self.stream_classifier is not None:
+            self.stream_f = open(self.config.stream_results_path, 'a', newline='')
+            self.stream_writer = csv.writer(self.stream_f)
+
+    # Collects EEG and markers until the marker stream times out
+    # or stop() is called
+    def run(self):
+        # Start everything
+        self.running = True
+        self.eeg_collector.running = True
+        self.marker_collector.running = True
+        if self.processing_worker is not None:
+            self.processing_worker.start()
+        self.marker_collector.start()
+        self.eeg_collector.start()
+
+        # Wait for jobs done
+        self.eeg_collector.wait()
+        self.marker_collector.wait()
+        if self.processing_worker is not None:
+            self.processing_worker.stop()
+            self.processing_worker.wait()
+        if self.session_recorder is not None:
+            self.session_recorder.close()
+        self.running = False
+
+    # Force stop
+    def stop(self):
+        self.eeg_collector.running = False
+        self.marker_collector.running = False
+
+    # Received a running estimate during the stimulation
+    def set_stream_results(self, elapsed, predicted_class, result, confidence):
+        decided = False
+        if self.dynamic_stopping is not None:
+            with self.lock:
+                decided = self.dynamic_stopping.update(elapsed, predicted_class, result, confidence) is not None
+            if decided:
+                # publish the decision and let the stimulation end the flicker
+                self.feedback.send(self.config.early_stop_marker)
+
+        self.stream_writer.writerow([datetime.now().isoformat(), elapsed, predicted_class, confidence, decided] +
+                                    list(result))
+        self.stream_results.emit(elapsed, predicted_class, result, confidence, decided)
+
+    # Received the complete record of a classified trial
+    def set_trial_record(self, record):
+        record['time'] = time.time()
+        with self.lock:
+            self.trial_records.setdefault(record['trial_id'], dict()).update(record)
+
+    # A trial has been classified
+    # (latency - from the stop marker to the result, including queueing)
+    def job_done(self, job, latency):
+        with self.lock:
+            record = self.trial_records.setdefault(job.trial_id, {'trial_id': job.trial_id})
+            record.update({'start_timestamp': job.start_timestamp, 'stop_timestamp': job.stop_timestamp,
+                           'total_ms': latency})
+            self.last_trial_id = job.trial_id
+            if self.calibration is not None:
+                self.calibration_trial = job
+            record = dict(record)
+        self.trial_result.emit(record)
+        self.set_feedback_status(True)
+
+    # A trial has been dropped by the processing worker (queue full)
+    def job_dropped(self, job):
+        with self.lock:
+            record = self.trial_records.setdefault(job.trial_id, {'trial_id': job.trial_id})
+            record.update({'time': time.time(), 'start_timestamp': job.start_timestamp,
+                           'stop_timestamp': job.stop_timestamp, 'dropped': 1})
+
+    # Add the labelled trial to the calibration
+    # and (re)train the TRCA model once there are enough trials
+    def calibrate(self, job, label):
+        self.calibration.add(job.eeg_data, label)
+        if not self.calibration.ready():
+            self.status.emit('Calibration: missing trials ' + str(self.calibration.missing()))
+            return
+
+        model = self.calibration.fit(job.s_rate)
+        model.save(self.config.trca_model_path)
+        self.eeg_processor.trca_model = model
+        self.status.emit('TRCA model trained from %d trials' % len(self.calibration.trials))
+
+    # Processing finished (feedback expected) or a new trial started
+    def set_feedback_status(self, status):
+        # if a new trial started, log the finished trials
+        if not status:
+            if self.dynamic_stopping is not None:
+                with self.lock:
+                    self.dynamic_stopping.reset()
+            self.log_trials()
+        self.feedback_status.emit(status)
+
+    # Pass all finished trials to the results log
+    def log_trials(self):
+        with self.lock:
+            records = [self.trial_records[trial_id] for trial_id in sorted(self.trial_records.keys())]
+            self.trial_records.clear()
+        for record in records:
+            self.results_log.log(record)
+
+    # Log the remaining trials and close all logs
+    def close_logs(self):
+        if self.logs_closed:
+            return
+        self.logs_closed = True
+        self.log_trials()
+        self.results_log.close()
+        if self.stream_f is not None:
+            self.stream_f.close()
+
+    # Based on the user feedback, set the class of object
+    # that the user focused on
+    def set_correct_class(self, correct_class):
+        label = self.config.names.index(correct_class)
+        with self.lock:
+            if self.last_trial_id in self.trial_records:
+                self.trial_records[self.last_trial_id]['feedback'] = label + 1
+            job = self.calibration_trial
+            self.calibration_trial = None
+        if job is not None:
+            self.calibrate(job, label)
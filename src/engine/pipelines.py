@@ -0,0 +1,78 @@
+import threading
+import numpy as np
+import src.processing.parallel as parallel
+from src.engine.engine import Engine
+from src.engine.settings import Settings
+
+
+# Trial latencies of one pipeline
+# (from the stop marker to the result [ms], including queueing)
+class LatencyStats:
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.total_ms = []
+        self.process_ms = []
+
+    def add(self, record):
+        with self.lock:
+            self.total_ms.append(record.get('total_ms', np.nan))
+            self.process_ms.append(record.get('process_ms', np.nan))
+
+    # Number of trials and latency percentiles [ms]
+    def summary(self):
+        with self.lock:
+            total_ms = np.array(self.total_ms, dtype=np.float64)
+            process_ms = np.array(self.process_ms, dtype=np.float64)
+        if total_ms.size == 0:
+            return {'trials': 0}
+        return {'trials': int(total_ms.size), 'median_ms': float(np.nanmedian(total_ms)),
+                'p95_ms': float(np.nanpercentile(total_ms, 95)), 'max_ms': float(np.nanmax(total_ms)),
+                'process_median_ms': float(np.nanmedian(process_ms))}
+
+
+# Independent pipelines in one process
+# Each profile (see config.pipelines) gets its own engine with its own
+# EEG / marker streams, settings and results log; the engines run
+# in their own threads and share the process pool of the parallel
+# classification (src/processing/parallel.py) and the reference
+# template cache. Trial latencies are collected per pipeline.
+# On-line BASIL SSVEP BCI
+class Pipelines:
+
+    def __init__(self, profiles):
+        settings = [Settings(profile) for profile in profiles]
+        names = [pipeline_settings.name for pipeline_settings in settings]
+        if len(set(names)) != len(names):
+            raise ValueError('Pipeline names are not unique: ' + ', '.join(names))
+        self.engines = [Engine(pipeline_settings) for pipeline_settings in settings]
+        self.latencies = dict()
+        for engine in self.engines:
+            self.latencies[engine.name] = LatencyStats()
+            engine.trial_result.connect(self.latencies[engine.name].add)
+        self.threads = []
+
+    # Runs all pipelines until all of them stop
+    def run(self):
+        self.threads = [threading.Thread(target=engine.run, name='pipeline-' + engine.name)
+                        for engine in self.engines]
+        for thread in self.threads:
+            thread.start()
+        for thread in self.threads:
+            thread.join()
+
+    def is_running(self):
+        return any(thread.is_alive() for thread in self.threads)
+
+    def stop(self):
+        for engine in self.engines:
+            engine.stop()
+
+    def close_logs(self):
+        for engine in self.engines:
+            engine.close_logs()
+        parallel.shutdown()
+
+    # Latency summary of each pipeline (name -> summary)
+    def latency_report(self):
+        return {name: stats.summary() for name, stats in self.latencies.items()}
@@ -0,0 +1,52 @@
+import os
+import src.data.config as config
+
+
+# Settings of one pipeline (see src/engine/pipelines.py)
+# The values of the profile override the settings of src/data/config.py,
+# all other settings are read from it when they are used (runtime
+# changes of config are followed). Files of the pipeline get
+# a default placed by the pipeline name, so that several pipelines
+# never write into the same results log, session or spool.
+# On-line BASIL SSVEP BCI
+
+# settings used by module-level processing functions and the shared
+# process pool; they are common to all pipelines of the process
+SHARED = ['frequencies', 'names', 'fq_interval', 'fq_baseline', 'psd_fast_length', 'psd_welch', 'psd_welch_segment',
+          'fft_workers', 'fbcca_bands', 'fbcca_order', 'fbcca_padding', 'fbcca_weight_a', 'fbcca_weight_b',
+          'reference_cache_size', 'parallel_workers', 'pipelines']
+
+# settings stored in a subdirectory named by the pipeline
+DIRECTORIES = ['results_directory', 'session_directory', 'spool_directory']
+
+
+class Settings:
+
+    def __init__(self, profile):
+        profile = dict(profile)
+        self.name = str(profile.pop('name', ''))
+        if not self.name:
+            raise ValueError('Pipeline profile without a name')
+        for setting in profile:
+            if not hasattr(config, setting):
+                raise ValueError('Unknown setting %s in pipeline %s' % (setting, self.name))
+            if setting in SHARED:
+                raise ValueError('Setting %s is shared by all pipelines (pipeline %s)' % (setting, self.name))
+        self.profile = profile
+
+    def __getattr__(self, setting):
+        # (called for missing attributes only, e.g. before __init__ when unpickled)
+        if setting == 'profile':
+            raise AttributeError(setting)
+        if setting in self.profile:
+            return self.profile[setting]
+        if setting in DIRECTORIES:
+            return os.path.join(getattr(config, setting), self.name)
+        if setting == 'stream_results_path':
+            return os.path.join(self.results_directory, os.path.basename(config.stream_results_path))
+        if setting == 'trca_model_path':
+            directory, file_name = os.path.split(config.trca_model_path)
+            return os.path.join(directory, self.name + '_' + file_name)
+        if setting == 'feedback_stream_name':
+            return config.feedback_stream_name + '_' + self.name
+        return getattr(config, setting)
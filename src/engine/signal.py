@@ -0,0 +1,24 @@
+import threading
+
+
+# Qt-free signal
+# Callbacks are called directly in the emitting thread;
+# GUI code forwards them to its own thread (see src/gui/qt_bridge.py).
+# On-line BASIL SSVEP BCI
+class Signal:
+
+    def __init__(self):
+        self.callbacks = []
+        self.lock = threading.Lock()
+
+    def connect(self, callback):
+        with self.lock:
+            self.callbacks = self.callbacks + [callback]
+
+    def disconnect(self, callback):
+        with self.lock:
+            self.callbacks = [connected for connected in self.callbacks if connected != callback]
+
+    def emit(self, *args):
+        for callback in self.callbacks:
+            callback(*args)
@@ -0,0 +1,32 @@
+import threading
+import time
+
+
+# Qt-free replacement of QThread for the acquisition and processing loops
+# (start() runs run() in a new thread, so it can be started again
+# once finished)
+# On-line BASIL SSVEP BCI
+class Thread:
+
+    def __init__(self):
+        self.thread = None
+
+    def run(self):
+        pass
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    # Wait until run() returns
+    def wait(self, timeout=None):
+        if self.thread is not None:
+            self.thread.join(timeout)
+        return not self.isRunning()
+
+    def isRunning(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    @staticmethod
+    def msleep(milliseconds):
+        time.sleep(milliseconds / 1000.0)
@@ -0,0 +1,21 @@
+from PyQt5 import QtCore
+from PyQt5.QtCore import pyqtSignal
+
+
+# Calls callbacks of the Qt-free engine signals in the GUI thread
+# wrap(callback) returns a function that can be connected to an engine
+# signal; when it is called from another thread, the call is queued
+# and executed by the event loop of the thread owning the forwarder.
+# On-line BASIL SSVEP BCI
+class GuiForwarder(QtCore.QObject):
+    forwarded = pyqtSignal(object, object)
+
+    def __init__(self):
+        super(GuiForwarder, self).__init__()
+        self.forwarded.connect(self.call)
+
+    def call(self, callback, args):
+        callback(*args)
+
+    def wrap(self, callback):
+        return lambda *args: self.forwarded.emit(callback, args)
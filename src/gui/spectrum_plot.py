@@ -0,0 +1,61 @@
+from PyQt5 import QtWidgets
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+import src.data.config as config
+
+
+# Persistent SSVEP spectrum plot
+# The figure, canvas, target lines and labels are created once;
+# new spectra only replace the line data and are drawn by blitting
+# the line over a cached background. The axes (and background)
+# are redrawn only when the amplitude range changes considerably.
+# On-line BASIL SSVEP BCI
+class SpectrumPlot:
+    min_freq = 2
+    max_freq = 25
+
+    def __init__(self, graphics_view):
+        self.figure = Figure()
+        self.axes = self.figure.gca()
+        self.axes.set_title("SSVEP channel spectra")
+        self.axes.set_xlabel('Frequencies [Hz]')
+        self.axes.set_ylabel('Amplitudes')
+        self.axes.set_xlim(self.min_freq, self.max_freq)
+        self.line, = self.axes.plot([], [], animated=True)
+
+        # Show vertical lines corresponding to frequencies
+        # (labels are placed relative to the axes height, so they do not move with the data)
+        for i in range(0, len(config.frequencies)):
+            self.axes.axvline(x=config.frequencies[i], color='r', alpha=0.5)
+            self.axes.text(config.frequencies[i], 0.75, config.names[i], rotation=90, color='r',
+                           verticalalignment='bottom', transform=self.axes.get_xaxis_transform())
+
+        self.canvas = FigureCanvas(self.figure)
+        self.scene = QtWidgets.QGraphicsScene()
+        self.scene.addWidget(self.canvas)
+        graphics_view.setScene(self.scene)
+
+        self.background = None
+        self.canvas.mpl_connect('draw_event', self.on_draw)
+
+    # Full redraw happened (e.g. new limits or resize) -> cache the background
+    def on_draw(self, event):
+        self.background = self.canvas.copy_from_bbox(self.axes.bbox)
+        self.axes.draw_artist(self.line)
+
+    # Display a new spectrum
+    def update(self, freqs, amplitudes):
+        subset_fq = (freqs > self.min_freq) & (freqs <= self.max_freq)
+        amplitudes = amplitudes[subset_fq]
+        self.line.set_data(freqs[subset_fq], amplitudes)
+
+        top = max(amplitudes) if len(amplitudes) > 0 else 0
+        y_min, y_max = self.axes.get_ylim()
+        if self.background is None or top > y_max or top < 0.5 * y_max:
+            self.axes.set_ylim(0, 1.1 * top if top > 0 else 1)
+            self.canvas.draw()
+            return
+
+        self.canvas.restore_region(self.background)
+        self.axes.draw_artist(self.line)
+        self.canvas.blit(self.axes.bbox)
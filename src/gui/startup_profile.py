@@ -0,0 +1,42 @@
+import cProfile
+import io
+import pstats
+import sys
+import time
+
+
+# Startup profile of the GUI (main.py --profile-startup)
+# Records the time of the startup phases since the start of main.py
+# and the most expensive calls (cProfile) until the application is ready.
+# On-line BASIL SSVEP BCI
+class StartupProfile:
+
+    def __init__(self, start, enabled):
+        self.start = start
+        self.enabled = enabled
+        self.phases = []
+        self.profiler = None
+        if enabled:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+
+    # Startup phase finished
+    def mark(self, phase):
+        if self.enabled:
+            self.phases.append((phase, time.perf_counter() - self.start))
+
+    # Print the phases and the top calls by cumulative time
+    def report(self, n_calls=25):
+        if not self.enabled:
+            return
+        self.profiler.disable()
+        print('Startup profile [s since the start of main.py]:', file=sys.stderr)
+        previous = 0
+        for phase, elapsed in self.phases:
+            print('  %-32s %7.3f  (+%.3f)' % (phase, elapsed, elapsed - previous), file=sys.stderr)
+            previous = elapsed
+
+        stream = io.StringIO()
+        pstats.Stats(self.profiler, stream=stream).sort_stats('cumulative').print_stats(n_calls)
+        print(stream.getvalue(), file=sys.stderr)
+        self.enabled = False
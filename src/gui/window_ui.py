@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+
+# Form implementation generated from reading ui file 'gui/window.ui'
+#
+# Created by: PyQt5 UI code generator 5.15.11
+#
+# WARNING: Any manual changes made to this file will be lost when pyuic5 is
+# run again.  Do not edit this file unless you know what you are doing.
+
+
+from PyQt5 import QtCore, QtGui, QtWidgets
+
+
+class Ui_pbCorrect(object):
+    def setupUi(self, pbCorrect):
+        pbCorrect.setObjectName("pbCorrect")
+        pbCorrect.resize(1118, 849)
+        pbCorrect.setStatusTip("")
+        self.centralwidget = QtWidgets.QWidget(pbCorrect)
+        self.centralwidget.setObjectName("centralwidget")
+        self.pbConfidence = QtWidgets.QProgressBar(self.centralwidget)
+        self.pbConfidence.setGeometry(QtCore.QRect(180, 490, 221, 23))
+        font = QtGui.QFont()
+        font.setPointSize(12)
+        self.pbConfidence.setFont(font)
+        self.pbConfidence.setProperty("value", 0)
+        self.pbConfidence.setObjectName("pbConfidence")
+        self.lblConfidence = QtWidgets.QLabel(self.centralwidget)
+        self.lblConfidence.setGeometry(QtCore.QRect(20, 490, 161, 16))
+        font = QtGui.QFont()
+        font.setPointSize(12)
+        self.lblConfidence.setFont(font)
+        self.lblConfidence.setObjectName("lblConfidence")
+        self.lblEEG = QtWidgets.QLabel(self.centralwidget)
+        self.lblEEG.setGeometry(QtCore.QRect(880, 580, 101, 16))
+        self.lblEEG.setObjectName("lblEEG")
+        self.label = QtWidgets.QLabel(self.centralwidget)
+        self.label.setGeometry(QtCore.QRect(880, 600, 111, 16))
+        self.label.setObjectName("label")
+        self.lblEEGStatus = QtWidgets.QLabel(self.centralwidget)
+        self.lblEEGStatus.setGeometry(QtCore.QRect(980, 580, 47, 13))
+        font = QtGui.QFont()
+        font.setPointSize(12)
+        font.setBold(True)
+        font.setWeight(75)
+        self.lblEEGStatus.setFont(font)
+        self.lblEEGStatus.setStyleSheet("color:red")
+        self.lblEEGStatus.setObjectName("lblEEGStatus")
+        self.lblMarkerStatus = QtWidgets.QLabel(self.centralwidget)
+        self.lblMarkerStatus.setGeometry(QtCore.QRect(980, 600, 47, 13))
+        font = QtGui.QFont()
+        font.setPointSize(12)
+        font.setBold(True)
+        font.setWeight(75)
+        self.lblMarkerStatus.setFont(font)
+        self.lblMarkerStatus.setStyleSheet("color: red")
+        self.lblMarkerStatus.setObjectName("lblMarkerStatus")
+        self.gbLSLStatus = QtWidgets.QGroupBox(self.centralwidget)
+        self.gbLSLStatus.setGeometry(QtCore.QRect(860, 560, 191, 71))
+        self.gbLSLStatus.setObjectName("gbLSLStatus")
+        self.gbStatusInfo = QtWidgets.QGroupBox(self.centralwidget)
+        self.gbStatusInfo.setGeometry(QtCore.QRect(10, 590, 791, 211))
+        self.gbStatusInfo.setObjectName("gbStatusInfo")
+        self.teStatus = QtWidgets.QTextEdit(self.gbStatusInfo)
+        self.teStatus.setGeometry(QtCore.QRect(10, 20, 771, 181))
+        self.teStatus.setReadOnly(True)
+        self.teStatus.setObjectName("teStatus")
+        self.gbImageGuessed = QtWidgets.QGroupBox(self.centralwidget)
+        self.gbImageGuessed.setGeometry(QtCore.QRect(10, 10, 391, 531))
+        self.gbImageGuessed.setObjectName("gbImageGuessed")
+        self.lblImage = QtWidgets.QLabel(self.gbImageGuessed)
+        self.lblImage.setGeometry(QtCore.QRect(20, 30, 341, 421))
+        self.lblImage.setText("")
+        self.lblImage.setScaledContents(True)
+        self.lblImage.setObjectName("lblImage")
+        self.gvPlots = QtWidgets.QGraphicsView(self.centralwidget)
+        self.gvPlots.setGeometry(QtCore.QRect(420, 40, 651, 501))
+        self.gvPlots.setObjectName("gvPlots")
+        self.lblSpectrum = QtWidgets.QLabel(self.centralwidget)
+        self.lblSpectrum.setGeometry(QtCore.QRect(490, 10, 241, 21))
+        font = QtGui.QFont()
+        font.setPointSize(12)
+        font.setBold(True)
+        font.setWeight(75)
+        self.lblSpectrum.setFont(font)
+        self.lblSpectrum.setObjectName("lblSpectrum")
+        self.sbChannelID = QtWidgets.QSpinBox(self.centralwidget)
+        self.sbChannelID.setGeometry(QtCore.QRect(750, 10, 42, 22))
+        self.sbChannelID.setMinimum(0)
+        self.sbChannelID.setMaximum(3)
+        self.sbChannelID.setObjectName("sbChannelID")
+        self.cbAllChannels = QtWidgets.QCheckBox(self.centralwidget)
+        self.cbAllChannels.setEnabled(True)
+        self.cbAllChannels.setGeometry(QtCore.QRect(830, 10, 111, 17))
+        self.cbAllChannels.setChecked(True)
+        self.cbAllChannels.setObjectName("cbAllChannels")
+        self.gbAppControl = QtWidgets.QGroupBox(self.centralwidget)
+        self.gbAppControl.setGeometry(QtCore.QRect(860, 640, 191, 81))
+        self.gbAppControl.setObjectName("gbAppControl")
+        self.pbStart = QtWidgets.QPushButton(self.gbAppControl)
+        self.pbStart.setEnabled(False)
+        self.pbStart.setGeometry(QtCore.QRect(10, 20, 75, 51))
+        font = QtGui.QFont()
+        font.setPointSize(10)
+        font.setBold(True)
+        font.setWeight(75)
+        self.pbStart.setFont(font)
+        self.pbStart.setObjectName("pbStart")
+        self.pbStop = QtWidgets.QPushButton(self.gbAppControl)
+        self.pbStop.setEnabled(False)
+        self.pbStop.setGeometry(QtCore.QRect(100, 20, 75, 51))
+        font = QtGui.QFont()
+        font.setPointSize(10)
+        font.setBold(True)
+        font.setWeight(75)
+        self.pbStop.setFont(font)
+        self.pbStop.setObjectName("pbStop")
+        self.gbFeedback = QtWidgets.QGroupBox(self.centralwidget)
+        self.gbFeedback.setGeometry(QtCore.QRect(810, 730, 261, 61))
+        self.gbFeedback.setObjectName("gbFeedback")
+        self.pbFeedback1 = QtWidgets.QPushButton(self.gbFeedback)
+        self.pbFeedback1.setEnabled(False)
+        self.pbFeedback1.setGeometry(QtCore.QRect(20, 20, 71, 31))
+        self.pbFeedback1.setObjectName("pbFeedback1")
+        self.pbFeedback2 = QtWidgets.QPushButton(self.gbFeedback)
+        self.pbFeedback2.setEnabled(False)
+        self.pbFeedback2.setGeometry(QtCore.QRect(100, 20, 71, 31))
+        self.pbFeedback2.setObjectName("pbFeedback2")
+        self.pbFeedback3 = QtWidgets.QPushButton(self.gbFeedback)
+        self.pbFeedback3.setEnabled(False)
+        self.pbFeedback3.setGeometry(QtCore.QRect(180, 20, 71, 31))
+        self.pbFeedback3.setObjectName("pbFeedback3")
+        pbCorrect.setCentralWidget(self.centralwidget)
+        self.menubar = QtWidgets.QMenuBar(pbCorrect)
+        self.menubar.setGeometry(QtCore.QRect(0, 0, 1118, 21))
+        self.menubar.setObjectName("menubar")
+        pbCorrect.setMenuBar(self.menubar)
+        self.statusbar = QtWidgets.QStatusBar(pbCorrect)
+        self.statusbar.setObjectName("statusbar")
+        pbCorrect.setStatusBar(self.statusbar)
+
+        self.retranslateUi(pbCorrect)
+        QtCore.QMetaObject.connectSlotsByName(pbCorrect)
+
+    def retranslateUi(self, pbCorrect):
+        _translate = QtCore.QCoreApplication.translate
+        pbCorrect.setWindowTitle(_translate("pbCorrect", "BASIL BCI: Steady state visually evoked potentials"))
+        self.lblConfidence.setText(_translate("pbCorrect", "Classifier confidence:"))
+        self.lblEEG.setText(_translate("pbCorrect", "EEG:"))
+        self.label.setText(_translate("pbCorrect", "Markers:"))
+        self.lblEEGStatus.setText(_translate("pbCorrect", "OFF"))
+        self.lblMarkerStatus.setText(_translate("pbCorrect", "OFF"))
+        self.gbLSLStatus.setTitle(_translate("pbCorrect", "LSL stream availability"))
+        self.gbStatusInfo.setTitle(_translate("pbCorrect", "Status information"))
+        self.gbImageGuessed.setTitle(_translate("pbCorrect", "Classification results:"))
+        self.lblSpectrum.setText(_translate("pbCorrect", "Spectra from EEG channel:"))
+        self.cbAllChannels.setText(_translate("pbCorrect", "Use all channels"))
+        self.gbAppControl.setTitle(_translate("pbCorrect", "Control"))
+        self.pbStart.setText(_translate("pbCorrect", "Start"))
+        self.pbStop.setText(_translate("pbCorrect", "Stop"))
+        self.gbFeedback.setTitle(_translate("pbCorrect", "Optional feedback"))
+        self.pbFeedback1.setText(_translate("pbCorrect", "?"))
+        self.pbFeedback2.setText(_translate("pbCorrect", "?"))
+        self.pbFeedback3.setText(_translate("pbCorrect", "?"))
@@ -0,0 +1,141 @@
+import argparse
+import json
+import signal
+import sys
+import threading
+import src.data.config as config
+
+
+# Headless on-line classification
+# Runs acquisition and classification by the Qt-free engine
+# (no Qt, GUI or matplotlib) and publishes the result of every trial
+# as one JSON line on stdout or as a JSON string on an LSL stream.
+# With config.pipelines (or --pipelines FILE), all pipelines run in this
+# process, messages carry the pipeline name and the latency summary
+# of each pipeline is published at the end.
+# Usage (from the repository root):
+#   python -m src.headless [--output stdout|lsl] [--stream] [--replay SESSION] [--pipelines FILE]
+# On-line BASIL SSVEP BCI
+
+
+# JSON-serializable summary of a trial record
+def trial_message(record):
+    predicted_class = int(record.get('predicted_class', 0))
+    message = {'trial_id': int(record['trial_id']), 'predicted_class': predicted_class,
+               'name': config.names[predicted_class - 1] if 0 < predicted_class <= len(config.names) else None,
+               'confidence': float(record.get('confidence', 0)),
+               'result': [float(value) for value in record.get('result', [])],
+               'start_timestamp': record.get('start_timestamp'), 'stop_timestamp': record.get('stop_timestamp'),
+               'latency_ms': record.get('total_ms')}
+    return message
+
+
+def stream_message(elapsed, predicted_class, result, confidence, decided):
+    return {'elapsed': elapsed, 'predicted_class': predicted_class, 'confidence': confidence,
+            'result': [float(value) for value in result], 'decided': decided}
+
+
+# Writes messages as JSON lines
+class JsonLinesOutput:
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.lock = threading.Lock()
+
+    def publish(self, message):
+        with self.lock:
+            self.stream.write(json.dumps(message) + '\n')
+            self.stream.flush()
+
+
+# Pushes messages as JSON strings to an LSL outlet
+class LslOutput:
+
+    def __init__(self):
+        from pylsl import StreamInfo, StreamOutlet
+        info = StreamInfo(name=config.results_stream_name, type='Markers', channel_count=1,
+                          channel_format='string', source_id=config.results_stream_name + '_001')
+        self.outlet = StreamOutlet(info)
+
+    def publish(self, message):
+        self.outlet.push_sample([json.dumps(message)])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Headless BASIL SSVEP on-line classification')
+    parser.add_argument('--output', choices=['stdout', 'lsl'], default='stdout',
+                        help='where to publish trial results')
+    parser.add_argument('--stream', action='store_true',
+                        help='publish running estimates, too (turns on config.streaming_classification)')
+    parser.add_argument('--replay', help='replay a recorded session instead of LSL streams')
+    parser.add_argument('--speed', type=float, default=1, help='replay speed (0 = as fast as possible)')
+    parser.add_argument('--verbose', action='store_true', help='print status messages to stderr')
+    parser.add_argument('--pipelines', help='JSON file with a list of pipeline profiles (see config.pipelines)')
+    args = parser.parse_args()
+
+    if args.stream:
+        config.streaming_classification = True
+    if args.replay:
+        config.replay_session = args.replay
+        config.replay_speed = args.speed
+    if args.pipelines:
+        with open(args.pipelines) as f:
+            config.pipelines = json.load(f)
+
+    from src.engine.engine import Engine
+    from src.engine.pipelines import Pipelines
+    pipelines = None
+    # invalid settings (ValueError) prevent the start
+    try:
+        if config.pipelines:
+            pipelines = Pipelines(config.pipelines)
+            engines = pipelines.engines
+            runner_target = pipelines.run
+        else:
+            engines = [Engine()]
+            runner_target = engines[0].run
+    except ValueError as error:
+        sys.exit('Cannot start: ' + str(error))
+    output = LslOutput() if args.output == 'lsl' else JsonLinesOutput(sys.stdout)
+
+    for engine in engines:
+        connect_output(engine, output, args)
+
+    def stop():
+        for engine in engines:
+            engine.stop()
+
+    # SIGTERM / Ctrl+C stop the collection, the pending trials are still logged
+    signal.signal(signal.SIGTERM, lambda *ignored: stop())
+    runner = threading.Thread(target=runner_target)
+    runner.start()
+    try:
+        while runner.is_alive():
+            runner.join(0.5)
+    except KeyboardInterrupt:
+        stop()
+        runner.join()
+
+    if pipelines is not None:
+        pipelines.close_logs()
+        for name, summary in pipelines.latency_report().items():
+            output.publish(dict(summary, type='latency', pipeline=name))
+    else:
+        engines[0].close_logs()
+
+
+# Publish the results of an engine
+# (tagged with the pipeline name when there are several pipelines)
+def connect_output(engine, output, args):
+    tag = {} if engine.name is None else {'pipeline': engine.name}
+    engine.trial_result.connect(lambda record: output.publish(dict(trial_message(record), type='trial', **tag)))
+    if args.stream:
+        engine.stream_results.connect(lambda *values: output.publish(dict(stream_message(*values), type='stream',
+                                                                          **tag)))
+    if args.verbose:
+        prefix = '' if engine.name is None else '[' + engine.name + '] '
+        engine.status.connect(lambda message: print(prefix + message, file=sys.stderr))
+
+
+if __name__ == '__main__':
+    main()
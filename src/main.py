@@ -1,21 +1,36 @@
-from PyQt5 import QtWidgets, uic, QtCore, QtGui
+import time
+start_time = time.perf_counter()
+from PyQt5 import QtWidgets, QtCore, QtGui
 from PyQt5.QtWidgets import QApplication, QStatusBar
 import sys
-from matplotlib.figure import Figure
-from matplotlib.backends.backend_qt4agg import FigureCanvasQTAgg as FigureCanvas
-import src.processing.controller as controller
+import threading
+import numpy as np
+from src.gui.window_ui import Ui_pbCorrect
+from src.gui.startup_profile import StartupProfile
+from src.gui.qt_bridge import GuiForwarder
+from src.data.stream_discovery import StreamDiscovery, check_streams
 import src.data.config as config
 from functools import partial
 
+# heavy modules (processing, scipy, sklearn, matplotlib, requests) are imported
+# in a background thread once the window is shown, see PlotWindow.import_modules()
+controller = None
+spectral = None
+parallel = None
+SpectrumPlot = None
+
 
 # Main GUI for BASIL SSVEP
 # Lukas Vareka, 2020
-class PlotWindow(QtWidgets.QMainWindow):
+class PlotWindow(QtWidgets.QMainWindow, Ui_pbCorrect):
     stopping = False
 
-    def __init__(self):
+    def __init__(self, profile=None):
         super(PlotWindow, self).__init__()
-        uic.loadUi('gui/window.ui', self)
+        self.profile = profile if profile is not None else StartupProfile(start_time, False)
+        self.profile.mark('imports')
+        # compiled from gui/window.ui (pyuic5 gui/window.ui -o gui/window_ui.py)
+        self.setupUi(self)
         self.show()
         self.setFixedSize(self.size())
         self.pbStart.pressed.connect(self.run)
@@ -25,6 +40,12 @@ class PlotWindow(QtWidgets.QMainWindow):
         self.setStatusBar(self.statusBar)
         self.controller = None
 
+        # available LSL streams are discovered in the background
+        self.streams = {}
+        self.stream_discovery = StreamDiscovery()
+        self.stream_discovery.streams_changed.connect(self.set_streams)
+        self.stream_discovery.start()
+
         self.timer = QtCore.QTimer(self)
         self.timer.timeout.connect(self.update_status)
         self.timer.start(1000)
@@ -33,6 +54,42 @@ class PlotWindow(QtWidgets.QMainWindow):
         self.lblImage.setPixmap(QtGui.QPixmap('../figures/unknown.jpg'))
         self.lblImage.show()
 
+        self.spectrum_plot = None
+
+        # live spectrum during the recording
+        self.live_timer = QtCore.QTimer(self)
+        self.live_timer.timeout.connect(self.update_live_plot)
+        if config.live_plot_fps > 0:
+            self.live_timer.start(int(1000 / config.live_plot_fps))
+
+        self.profile.mark('window created')
+        # the event loop keeps running while the modules are imported
+        # (the imports still compete with it for the interpreter lock)
+        self.gui = GuiForwarder()
+        self.module_loader = threading.Thread(target=self.import_modules, daemon=True)
+        self.module_loader.start()
+
+    # Import the processing and plotting modules (background thread),
+    # then create the spectrum plot in the GUI thread
+    def import_modules(self):
+        global controller, spectral, parallel, SpectrumPlot
+        import src.processing.controller as controller
+        import src.processing.spectral as spectral
+        import src.processing.parallel as parallel
+        from src.gui.spectrum_plot import SpectrumPlot
+        self.profile.mark('modules loaded (background)')
+        self.gui.wrap(self.load_modules)()
+
+    # Wait for the imported modules and create the spectrum plot
+    def load_modules(self):
+        if self.spectrum_plot is not None:
+            return
+        self.module_loader.join()
+
+        self.spectrum_plot = SpectrumPlot(self.gvPlots)
+        self.profile.mark('spectrum plot created')
+        self.profile.report()
+
     # Loads names of the objects from
     # config files to customize feedback button
     # labels
@@ -58,55 +115,83 @@ class PlotWindow(QtWidgets.QMainWindow):
         self.teStatus.append('Predicted class name: ' + str(config.names[predicted_class - 1]))
 
         # Clearly different values in results array?
-        result.sort()
+        # (sorted copy, the results are logged as well)
+        result = np.sort(result)
         confidence2 = 100 * (result[2] - result[1])
 
         # Average different confidence values
-        self.pbConfidence.setValue((confidence2 + confidence * 100) / 2.0)
+        self.pbConfidence.setValue(int((confidence2 + confidence * 100) / 2.0))
+
+    # Print a running estimate during the stimulation
+    def stream_output(self, elapsed, predicted_class, result, confidence):
+        self.statusBar.showMessage('Running estimate (%.1f s): %s (confidence %d %%)' %
+                                   (elapsed, config.names[predicted_class - 1], 100 * confidence))
+        self.pbConfidence.setValue(int(100 * confidence))
+
+    # Print a decision made before the end of the stimulation
+    def decision_output(self, elapsed, predicted_class, confidence):
+        self.teStatus.append('Early decision after %.1f s: %s' % (elapsed, config.names[predicted_class - 1]))
+        self.pbConfidence.setValue(int(100 * confidence))
+        self.display_image(predicted_class)
+
+    # Display image corresponding to the action taken
+    def display_image(self, predicted_class):
+        img_name = '../figures/' + config.names[predicted_class - 1] + '.png'
+
+        self.lblImage.setPixmap(QtGui.QPixmap(img_name))
+        self.lblImage.show()
 
     # Display figure (corresponding to the action taken)
     # and spectral plot
     def display_fig(self, predicted_class, freqs, amplitudes):
         # Display image
-        img_name = '../figures/' + config.names[predicted_class - 1] + '.png'
-
-        self.lblImage.setPixmap(QtGui.QPixmap(img_name))
-        self.lblImage.show()
+        self.display_image(predicted_class)
 
         # Display plot
-        scene = QtWidgets.QGraphicsScene()
-        figure = Figure()
-        axes = figure.gca()
-        axes.set_title("SSVEP channel spectra")
-        axes.set_xlabel('Frequencies [Hz]')
-        axes.set_ylabel('Amplitudes')
-        subset_fq = (freqs > 2) & (freqs <= 25)
-        axes.autoscale(True)
-        axes.plot(freqs[subset_fq], amplitudes[subset_fq])
-
-        # Show vertical lines corresponding to frequencies
-        for i in range(0, len(config.frequencies)):
-            axes.axvline(x=config.frequencies[i], color='r', alpha=0.5)
-            axes.text(config.frequencies[i], max(amplitudes[subset_fq]) * 0.75, config.names[i], rotation=90,
-                      color='r', verticalalignment='bottom')
-
-        canvas = FigureCanvas(figure)
-        scene.addWidget(canvas)
-        self.gvPlots.setScene(scene)
+        self.spectrum_plot.update(freqs, amplitudes)
+
+    # Display the spectrum of the latest EEG data
+    # while the trial is being recorded
+    def update_live_plot(self):
+        if self.controller is None or not self.controller.running:
+            return
+        eeg_collector = self.controller.eeg_collector
+        ring_buffer = eeg_collector.ring_buffer
+        if ring_buffer is None or not eeg_collector.recording or len(ring_buffer) < eeg_collector.s_rate:
+            return
+
+        eeg_data = np.array(ring_buffer.view(int(config.live_plot_window * eeg_collector.s_rate)))
+        freqs, ps = spectral.calc_psd(np.mean(eeg_data, axis=0), eeg_collector.s_rate)
+        self.spectrum_plot.update(freqs, ps[0])
+
+    # Received an updated list of available LSL streams
+    def set_streams(self, streams):
+        self.streams = streams
+        eeg_stream = streams.get(config.eeg_stream_name)
+        if eeg_stream is not None:
+            self.lblEEGStatus.setToolTip('%d channels, %g Hz (%s)' % (eeg_stream.channel_count,
+                                                                     eeg_stream.nominal_srate, eeg_stream.hostname))
+        else:
+            self.lblEEGStatus.setToolTip('')
+        self.update_controls()
+
+    # Update the marker timeout countdown and the GUI state
+    def update_status(self):
+        if self.time_out > 0:
+            self.time_out = self.time_out - 1
+            self.statusBar.showMessage('Waiting for a marker (time_out = ' + str(self.time_out) + ') ..')
+        self.update_controls()
 
     # Check LSL EEG and marker state
     # and update the GUI accordingly
-    def update_status(self):
-        eeg_status, marker_status = controller.Controller.check_lsl()
+    def update_controls(self):
+        eeg_status, marker_status = check_streams(self.streams)
 
         self.switch_lsl_status(self.lblMarkerStatus, marker_status)
         self.switch_lsl_status(self.lblEEGStatus, eeg_status)
 
         self.pbStart.setEnabled(marker_status & eeg_status)
         self.pbStop.setEnabled(marker_status & eeg_status)
-        if self.time_out > 0:
-            self.time_out = self.time_out - 1
-            self.statusBar.showMessage('Waiting for a marker (time_out = ' + str(self.time_out) + ') ..')
 
         if self.controller is not None:
             if not (marker_status & eeg_status) and not self.stopping and self.controller.running:
@@ -132,7 +217,13 @@ class PlotWindow(QtWidgets.QMainWindow):
 
     # Start collecting and evaluating data
     def run(self):
-        self.setup()
+        self.load_modules()
+        # invalid settings (ValueError) prevent the start
+        try:
+            self.setup()
+        except ValueError as error:
+            self.teStatus.append('Cannot start: ' + str(error))
+            return
         self.controller.eeg_processor.channel_id = self.sbChannelID.value()
         self.controller.eeg_processor.all_channels = self.cbAllChannels.isChecked()
         self.controller.start()
@@ -152,13 +243,20 @@ class PlotWindow(QtWidgets.QMainWindow):
     def close(self):
         print('Closing the application..')
         self.stop()
-        self.controller.f.close()
+        self.stream_discovery.stop()
+        self.stream_discovery.wait()
+        if self.controller is not None:
+            self.controller.close_logs()
+        if parallel is not None:
+            parallel.shutdown()
         sys.exit(0)
 
 
 if __name__ == '__main__':
+    # --profile-startup prints the startup phases and the most expensive calls
+    profile = StartupProfile(start_time, '--profile-startup' in sys.argv)
     app = QApplication(sys.argv)
-    dw = PlotWindow()
+    dw = PlotWindow(profile)
     app.aboutToQuit.connect(dw.close)
     exit_code = app.exec_()
     sys.exit(exit_code)
@@ -0,0 +1,101 @@
+import numpy as np
+import src.data.config as config
+
+
+# Streaming detection of blinks and other large artifacts
+# Uses the blink measure of EEGProcessorBlinks (peak-to-peak amplitude
+# of the channels, averaged over the channels) on short segments:
+# minima and maxima of the current segment are accumulated chunk by
+# chunk, so every sample is touched once when it arrives and the trial
+# buffer is never rescanned. Contaminated segments are kept as
+# (first, last) LSL timestamps; the processor removes or down-weights
+# them (see EEGProcessor.reject_artifacts).
+# On-line BASIL SSVEP BCI
+
+
+# Peak-to-peak amplitude of each channel averaged over the channels
+# eeg_data - channels x samples
+def mean_peak_to_peak(eeg_data):
+    eeg_data = np.asarray(eeg_data)
+    return float(np.mean(np.max(eeg_data, axis=1) - np.min(eeg_data, axis=1)))
+
+
+# Artifact detection of one multichannel stream
+class ArtifactDetector:
+
+    # settings - config or pipeline settings (see src/engine/settings.py)
+    def __init__(self, n_channels, s_rate, settings=config):
+        self.channels = list(range(n_channels)) if settings.artifact_channels is None else \
+            list(settings.artifact_channels)
+        self.segment = max(1, int(round(settings.artifact_segment * s_rate)))
+        self.threshold = settings.artifact_threshold
+        # contaminated segments (first, last timestamp)
+        self.segments = []
+        self.reset()
+
+    # Start a new trial
+    def reset(self):
+        self.low = np.full(len(self.channels), np.inf)
+        self.high = np.full(len(self.channels), -np.inf)
+        # samples and the first timestamp of the current (incomplete) segment
+        self.filled = 0
+        self.first = None
+        self.last = None
+        self.segments = []
+
+    # Process a chunk
+    # chunk - samples x channels (as returned by pull_chunk)
+    # timestamps - one LSL timestamp per sample
+    def process(self, chunk, timestamps):
+        n_samples = len(timestamps)
+        if n_samples == 0:
+            return
+        chunk = np.asarray(chunk)[:, self.channels]
+        timestamps = np.asarray(timestamps)
+
+        # pieces of the chunk: the rest of the current segment, complete segments
+        # and the beginning of the next segment
+        ends = np.arange(self.segment - self.filled, n_samples + 1, self.segment)
+        starts = np.concatenate(([0], ends))
+        starts = starts[starts < n_samples]
+        lows = np.minimum.reduceat(chunk, starts, axis=0)
+        highs = np.maximum.reduceat(chunk, starts, axis=0)
+        lows[0] = np.minimum(lows[0], self.low)
+        highs[0] = np.maximum(highs[0], self.high)
+        first = self.first if self.filled else timestamps[0]
+
+        if ends.size:
+            contaminated = np.mean(highs[:ends.size] - lows[:ends.size], axis=1) > self.threshold
+            firsts = timestamps[starts[:ends.size]]
+            firsts[0] = first
+            lasts = timestamps[ends - 1]
+            self.segments.extend(zip(firsts[contaminated].tolist(), lasts[contaminated].tolist()))
+
+        if ends.size < starts.size:
+            # incomplete segment at the end of the chunk
+            self.low, self.high = lows[-1], highs[-1]
+            self.filled = n_samples - starts[-1] + (self.filled if ends.size == 0 else 0)
+            self.first = first if ends.size == 0 else timestamps[starts[-1]]
+            self.last = timestamps[-1]
+        else:
+            self.low = np.full(len(self.channels), np.inf)
+            self.high = np.full(len(self.channels), -np.inf)
+            self.filled = 0
+
+    # Contaminated segments so far, including the incomplete one
+    # Returns segments x (first, last timestamp).
+    def contaminated_segments(self):
+        segments = list(self.segments)
+        if self.filled and np.mean(self.high - self.low) > self.threshold:
+            segments.append((self.first, self.last))
+        return np.array(segments, dtype=np.float64).reshape(-1, 2)
+
+    # True for samples within contaminated segments
+    # (None if there are none)
+    def mask(self, timestamps):
+        segments = self.contaminated_segments()
+        if segments.shape[0] == 0:
+            return None
+        timestamps = np.asarray(timestamps)
+        index = np.searchsorted(segments[:, 0], timestamps, side='right') - 1
+        return (index >= 0) & (timestamps <= segments[np.maximum(index, 0), 1])
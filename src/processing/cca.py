@@ -0,0 +1,97 @@
+import numpy as np
+
+
+# Closed-form canonical correlation analysis (CCA)
+# Canonical correlations between two data sets are the singular
+# values of Qx^T Qy, where Qx and Qy are orthonormal bases
+# of the (centered) data sets. The EEG basis is computed once
+# and reused for all reference sets, which are scored
+# in one batched call.
+# On-line BASIL SSVEP BCI
+
+# relative variance below which EEG directions are considered degenerate
+rank_tolerance = 1e-10
+
+
+# Orthonormal basis (samples x rank) of the centered EEG data
+# eeg_data - channels x samples
+# The basis is obtained by whitening the data with the eigen-decomposition
+# of the (small) channel covariance matrix. Rank-deficient data
+# (e.g. after re-referencing) are handled by dropping directions
+# with negligible variance.
+def eeg_basis(eeg_data):
+    data = np.asarray(eeg_data, dtype=np.float64).T
+    data = data - np.mean(data, axis=0)
+    eigenvalues, eigenvectors = np.linalg.eigh(np.dot(data.T, data))
+    if eigenvalues.size == 0 or eigenvalues[-1] <= 0:
+        return data[:, :0]
+    keep = eigenvalues > eigenvalues[-1] * rank_tolerance
+    return np.dot(data, eigenvectors[:, keep] / np.sqrt(eigenvalues[keep]))
+
+
+# Orthonormal basis (samples x components) of one set
+# of reference signals
+# reference_signals - components x samples
+def reference_basis(reference_signals):
+    data = np.asarray(reference_signals, dtype=np.float64).T
+    data = data - np.mean(data, axis=0)
+    q, _ = np.linalg.qr(data)
+    return q
+
+
+# Orthonormal bases (targets x samples x components)
+# of all reference sets
+# references - targets x components x samples
+def reference_bases(references):
+    return np.array([reference_basis(reference) for reference in references])
+
+
+# Canonical correlations of the EEG with all reference sets
+# basis - EEG basis (samples x rank), see eeg_basis()
+# ref_bases - reference bases (targets x samples x components)
+# Returns targets x n_components correlations in descending order.
+def canonical_correlations(basis, ref_bases, n_components=1):
+    return product_correlations(np.matmul(np.swapaxes(ref_bases, -1, -2), basis), n_components)
+
+
+# The n_components largest singular values of the
+# (... x components x rank) products of orthonormal bases
+def product_correlations(products, n_components):
+    corr = np.linalg.svd(products, compute_uv=False)
+    corr = np.clip(corr, 0, 1)
+
+    if corr.shape[-1] < n_components:
+        padding = [(0, 0)] * (corr.ndim - 1) + [(0, n_components - corr.shape[-1])]
+        corr = np.pad(corr, padding, 'constant')
+    return corr[..., :n_components]
+
+
+# Canonical correlations of the EEG (channels x samples)
+# with all reference sets (targets x components x samples)
+def cca(eeg_data, references, n_components=1):
+    return canonical_correlations(eeg_basis(eeg_data), reference_bases(references), n_components)
+
+
+# Canonical correlations of stacked EEG data sets (e.g. sub-bands of
+# a filter bank) with all reference sets, computed in one batch
+# eeg_data - ... x channels x samples
+# ref_bases - reference bases (targets x samples x components)
+# Returns ... x targets x n_components correlations.
+# The EEG bases are not formed explicitly: the (centered) reference
+# bases are projected onto the raw data and whitened afterwards.
+# Degenerate directions are set to zero instead of being dropped,
+# so that all data sets are processed in the same batch.
+def stacked_canonical_correlations(eeg_data, ref_bases, n_components=1):
+    data = np.asarray(eeg_data, dtype=np.float64)
+    n_samples = data.shape[-1]
+    mean = np.mean(data, axis=-1)
+    covariance = np.matmul(data, np.swapaxes(data, -1, -2)) - n_samples * mean[..., :, np.newaxis] * \
+        mean[..., np.newaxis, :]
+    eigenvalues, eigenvectors = np.linalg.eigh(covariance)
+    keep = eigenvalues > np.maximum(eigenvalues[..., -1:], 0) * rank_tolerance
+    scale = np.where(keep, 1 / np.sqrt(np.where(keep, eigenvalues, 1)), 0)
+    whitening = eigenvectors * scale[..., np.newaxis, :]
+
+    # ... x targets x components x channels
+    projections = np.matmul(np.swapaxes(ref_bases, -1, -2), np.swapaxes(data, -1, -2)[..., np.newaxis, :, :])
+    return product_correlations(np.matmul(projections, whitening[..., np.newaxis, :, :]), n_components)
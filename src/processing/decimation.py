@@ -0,0 +1,89 @@
+import numpy as np
+import src.data.config as config
+
+
+# Streaming anti-aliased decimation of the acquired EEG
+# The targets and the harmonics used by the classifiers lie far below
+# the Nyquist frequency of the amplifier, so every pulled chunk is
+# low-pass filtered (FIR) and only every factor-th sample is kept.
+# The filter is evaluated at the kept samples only (polyphase),
+# its history is carried over from chunk to chunk.
+# On-line BASIL SSVEP BCI
+
+
+# Highest frequency [Hz] used by the classification and preprocessing
+def highest_frequency(settings=config):
+    frequency = max(settings.frequencies) * settings.n_harmonics + settings.fq_baseline
+    if settings.weights_classifier['fbcca'] > 0:
+        frequency = max(frequency, max(settings.frequencies) * settings.fbcca_harmonics + settings.fq_baseline,
+                        max(band[1] for band in settings.fbcca_bands))
+    if settings.preprocess_bandpass is not None:
+        frequency = max(frequency, settings.preprocess_bandpass[1])
+    return frequency
+
+
+# Decimation factor for the sampling rate (1 = no decimation)
+# The automatic factor keeps highest_frequency() within the passband
+# of the decimated signal; for integer sampling rates, it is reduced
+# to a divisor of the rate, so the decimated rate is an integer, too.
+def decimation_factor(s_rate, settings=config):
+    if settings.decimation_factor >= 1:
+        return int(settings.decimation_factor)
+    factor = max(1, int(settings.decimation_passband * s_rate / (2 * highest_frequency(settings))))
+    if float(s_rate).is_integer():
+        while factor > 1 and int(s_rate) % factor:
+            factor -= 1
+    return factor
+
+
+# Anti-aliasing low-pass FIR filter (cut-off between the passband
+# and the decimated Nyquist frequency)
+def design_filter(factor, settings=config):
+    from scipy.signal import firwin
+
+    cutoff = (1 + settings.decimation_passband) / 2.0 / factor
+    return firwin(factor * settings.decimation_taps + 1, cutoff)
+
+
+# Decimation of one multichannel stream
+class StreamDecimator:
+
+    def __init__(self, n_channels, factor, settings=config):
+        self.n_channels = int(n_channels)
+        self.factor = int(factor)
+        # reversed, so that the oldest sample of a window is multiplied by the last tap
+        self.taps = design_filter(self.factor, settings)[::-1].copy()
+        # last len(taps) - 1 input samples (samples x channels), initialized by the first chunk
+        self.history = None
+        # index of the next kept sample in the next chunk
+        self.phase = 0
+
+    # Decimate a chunk
+    # chunk - samples x channels (as returned by pull_chunk)
+    # timestamps - one LSL timestamp per sample
+    # Returns the kept samples (samples x channels, float32) and their timestamps.
+    def process(self, chunk, timestamps):
+        chunk = np.asarray(chunk, dtype=np.float64)
+        n_samples = chunk.shape[0]
+        n_history = self.taps.size - 1
+        if self.history is None:
+            # the signal is assumed constant before the first sample (no onset transient)
+            self.history = np.repeat(chunk[:1], n_history, axis=0)
+
+        data = np.concatenate((self.history, chunk))
+        kept = np.arange(self.phase, n_samples, self.factor)
+        # window of the kept sample i: data[i .. i + n_history] (i.e. chunk[i - n_history .. i])
+        windows = np.lib.stride_tricks.as_strided(data[self.phase:], shape=(kept.size, self.taps.size,
+                                                                            self.n_channels),
+                                                  strides=(self.factor * data.strides[0], data.strides[0],
+                                                           data.strides[1]), writeable=False)
+        decimated = np.tensordot(windows, self.taps, axes=([1], [0]))
+
+        self.history = data[data.shape[0] - n_history:].copy()
+        self.phase = (self.phase - n_samples) % self.factor
+        return decimated.astype(np.float32), np.asarray(timestamps)[kept]
+
+    # Forget the filter history (e.g. after a gap in the data)
+    def reset(self):
+        self.history = None
+        self.phase = 0
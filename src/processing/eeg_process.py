@@ -1,17 +1,21 @@
+import os
+import time
 import numpy as np
-from sklearn.cross_decomposition import CCA
-from PyQt5 import QtCore
-from PyQt5.QtCore import pyqtSignal
 import src.data.config as config
+from src.engine.signal import Signal
+import src.processing.cca as cca
+import src.processing.filter_bank as filter_bank
+import src.processing.parallel as parallel
+import src.processing.references as references
+import src.processing.spectral as spectral
+import src.processing.trca as trca
 
 
 # Performs on-line classification
 # On-line BASIL SSVEP BCI
 # Inspired by: https://github.com/aaravindravi/PythonBox_OpenViBE_SSVEP_CCA
 # Lukas Vareka, 2020
-class EEGProcessor(QtCore.QObject):
-    set_results_signal = pyqtSignal(object, object, object, object, object)
-    set_partial_results = pyqtSignal(str, object)
+class EEGProcessor:
     channel_id = 0
     all_channels = True
     all_spectral_result = []
@@ -19,81 +23,58 @@ class EEGProcessor(QtCore.QObject):
     predicted_classes = []
     predicted_classes_weights = []
 
-    def __init__(self):
-        super(EEGProcessor, self).__init__()
+    # settings - pipeline settings (see src/engine/settings.py), config by default
+    def __init__(self, settings=None):
+        self.config = settings if settings is not None else config
+        # predicted class, result, frequencies, power spectrum, confidence
+        self.set_results_signal = Signal()
+        # method name, method results
+        self.set_partial_results = Signal()
+        # complete trial record (dict, see src/data/results_log.py)
+        self.set_trial_record = Signal()
         self.s_rate = 0
+        # calibrated TRCA model (see Controller.set_correct_class)
+        self.trca_model = None
+        if os.path.exists(self.config.trca_model_path):
+            self.trca_model = trca.TrcaModel.load(self.config.trca_model_path)
 
     def get_reference_signals(self, length, target_freq):
-        # generate sinusoidal reference templates for CCA for the first and second harmonics
-        reference_signals = []
-        t = np.arange(0, (length / (self.s_rate)), step=1.0 / (self.s_rate))
-        # First harmonics/Fundamental freqeuncy
-        reference_signals.append(np.sin(np.pi * 2 * target_freq * t))
-        reference_signals.append(np.cos(np.pi * 2 * target_freq * t))
-        # Second harmonics
-        reference_signals.append(np.sin(np.pi * 4 * target_freq * t))
-        reference_signals.append(np.cos(np.pi * 4 * target_freq * t))
-        reference_signals = np.array(reference_signals)
-        return reference_signals
+        # sinusoidal reference templates for CCA for the first config.n_harmonics harmonics
+        return references.reference_cache.get(length, self.s_rate, target_freq, self.config.n_harmonics)[0]
 
     def find_corr(self, n_components, eeg_data, freq):
         # Perform Canonical correlation analysis (CCA)
         # eeg_data - consists of the EEG
-        # freq - set of sinusoidal reference templates corresponding to the flicker frequency
-        cca = CCA(n_components)
-        corr = np.zeros(n_components)
-        result = np.zeros((freq.shape)[0])
-        for freqIdx in range(0, (freq.shape)[0]):
-            print(np.shape(eeg_data))
-            cca.fit(eeg_data.T, np.squeeze(freq[freqIdx, :, :]).T)
-            O1_a, O1_b = cca.transform(eeg_data.T, np.squeeze(freq[freqIdx, :, :]).T)
-            indVal = 0
-            for indVal in range(0, n_components):
-                corr[indVal] = np.corrcoef(O1_a[:, indVal], O1_b[:, indVal])[0, 1]
-            result[freqIdx] = np.max(corr)
+        # freq - orthonormal bases of sinusoidal reference templates corresponding to the flicker frequencies
+        # The EEG-side decomposition is shared by all templates
+        # and all frequencies are scored at once.
+        corr = cca.canonical_correlations(cca.eeg_basis(eeg_data), freq, n_components)
+        result = np.max(corr, axis=1)
         result = result / max(result)
         return result
 
     # Compute spectral energies
     # in the neighborhood of target frequencies
+    # ps - power spectra (channels x bins)
     def evaluate_spectral(self, freqs, ps):
+        interval, baseline = spectral.band_masks(freqs, self.s_rate)
+        energy = spectral.spectral_scores(ps, interval)
 
-        energy = [0, 0, 0]
-        for i in range(0, len(freqs)):
-            for j in range(0, len(config.frequencies)):
-                if  abs(config.frequencies[j] - freqs[i]) < config.fq_interval:
-                    energy[j] = energy[j] + ps[i] * ps[i]
-        if max(energy) != 0:
-            energy = energy / max(energy)
-
-        self.predicted_classes.append(np.argmax(energy) + 1)
-        self.predicted_classes_weights.append(config.weights_classifier['spectral'])
+        self.predicted_classes.extend(np.argmax(energy, axis=1) + 1)
+        self.predicted_classes_weights.extend([self.config.weights_classifier['spectral']] * energy.shape[0])
         return energy
 
     # Compute spectral differences
     # between close and more distant neighborhood
     # of target frequencies
+    # ps - power spectra (channels x bins)
     def evaluate_spectral_diffs(self, freqs, ps):
-
-        energy = [0, 0, 0]
-        baseline = [0, 0, 0]
-        for i in range(0, len(freqs)):
-            for j in range(0, len(config.frequencies)):
-                if abs(config.frequencies[j] - freqs[i]) < config.fq_interval:
-                    energy[j] = energy[j] + ps[i] * ps[i]
-                if abs(config.frequencies[j] - freqs[i]) < config.fq_baseline and abs(config.frequencies[j] - freqs[i]) > config.fq_interval:
-                    baseline[j] = baseline[j] + ps[i] * ps[i]
-        for i in range(0, len(energy)):
-            if baseline[i] == 0:
-                energy[i] = 0
-            else:
-                energy[i] = energy[i] / baseline[i]
-        if max(energy) != 0:
-            energy = energy / max(energy)
+        interval, baseline = spectral.band_masks(freqs, self.s_rate)
+        energy = spectral.spectral_diff_scores(ps, interval, baseline)
         # self.set_partial_results.emit('Spectral energy diff: ' + str(energy))
 
-        self.predicted_classes.append(np.argmax(energy) + 1)
-        self.predicted_classes_weights.append(config.weights_classifier['spectral_diff'])
+        self.predicted_classes.extend(np.argmax(energy, axis=1) + 1)
+        self.predicted_classes_weights.extend([self.config.weights_classifier['spectral_diff']] * energy.shape[0])
         return energy
 
     # Compute CCA-related metrics
@@ -101,45 +82,188 @@ class EEGProcessor(QtCore.QObject):
     # https://github.com/aaravindravi/PythonBox_OpenViBE_SSVEP_CCA
     def evaluate_corr(self, eeg_data):
         eeg_shape = np.shape(eeg_data)
-        # Generate a vector of sinusoidal reference templates for all SSVEP flicker frequencies
-        freq1 = self.get_reference_signals(eeg_shape[1], config.frequencies[0])
-        freq2 = self.get_reference_signals(eeg_shape[1], config.frequencies[1])
-        freq3 = self.get_reference_signals(eeg_shape[1], config.frequencies[2])
+        # Cached reference template bases for all SSVEP flicker frequencies
+        freq = references.reference_cache.get_bases(eeg_shape[1], self.s_rate, self.config.frequencies,
+                                                    self.config.n_harmonics)
         # Application of the CCA python function for each of the frequencies
-        n_components = 1
-        # Concatenate all templates into one matrix
-        freq = np.array([freq1, freq2, freq3])
+        n_components = self.config.cca_components
         # Compute CCA
         cca_result = self.find_corr(n_components, eeg_data, freq)
         self.set_partial_results.emit('CCA results', cca_result)
 
         self.predicted_classes.append(np.argmax(cca_result) + 1)
-        self.predicted_classes_weights.append(config.weights_classifier['cca'])
+        self.predicted_classes_weights.append(self.config.weights_classifier['cca'])
         return cca_result
 
-    def calc_psd (self, eeg_signal):
-        dt = 1 / self.s_rate
-        ps = np.abs(np.fft.fft(eeg_signal)) ** 2
-        freq_s = np.fft.fftfreq(eeg_signal.size, dt)
-        idx = np.argsort(freq_s)
-        return freq_s[idx], ps[idx]
-
+    # Filter-bank CCA (FBCCA)
+    # CCA of the sub-bands (all sub-bands filtered and scored in one batch),
+    # the squared correlations are combined with decreasing weights
+    # of higher sub-bands
+    def evaluate_fbcca(self, eeg_data):
+        eeg_shape = np.shape(eeg_data)
+        freq = references.reference_cache.get_bases(eeg_shape[1], self.s_rate, self.config.frequencies,
+                                                    self.config.fbcca_harmonics)
+        sub_bands = filter_bank.filter_bands(eeg_data, self.s_rate)
+        # bands x targets
+        corr = cca.stacked_canonical_correlations(sub_bands, freq)[..., 0]
+        fbcca_result = np.dot(filter_bank.band_weights(corr.shape[0]), corr ** 2)
+        fbcca_result = fbcca_result / max(fbcca_result)
+        self.set_partial_results.emit('FBCCA results', fbcca_result)
+
+        self.predicted_classes.append(np.argmax(fbcca_result) + 1)
+        self.predicted_classes_weights.append(self.config.weights_classifier['fbcca'])
+        return fbcca_result
+
+    # Correlations with the TRCA templates
+    # (zeros if there is no model for the data)
+    def evaluate_trca(self, eeg_data):
+        model = self.trca_model
+        if model is None or not model.matches(eeg_data, self.s_rate, self.config.frequencies):
+            return np.zeros(len(self.config.frequencies))
+        trca_result = model.classify(eeg_data)
+        self.set_partial_results.emit('TRCA results', trca_result)
+
+        self.predicted_classes.append(np.argmax(trca_result) + 1)
+        self.predicted_classes_weights.append(self.config.weights_classifier['trca'])
+        return trca_result
+
+    # Power spectra (channels x bins) of all rows of eeg_signal
+    # with ordered frequencies
+    def calc_psd(self, eeg_signal):
+        return spectral.calc_psd(eeg_signal, self.s_rate)
+
+    # Evaluate spectral methods for all rows of ps
+    # and average the row results
     def evaluate_all_spectral(self, freq_s, ps):
-        spectral_result = self.evaluate_spectral(freq_s, ps)
+        ps = np.atleast_2d(ps)
+        self.all_spectral_result = self.evaluate_spectral(freq_s, ps)
 
         # simply average spectral difference in energies
-        spectral_diff_result = self.evaluate_spectral_diffs(freq_s, ps)
+        self.all_spectral_diff_result = self.evaluate_spectral_diffs(freq_s, ps)
 
-        self.all_spectral_result.append(spectral_result)
-        self.all_spectral_diff_result.append(spectral_diff_result)
+        spectral_result = np.mean(self.all_spectral_result, axis=0)
+        spectral_diff_result = np.mean(self.all_spectral_diff_result, axis=0)
         return spectral_result, spectral_diff_result
 
+    # Evaluate the spectral methods, CCA and FBCCA one after another
+    # Returns frequencies, power spectrum of the mean signal, method results
+    # and stage durations [ms]
+    def evaluate_serial(self, eeg_data):
+        start_time = time.perf_counter()
+        # frequency spectrum
+        if self.all_channels:
+            # power spectra of all channels and (for plotting) of the mean signal
+            # in one batch
+            mean_eeg = np.mean(eeg_data, axis=0)
+            freq_s, all_ps = self.calc_psd(np.vstack((eeg_data, mean_eeg)))
+        else:
+            freq_s, all_ps = self.calc_psd(eeg_data[self.channel_id])
+        ps = all_ps[-1]
+        psd_time = time.perf_counter()
+
+        # include ps of the mean signal, too, and
+        # average all individual (and mean) channel results to get
+        # overall metrics
+        spectral_result, spectral_diff_result = self.evaluate_all_spectral(freq_s, all_ps)
+        spectral_time = time.perf_counter()
+
+        self.set_partial_results.emit('Spectral energy', spectral_result)
+        self.set_partial_results.emit('Spectral energy diff', spectral_diff_result)
+
+        # use CCA to estimate correlations
+        cca_result = self.evaluate_corr(eeg_data)
+        cca_time = time.perf_counter()
+
+        # filter-bank CCA (only when it is weighted)
+        fbcca_result = np.zeros(len(self.config.frequencies))
+        if self.config.weights_classifier['fbcca'] > 0:
+            fbcca_result = self.evaluate_fbcca(eeg_data)
+        fbcca_time = time.perf_counter()
+
+        durations = {'psd_ms': 1000 * (psd_time - start_time), 'spectral_ms': 1000 * (spectral_time - psd_time),
+                     'cca_ms': 1000 * (cca_time - spectral_time), 'fbcca_ms': 1000 * (fbcca_time - cca_time)}
+        return freq_s, ps, spectral_result, spectral_diff_result, cca_result, fbcca_result, durations
+
+    # Evaluate the spectral methods (in blocks of channels), CCA and FBCCA
+    # concurrently in the process pool (see src/processing/parallel.py)
+    # Returns the same as evaluate_serial().
+    def evaluate_parallel(self, eeg_data):
+        # all channels and the mean signal are shared
+        shared = parallel.SharedEeg(np.vstack((eeg_data, np.mean(eeg_data, axis=0))))
+        try:
+            pool = parallel.get_executor()
+            handle = shared.handle()
+            settings = parallel.config_snapshot(self.config)
+            n_channels = np.shape(eeg_data)[0]
+            spectral_futures = [pool.submit(parallel.spectral_task, handle, first, last, self.s_rate, settings)
+                                for first, last in parallel.row_blocks(n_channels + 1, parallel.n_workers())]
+            cca_future = pool.submit(parallel.cca_task, handle, n_channels, self.s_rate, settings)
+            fbcca_future = None
+            if self.config.weights_classifier['fbcca'] > 0:
+                fbcca_future = pool.submit(parallel.fbcca_task, handle, n_channels, self.s_rate, settings)
+
+            spectral_results = [future.result() for future in spectral_futures]
+            cca_result, cca_ms = cca_future.result()
+            fbcca_result, fbcca_ms = np.zeros(len(self.config.frequencies)), 0
+            if fbcca_future is not None:
+                fbcca_result, fbcca_ms = fbcca_future.result()
+        finally:
+            shared.release()
+
+        freq_s = spectral_results[0][0]
+        ps = spectral_results[-1][1]
+        self.all_spectral_result = np.vstack([result[2] for result in spectral_results])
+        self.all_spectral_diff_result = np.vstack([result[3] for result in spectral_results])
+        spectral_result = np.mean(self.all_spectral_result, axis=0)
+        spectral_diff_result = np.mean(self.all_spectral_diff_result, axis=0)
+
+        # votes of all methods, as in the serial evaluation
+        for method, scores in (('spectral', self.all_spectral_result),
+                               ('spectral_diff', self.all_spectral_diff_result)):
+            self.predicted_classes.extend(np.argmax(scores, axis=1) + 1)
+            self.predicted_classes_weights.extend([self.config.weights_classifier[method]] * scores.shape[0])
+        self.set_partial_results.emit('Spectral energy', spectral_result)
+        self.set_partial_results.emit('Spectral energy diff', spectral_diff_result)
+
+        self.set_partial_results.emit('CCA results', cca_result)
+        self.predicted_classes.append(np.argmax(cca_result) + 1)
+        self.predicted_classes_weights.append(self.config.weights_classifier['cca'])
+        if fbcca_future is not None:
+            self.set_partial_results.emit('FBCCA results', fbcca_result)
+            self.predicted_classes.append(np.argmax(fbcca_result) + 1)
+            self.predicted_classes_weights.append(self.config.weights_classifier['fbcca'])
+
+        durations = {'psd_ms': max(result[4] for result in spectral_results),
+                     'spectral_ms': max(result[5] for result in spectral_results),
+                     'cca_ms': cca_ms, 'fbcca_ms': fbcca_ms}
+        return freq_s, ps, spectral_result, spectral_diff_result, cca_result, fbcca_result, durations
+
+    # Remove or down-weight samples contaminated by artifacts
+    # (config.artifact_handling, see src/processing/artifacts.py)
+    # artifacts - True for contaminated samples (None = no artifacts)
+    def reject_artifacts(self, eeg_data, artifacts):
+        # (a mask of another length does not belong to the data)
+        if artifacts is None or len(artifacts) != np.shape(eeg_data)[1] or not np.any(artifacts):
+            return eeg_data
+        if self.config.artifact_handling == 'weight':
+            weights = np.where(artifacts, self.config.artifact_weight, 1).astype(np.asarray(eeg_data).dtype)
+            return eeg_data * weights
+        if self.config.artifact_handling == 'exclude':
+            if np.mean(~artifacts) < self.config.artifact_min_clean:
+                self.set_partial_results.emit('Artifacts', 'too many contaminated samples, none removed')
+                return eeg_data
+            return np.asarray(eeg_data)[:, ~artifacts]
+        return eeg_data
+
     # Process the data package,
     # calculate various metrics useful for
     # on-line classification,
     # computed weighted mean of these metrics
     # and pass the results to the GUI
-    def process(self, eeg_data, s_rate):
+    # trial_id - identifies the trial in the emitted trial record
+    # artifacts - True for samples contaminated by artifacts (None = no artifacts)
+    def process(self, eeg_data, s_rate, trial_id=0, artifacts=None):
+        start_time = time.perf_counter()
         self.predicted_classes = []
         self.predicted_classes_weights = []
         self.s_rate = s_rate
@@ -151,43 +275,32 @@ class EEGProcessor(QtCore.QObject):
         if s_rate == 0:
             return
 
+        artifact_fraction = 0.0
+        if artifacts is not None:
+            artifact_fraction = float(np.mean(artifacts))
+            eeg_data = self.reject_artifacts(eeg_data, artifacts)
+
         # all individual EEG channel results to average later
         self.all_spectral_result = []
         self.all_spectral_diff_result = []
 
-        # frequency spectrum
-        if self.all_channels:
-
-            for i in range(0, eeg_shape[0]):
-                freq_s, ps = self.calc_psd(eeg_data[i])
-                # simply average spectral energies
-                self.evaluate_all_spectral(freq_s, ps)
-
-            # for plotting, calculate mean spectrum
-            mean_eeg = np.mean(eeg_data, axis=0)
-            freq_s, ps = self.calc_psd(mean_eeg)
-
-            # include ps of the mean signal, too
-            self.evaluate_all_spectral(freq_s, ps)
-
-            # average all individual (and mean) channel results to get
-            # overall metrics
-            spectral_result = np.mean(self.all_spectral_result, axis=0)
-            spectral_diff_result = np.mean(self.all_spectral_diff_result, axis=0)
-
+        if self.config.parallel_methods and self.all_channels:
+            freq_s, ps, spectral_result, spectral_diff_result, cca_result, fbcca_result, durations = \
+                self.evaluate_parallel(eeg_data)
         else:
-            freq_s, ps = self.calc_psd(eeg_data[self.channel_id])
-            spectral_result, spectral_diff_result = self.evaluate_all_spectral(freq_s, ps)
+            freq_s, ps, spectral_result, spectral_diff_result, cca_result, fbcca_result, durations = \
+                self.evaluate_serial(eeg_data)
+        fbcca_time = time.perf_counter()
 
-        self.set_partial_results.emit('Spectral energy', spectral_result)
-        self.set_partial_results.emit('Spectral energy diff', spectral_diff_result)
-
-        # use CCA to estimate correlations
-        cca_result = self.evaluate_corr(eeg_data)
+        trca_result = np.zeros(len(self.config.frequencies))
+        if self.config.weights_classifier['trca'] > 0:
+            trca_result = self.evaluate_trca(eeg_data)
+        trca_time = time.perf_counter()
 
         # give one overall result (weighting various results)
-        result = spectral_result * config.weights_classifier['spectral'] + spectral_diff_result * \
-                 config.weights_classifier['spectral_diff'] + cca_result * config.weights_classifier['cca']
+        weights = self.config.weights_classifier
+        result = spectral_result * weights['spectral'] + spectral_diff_result * weights['spectral_diff'] + \
+                 cca_result * weights['cca'] + fbcca_result * weights['fbcca'] + trca_result * weights['trca']
 
         # Find the maximum canonical correlation coefficient and corresponding class for the given SSVEP/EEG data
         predicted_class = np.argmax(result) + 1
@@ -201,3 +314,15 @@ class EEGProcessor(QtCore.QObject):
         confidence = confidence / np.sum(self.predicted_classes_weights)
 
         self.set_results_signal.emit(predicted_class, result, freq_s, ps, confidence)
+
+        # complete typed record of the trial for the results log
+        end_time = time.perf_counter()
+        self.set_trial_record.emit({'trial_id': trial_id, 'spectral': spectral_result,
+                                    'spectral_diff': spectral_diff_result, 'cca': cca_result,
+                                    'fbcca': fbcca_result, 'trca': trca_result, 'result': result,
+                                    'predicted_class': predicted_class, 'confidence': confidence,
+                                    'psd_ms': durations['psd_ms'], 'spectral_ms': durations['spectral_ms'],
+                                    'cca_ms': durations['cca_ms'], 'fbcca_ms': durations['fbcca_ms'],
+                                    'trca_ms': 1000 * (trca_time - fbcca_time),
+                                    'process_ms': 1000 * (end_time - start_time),
+                                    'artifact_fraction': artifact_fraction})
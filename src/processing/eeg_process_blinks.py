@@ -3,9 +3,9 @@ from sklearn.cross_decomposition import CCA
 from PyQt5 import QtCore
 from PyQt5.QtCore import pyqtSignal
 from sklearn.preprocessing import normalize
-from statistics import mean
 from operator import truediv
 import re
+import src.processing.artifacts as artifacts
 
 # Performs on-line classification
 # On-line BASIL SSVEP BCI
@@ -19,18 +19,14 @@ class EEGProcessorBlinks(QtCore.QObject):
     def __init__(self):
         super(EEGProcessorBlinks, self).__init__()
         self.s_rate = 0
-        self.results = [0, 0, 0, 0, 0, 0, 0, 0, 0]
-        self.counter = [0, 0, 0, 0, 0, 0, 0, 0, 0]
+        # summed peak-to-peak amplitudes and number of trials per marker
+        # (extended when a higher marker arrives)
+        self.results = np.zeros(9)
+        self.counter = np.zeros(9, dtype=int)
 
+    # Peak-to-peak amplitude averaged over the channels
     def find_grads(self, eeg_data, eeg_shape):
-
-        diffs = []
-        # for each channel
-        for i in range(0, eeg_shape[0]):
-            channel_data = eeg_data[i][:]
-            diff = abs(max(channel_data) - min(channel_data))
-            diffs.append(diff)
-        return mean(diffs)
+        return artifacts.mean_peak_to_peak(eeg_data)
 
 
     def process(self, eeg_data, s_rate, marker):
@@ -47,14 +43,15 @@ class EEGProcessorBlinks(QtCore.QObject):
         diff = self.find_grads(eeg_data, eeg_shape)
         numbers = re.findall('\d+', marker[0])
         marker_id = int(numbers[0]) - 1
+        if marker_id >= self.results.size:
+            self.results = np.pad(self.results, (0, marker_id + 1 - self.results.size), 'constant')
+            self.counter = np.pad(self.counter, (0, marker_id + 1 - self.counter.size), 'constant')
 
-        self.results[marker_id] = self.results[marker_id] + diff
-        self.counter[marker_id] = self.counter[marker_id] + 1
+        self.results[marker_id] += diff
+        self.counter[marker_id] += 1
 
-        results = [0, 0, 0, 0, 0, 0, 0, 0, 0]
-        for i in range(0, len(self.results)):
-            if self.counter[i] > 0:
-                results[i] = self.results[i] / self.counter[i]
+        results = np.zeros(self.results.size)
+        np.divide(self.results, self.counter, out=results, where=self.counter > 0)
 
 
         # Find the maximum canonical correlation coefficient and corresponding class for the given SSVEP/EEG data
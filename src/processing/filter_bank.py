@@ -0,0 +1,57 @@
+from functools import lru_cache
+import numpy as np
+import scipy.fft
+import src.data.config as config
+
+
+# Filter bank for filter-bank CCA (FBCCA)
+# All sub-bands are filtered at once in the frequency domain:
+# the spectrum of the (zero-padded) data is multiplied by the squared
+# magnitude responses of the band-pass filters (bands x bins), which
+# corresponds to zero-phase forward-backward filtering, and one inverse
+# FFT returns all bands x channels.
+# On-line BASIL SSVEP BCI
+
+
+# Squared magnitude responses (bands x bins) of the Butterworth
+# band-pass filters of all sub-bands for an n_fft long real FFT
+# (designed once per sampling rate, band set and FFT length)
+@lru_cache(maxsize=16)
+def band_gains(n_fft, s_rate, bands, order):
+    # scipy.signal takes long to import and is needed only for the design
+    from scipy.signal import butter, sosfreqz
+    freqs = scipy.fft.rfftfreq(n_fft, 1.0 / s_rate)
+    nyquist = s_rate / 2.0
+    gains = np.zeros((len(bands), freqs.size))
+    for i, (low, high) in enumerate(bands):
+        high = min(high, 0.95 * nyquist)
+        if low >= high:
+            continue
+        sos = butter(order, [low, high], btype='bandpass', fs=s_rate, output='sos')
+        _, response = sosfreqz(sos, worN=freqs, fs=s_rate)
+        gains[i] = np.abs(response) ** 2
+    gains = gains.astype(np.float32)
+    gains.setflags(write=False)
+    return gains
+
+
+# Sub-band signals of all channels (float32)
+# eeg_data - channels x samples
+# Returns bands x channels x samples.
+# The data are zero-padded by config.fbcca_padding seconds,
+# so that the impulse responses do not wrap around.
+def filter_bands(eeg_data, s_rate):
+    eeg_data = np.asarray(eeg_data, dtype=np.float32)
+    n_samples = eeg_data.shape[-1]
+    n_fft = scipy.fft.next_fast_len(n_samples + min(n_samples, int(config.fbcca_padding * s_rate)), real=True)
+    gains = band_gains(n_fft, float(s_rate), tuple(tuple(band) for band in config.fbcca_bands),
+                       config.fbcca_order)
+
+    spectra = scipy.fft.rfft(eeg_data, n=n_fft, axis=-1, workers=config.fft_workers)
+    sub_bands = scipy.fft.irfft(gains[:, np.newaxis, :] * spectra, n=n_fft, axis=-1, workers=config.fft_workers)
+    return sub_bands[..., :n_samples]
+
+
+# Weights of the sub-bands: n^(-a) + b for the n-th band
+def band_weights(n_bands):
+    return np.arange(1, n_bands + 1) ** -config.fbcca_weight_a + config.fbcca_weight_b
@@ -0,0 +1,176 @@
+import os
+import tempfile
+import threading
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import src.data.config as config
+import src.processing.cca as cca
+import src.processing.filter_bank as filter_bank
+import src.processing.references as references
+import src.processing.spectral as spectral
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:  # Python < 3.8
+    shared_memory = None
+
+
+# Parallel execution of the classification methods
+# The trial is copied once into shared memory (or a memory-mapped
+# file in /dev/shm with older Python versions) and the worker
+# processes attach to it, so the EEG data are never pickled.
+# Spectral methods are split into blocks of rows (channels),
+# CCA and FBCCA run as separate tasks; the tasks return the scores
+# only, voting and weighted fusion stay in EEGProcessor.
+# On-line BASIL SSVEP BCI
+
+executor = None
+# pipelines running in parallel share the pool
+executor_lock = threading.Lock()
+
+
+# Number of worker processes
+def n_workers():
+    return config.parallel_workers if config.parallel_workers > 0 else os.cpu_count()
+
+
+# Process pool shared by all processors (started on first use)
+def get_executor():
+    global executor
+    with executor_lock:
+        if executor is None:
+            # spawned workers do not inherit the Qt threads of the application
+            executor = ProcessPoolExecutor(max_workers=n_workers(), mp_context=multiprocessing.get_context('spawn'))
+        return executor
+
+
+def shutdown():
+    global executor
+    with executor_lock:
+        if executor is not None:
+            executor.shutdown()
+            executor = None
+
+
+# Settings the tasks depend on (workers do not see runtime changes of config)
+# settings - config or pipeline settings (see src/engine/settings.py)
+def config_snapshot(settings=config):
+    return {name: getattr(settings, name) for name in ['frequencies', 'fq_interval', 'fq_baseline', 'psd_fast_length',
+                                                      'psd_welch', 'psd_welch_segment', 'cca_components',
+                                                      'n_harmonics', 'fbcca_bands', 'fbcca_order',
+                                                      'fbcca_harmonics', 'fbcca_padding', 'fbcca_weight_a',
+                                                      'fbcca_weight_b']}
+
+
+# EEG data (rows x samples) in shared memory
+class SharedEeg:
+
+    def __init__(self, eeg_data):
+        eeg_data = np.asarray(eeg_data)
+        self.shape = eeg_data.shape
+        self.dtype = eeg_data.dtype.str
+        if shared_memory is not None:
+            self.memory = shared_memory.SharedMemory(create=True, size=max(1, eeg_data.nbytes))
+            self.name = self.memory.name
+            data = np.ndarray(self.shape, dtype=self.dtype, buffer=self.memory.buf)
+        else:
+            directory = '/dev/shm' if os.path.isdir('/dev/shm') else None
+            handle, self.name = tempfile.mkstemp(prefix='basil_', dir=directory)
+            os.close(handle)
+            data = np.memmap(self.name, dtype=self.dtype, mode='w+', shape=self.shape)
+        data[:] = eeg_data
+        del data
+
+    # Picklable reference passed to the tasks
+    def handle(self):
+        return self.name, self.shape, self.dtype
+
+    def release(self):
+        if shared_memory is not None:
+            self.memory.close()
+            self.memory.unlink()
+        else:
+            os.remove(self.name)
+
+
+# Maps the shared data in a worker
+# Returns the data and the object keeping the mapping open
+def attach(handle):
+    name, shape, dtype = handle
+    if shared_memory is not None:
+        memory = shared_memory.SharedMemory(name=name)
+        return np.ndarray(shape, dtype=dtype, buffer=memory.buf), memory
+    return np.memmap(name, dtype=dtype, mode='r', shape=shape), None
+
+
+def detach(memory):
+    if memory is not None:
+        memory.close()
+
+
+def apply_config(settings):
+    for name, value in settings.items():
+        setattr(config, name, value)
+
+
+# Spectral methods for rows first .. last - 1
+# Returns frequencies, the power spectrum of the last row,
+# spectral and spectral diff scores (rows x targets) and timings [ms]
+def spectral_task(handle, first, last, s_rate, settings):
+    apply_config(settings)
+    data, memory = attach(handle)
+    try:
+        start = time.perf_counter()
+        freqs, ps = spectral.calc_psd(data[first:last], s_rate)
+        psd_time = time.perf_counter()
+        interval, baseline = spectral.band_masks(freqs, s_rate)
+        energy = spectral.spectral_scores(ps, interval)
+        energy_diff = spectral.spectral_diff_scores(ps, interval, baseline)
+        end = time.perf_counter()
+    finally:
+        del data
+        detach(memory)
+    return freqs, ps[-1], energy, energy_diff, 1000 * (psd_time - start), 1000 * (end - psd_time)
+
+
+# CCA of the first n_channels rows (normalized to the maximum)
+def cca_task(handle, n_channels, s_rate, settings):
+    apply_config(settings)
+    data, memory = attach(handle)
+    try:
+        start = time.perf_counter()
+        bases = references.reference_cache.get_bases(data.shape[1], s_rate, config.frequencies, config.n_harmonics)
+        corr = cca.canonical_correlations(cca.eeg_basis(data[:n_channels]), bases, config.cca_components)
+        result = np.max(corr, axis=1)
+        result = result / max(result)
+        end = time.perf_counter()
+    finally:
+        del data
+        detach(memory)
+    return result, 1000 * (end - start)
+
+
+# FBCCA of the first n_channels rows (normalized to the maximum)
+def fbcca_task(handle, n_channels, s_rate, settings):
+    apply_config(settings)
+    data, memory = attach(handle)
+    try:
+        start = time.perf_counter()
+        bases = references.reference_cache.get_bases(data.shape[1], s_rate, config.frequencies,
+                                                     config.fbcca_harmonics)
+        corr = cca.stacked_canonical_correlations(filter_bank.filter_bands(data[:n_channels], s_rate), bases)[..., 0]
+        result = np.dot(filter_bank.band_weights(corr.shape[0]), corr ** 2)
+        result = result / max(result)
+        end = time.perf_counter()
+    finally:
+        del data
+        detach(memory)
+    return result, 1000 * (end - start)
+
+
+# Row blocks (first, last) for the spectral tasks
+def row_blocks(n_rows, n_blocks):
+    bounds = np.linspace(0, n_rows, min(n_rows, n_blocks) + 1).astype(int)
+    return list(zip(bounds[:-1], bounds[1:]))
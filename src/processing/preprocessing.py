@@ -0,0 +1,78 @@
+import numpy as np
+import src.data.config as config
+
+
+# Streaming preprocessing of the acquired EEG
+# Common average re-referencing, IIR band-pass and notch filters
+# (one cascade of second-order sections) applied to every pulled
+# chunk in the collector. The filter state is carried over from chunk
+# to chunk (also between trials, so the filters have settled when
+# a trial starts); the trial data are already clean at the stop
+# marker and the preprocessing adds no latency to the classification.
+# On-line BASIL SSVEP BCI
+
+
+# Second-order sections of the configured filters
+# (None if no filter is enabled)
+# Raises ValueError if a filter is not below the Nyquist frequency
+# (e.g. after decimation).
+def design_filters(s_rate, settings=config):
+    from scipy.signal import butter, iirnotch, tf2sos
+
+    sections = []
+    if settings.preprocess_bandpass is not None:
+        low, high = settings.preprocess_bandpass
+        if high >= s_rate / 2.0:
+            raise ValueError('Band-pass filter up to %g Hz is not below the Nyquist frequency of %g Hz'
+                             % (high, s_rate / 2.0))
+        sections.append(butter(settings.preprocess_bandpass_order, [low, high], btype='bandpass', fs=s_rate,
+                               output='sos'))
+    if settings.preprocess_notch is not None:
+        if settings.preprocess_notch >= s_rate / 2.0:
+            raise ValueError('Notch filter at %g Hz is not below the Nyquist frequency of %g Hz'
+                             % (settings.preprocess_notch, s_rate / 2.0))
+        b, a = iirnotch(settings.preprocess_notch, settings.preprocess_notch_quality, fs=s_rate)
+        sections.append(tf2sos(b, a))
+    if not sections:
+        return None
+    return np.vstack(sections)
+
+
+# True if any preprocessing is configured
+def enabled(settings=config):
+    return settings.preprocess_bandpass is not None or settings.preprocess_notch is not None or \
+        settings.preprocess_car
+
+
+# Preprocessing of one multichannel stream
+class StreamPreprocessor:
+
+    # settings - config or pipeline settings (see src/engine/settings.py)
+    def __init__(self, n_channels, s_rate, settings=config):
+        self.n_channels = int(n_channels)
+        self.car = settings.preprocess_car
+        self.sos = design_filters(s_rate, settings)
+        # filter state (sections x 2 x channels), initialized by the first chunk
+        self.state = None
+
+    # Preprocess a chunk
+    # chunk - samples x channels (as returned by pull_chunk)
+    # Returns the preprocessed chunk (samples x channels, float32).
+    def process(self, chunk):
+        chunk = np.asarray(chunk, dtype=np.float64)
+        if chunk.shape[0] == 0:
+            return chunk.astype(np.float32)
+        if self.car:
+            chunk = chunk - np.mean(chunk, axis=1, keepdims=True)
+
+        if self.sos is not None:
+            from scipy.signal import sosfilt, sosfilt_zi
+            if self.state is None:
+                # steady state for a constant input equal to the first sample (no onset transient)
+                self.state = sosfilt_zi(self.sos)[:, :, np.newaxis] * chunk[0][np.newaxis, np.newaxis, :]
+            chunk, self.state = sosfilt(self.sos, chunk, axis=0, zi=self.state)
+        return chunk.astype(np.float32)
+
+    # Forget the filter state (e.g. after a gap in the data)
+    def reset(self):
+        self.state = None
@@ -0,0 +1,66 @@
+import threading
+from collections import OrderedDict
+import numpy as np
+import src.data.config as config
+import src.processing.cca as cca
+
+
+# Sinusoidal reference templates for CCA
+# and their orthonormal bases
+# On-line BASIL SSVEP BCI
+
+
+# Generate sin / cos templates (2 * n_harmonics x length)
+# for the target frequency and its harmonics
+def make_reference_signals(length, s_rate, target_freq, n_harmonics):
+    t = np.arange(length) / s_rate
+    reference_signals = []
+    for harmonic in range(1, n_harmonics + 1):
+        reference_signals.append(np.sin(np.pi * 2 * harmonic * target_freq * t))
+        reference_signals.append(np.cos(np.pi * 2 * harmonic * target_freq * t))
+    return np.array(reference_signals)
+
+
+# Bounded cache of reference templates and their bases
+# keyed by (length, s_rate, frequency, n_harmonics);
+# the least recently used entries are evicted first.
+# Trial lengths repeat during a session, so the templates
+# are generated only once.
+class ReferenceCache:
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    # Returns (reference signals, orthonormal basis)
+    # for the given target frequency
+    def get(self, length, s_rate, target_freq, n_harmonics):
+        key = (int(length), float(s_rate), float(target_freq), int(n_harmonics))
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                return entry
+
+        signals = make_reference_signals(length, s_rate, target_freq, n_harmonics)
+        entry = (signals, cca.reference_basis(signals))
+
+        with self.lock:
+            self.entries[key] = entry
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+        return entry
+
+    # Reference bases of all target frequencies
+    # (targets x samples x 2 * n_harmonics)
+    def get_bases(self, length, s_rate, frequencies, n_harmonics):
+        return np.array([self.get(length, s_rate, freq, n_harmonics)[1] for freq in frequencies])
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+# cache shared by all processors
+reference_cache = ReferenceCache(config.reference_cache_size)
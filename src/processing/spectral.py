@@ -0,0 +1,110 @@
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+import numpy as np
+import scipy.fft
+import src.data.config as config
+
+
+# Batched power spectra and vectorized spectral
+# scoring of SSVEP target frequencies
+# Band energies of all channels are computed as one matrix
+# product of the power matrix (channels x bins) with precomputed
+# bin masks (targets x bins).
+# On-line BASIL SSVEP BCI
+
+# maximum number of cached bin masks
+max_cached_masks = 16
+cached_masks = OrderedDict()
+cached_masks_lock = threading.Lock()
+
+
+# Ordered (non-negative) frequency axis of a real FFT
+@lru_cache(maxsize=16)
+def psd_frequencies(n_fft, s_rate):
+    freqs = scipy.fft.rfftfreq(n_fft, 1.0 / s_rate)
+    freqs.setflags(write=False)
+    return freqs
+
+
+# FFT length used for n_samples long signals
+def fft_length(n_samples):
+    if config.psd_fast_length:
+        return scipy.fft.next_fast_len(n_samples, real=True)
+    return n_samples
+
+
+# Power spectra of all rows of the data at once
+# eeg_data - channels x samples (or a single signal)
+# Returns ordered frequencies (bins) and power spectra (channels x bins).
+# The signals are zero-padded to a fast FFT length (config.psd_fast_length)
+# and optionally averaged over Welch segments (config.psd_welch).
+def calc_psd(eeg_data, s_rate):
+    eeg_data = np.atleast_2d(eeg_data)
+    n_samples = eeg_data.shape[-1]
+
+    if config.psd_welch:
+        # scipy.signal takes long to import and is needed only here
+        from scipy.signal import welch
+        n_per_segment = min(n_samples, int(config.psd_welch_segment * s_rate))
+        freqs, ps = welch(eeg_data, fs=s_rate, nperseg=n_per_segment,
+                          nfft=fft_length(n_per_segment), axis=-1)
+        return freqs, ps
+
+    n_fft = fft_length(n_samples)
+    spectra = scipy.fft.rfft(eeg_data, n=n_fft, axis=-1, workers=config.fft_workers)
+    ps = np.square(np.abs(spectra), dtype=np.float64)
+    return psd_frequencies(n_fft, float(s_rate)), ps
+
+
+# Interval and baseline bin masks (targets x bins) for the given
+# frequency axis, cached per (n_fft, s_rate, configuration)
+# interval - bins closer than fq_interval to the target frequency
+# baseline - bins between fq_interval and fq_baseline from the target
+def band_masks(freqs, s_rate):
+    # the frequency axis is fully determined by its size and end points
+    key = (len(freqs), float(freqs[0]), float(freqs[-1]), float(s_rate),
+           tuple(config.frequencies), config.fq_interval, config.fq_baseline)
+    with cached_masks_lock:
+        masks = cached_masks.get(key)
+        if masks is not None:
+            cached_masks.move_to_end(key)
+            return masks
+
+    distance = np.abs(np.asarray(config.frequencies, dtype=np.float64)[:, np.newaxis] - freqs[np.newaxis, :])
+    interval = (distance < config.fq_interval).astype(np.float64)
+    baseline = ((distance < config.fq_baseline) & (distance > config.fq_interval)).astype(np.float64)
+    masks = (interval, baseline)
+
+    with cached_masks_lock:
+        cached_masks[key] = masks
+        while len(cached_masks) > max_cached_masks:
+            cached_masks.popitem(last=False)
+    return masks
+
+
+# Normalize each row by its maximum (rows with zero maximum are kept)
+def normalize_rows(scores):
+    row_max = np.max(scores, axis=1, keepdims=True)
+    row_max[row_max == 0] = 1
+    return scores / row_max
+
+
+# Spectral energies in the neighborhood of target frequencies
+# ps - power spectra (rows x bins)
+# Returns rows x targets scores normalized to the maximum of each row.
+def spectral_scores(ps, interval):
+    return normalize_rows(np.dot(ps * ps, interval.T))
+
+
+# Ratios of spectral energies in close and more distant
+# neighborhood of target frequencies
+# ps - power spectra (rows x bins)
+# Returns rows x targets scores normalized to the maximum of each row.
+def spectral_diff_scores(ps, interval, baseline):
+    energy_ps = ps * ps
+    energy = np.dot(energy_ps, interval.T)
+    base = np.dot(energy_ps, baseline.T)
+    ratio = np.zeros_like(energy)
+    np.divide(energy, base, out=ratio, where=base != 0)
+    return normalize_rows(ratio)
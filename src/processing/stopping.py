@@ -0,0 +1,50 @@
+import numpy as np
+import src.data.config as config
+
+
+# Dynamic stopping of the stimulation
+# Watches running class estimates and declares a decision
+# once the same class has satisfied confidence and margin
+# thresholds for config.stopping_dwell seconds.
+# On-line BASIL SSVEP BCI
+class DynamicStopping:
+
+    def __init__(self, settings=None):
+        self.config = settings if settings is not None else config
+        self.candidate = None
+        self.candidate_since = 0
+        self.decision = None
+
+    # Start a new trial
+    def reset(self):
+        self.candidate = None
+        self.candidate_since = 0
+        self.decision = None
+
+    # Difference between the best and the second best score
+    @staticmethod
+    def margin(result):
+        if len(result) < 2:
+            return 1.0
+        ordered = np.sort(result)
+        return float(ordered[-1] - ordered[-2])
+
+    # Process a running estimate
+    # Returns the predicted class once the decision is made
+    # (only once per trial), None otherwise.
+    def update(self, elapsed, predicted_class, result, confidence):
+        if self.decision is not None:
+            return None
+
+        if confidence < self.config.stopping_confidence or self.margin(result) < self.config.stopping_margin:
+            self.candidate = None
+            return None
+
+        if predicted_class != self.candidate:
+            self.candidate = predicted_class
+            self.candidate_since = elapsed
+
+        if elapsed >= self.config.stopping_min_time and elapsed - self.candidate_since >= self.config.stopping_dwell:
+            self.decision = predicted_class
+            return predicted_class
+        return None
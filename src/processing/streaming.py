@@ -0,0 +1,109 @@
+import numpy as np
+import src.data.config as config
+from src.engine.signal import Signal
+
+
+# Sliding-window DFT evaluated at arbitrary frequencies
+# Keeps one complex accumulator per channel and frequency,
+# sum over the window of x(n) * exp(-j * omega * n),
+# which is updated with the incoming samples and the samples
+# leaving the window only, i.e. in O(new samples).
+# On-line BASIL SSVEP BCI
+class SlidingDft:
+
+    def __init__(self, frequencies, s_rate, window):
+        self.omega = 2 * np.pi * np.asarray(frequencies, dtype=np.float64) / s_rate
+        self.window = int(window)
+        self.accumulators = None
+        self.n = 0
+
+    def reset(self, n_channels):
+        self.accumulators = np.zeros((n_channels, self.omega.size), dtype=np.complex128)
+        self.n = 0
+
+    # exp(-j * omega * n) for samples n = start .. start + length - 1
+    def phasors(self, start, length):
+        return np.exp(-1j * np.outer(np.arange(start, start + length), self.omega))
+
+    # Update the accumulators
+    # recent - the latest samples (channels x samples) including n_new
+    # new samples and at least all samples that leave the window
+    # (i.e. the latest min(all samples, window + n_new) samples)
+    def update(self, recent, n_new):
+        n_recent = recent.shape[1]
+        self.accumulators += np.dot(recent[:, n_recent - n_new:], self.phasors(self.n, n_new))
+
+        n_old = n_recent - min(n_recent, self.window)
+        if n_old > 0:
+            self.accumulators -= np.dot(recent[:, :n_old], self.phasors(self.n + n_new - n_recent, n_old))
+        self.n += n_new
+
+    # Power (summed over channels) at all frequencies
+    def power(self):
+        return np.sum(np.abs(self.accumulators) ** 2, axis=0)
+
+
+# Continuous classification during the stimulation
+# Spectral energies at target frequencies and their harmonics are compared
+# with energies in their neighborhood (similarly to the spectral diff method)
+# using the sliding-window DFT; an updated estimate is emitted every
+# config.streaming_interval ms of received data.
+# On-line BASIL SSVEP BCI
+class StreamingClassifier:
+
+    def __init__(self, settings=None):
+        self.config = settings if settings is not None else config
+        # elapsed time [s], predicted class, result, confidence
+        self.set_stream_results = Signal()
+        self.s_rate = 0
+        self.dft = None
+        self.window = 0
+        self.interval = 0
+        self.samples_since_update = 0
+
+    # Frequencies tracked by the sliding DFT
+    # (targets x harmonics x [target, lower neighbor, upper neighbor])
+    def tracked_frequencies(self):
+        offset = (self.config.fq_interval + self.config.fq_baseline) / 2.0
+        harmonics = np.arange(1, self.config.n_harmonics + 1)
+        centers = np.outer(self.config.frequencies, harmonics)
+        return np.stack((centers, centers - offset, centers + offset), axis=2)
+
+    # Start a new trial
+    def reset(self, n_channels, s_rate):
+        self.s_rate = s_rate
+        self.window = int(self.config.streaming_window * s_rate)
+        self.interval = max(1, int(self.config.streaming_interval * s_rate / 1000.0))
+        self.samples_since_update = 0
+        self.dft = SlidingDft(self.tracked_frequencies().ravel(), s_rate, self.window)
+        self.dft.reset(n_channels)
+
+    # Process a new chunk of data
+    # recent - the latest min(all samples, window + n_new) samples of the trial
+    def update(self, recent, n_new):
+        self.dft.update(recent, n_new)
+        self.samples_since_update += n_new
+
+        if self.samples_since_update >= self.interval:
+            self.samples_since_update = 0
+            predicted_class, result, confidence = self.estimate()
+            self.set_stream_results.emit(self.dft.n / float(self.s_rate), predicted_class, result, confidence)
+
+    # Current class estimate
+    # Returns predicted class, normalized scores of all classes
+    # and confidence (share of the winning score in all scores)
+    def estimate(self):
+        power = self.dft.power().reshape(self.tracked_frequencies().shape)
+        target_power = np.sum(power[:, :, 0], axis=1)
+        neighbor_power = np.sum(np.mean(power[:, :, 1:], axis=2), axis=1)
+
+        result = np.zeros(len(self.config.frequencies))
+        np.divide(target_power, neighbor_power, out=result, where=neighbor_power != 0)
+        if max(result) != 0:
+            result = result / max(result)
+            confidence = 1.0 / np.sum(result)
+        else:
+            confidence = 0.0
+
+        predicted_class = int(np.argmax(result) + 1)
+        return predicted_class, result, float(confidence)
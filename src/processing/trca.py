@@ -0,0 +1,113 @@
+import numpy as np
+import scipy.linalg
+
+
+# Task-related component analysis (TRCA) classifier
+# learned from labelled calibration trials
+# For each target, the spatial filter maximizing the covariance
+# between its trials (relative to their variance) is found;
+# the averaged trials (templates) are projected by all filters
+# (ensemble TRCA) once after the calibration, so the on-line
+# classification is only a projection of the trial and
+# correlations with the precomputed templates.
+# On-line BASIL SSVEP BCI
+
+
+# Spatial filter (channels) of one target
+# trials - trials x channels x samples (centered)
+def trca_filter(trials):
+    if trials.shape[0] < 2:
+        raise ValueError('At least two trials per target are required')
+    summed = np.sum(trials, axis=0)
+    # covariance of all trial pairs (i != j) and of the concatenated trials
+    inter = np.dot(summed, summed.T) - np.einsum('ics,ids->cd', trials, trials)
+    concatenated = np.concatenate(list(trials), axis=1)
+    variance = np.dot(concatenated, concatenated.T)
+    variance += 1e-9 * np.trace(variance) / variance.shape[0] * np.eye(variance.shape[0])
+    eigenvalues, eigenvectors = scipy.linalg.eigh(inter, variance)
+    return eigenvectors[:, -1]
+
+
+# Ensemble TRCA model
+# filters - channels x targets
+# templates - targets x targets (filters) x samples, projected averaged trials
+class TrcaModel:
+
+    def __init__(self, filters, templates, s_rate, frequencies):
+        self.filters = filters
+        self.templates = templates
+        self.s_rate = s_rate
+        self.frequencies = list(frequencies)
+
+    # Learn the model from labelled trials
+    # trials - list of channels x samples arrays (cut to the shortest one)
+    # labels - target index of each trial (0 .. n_targets - 1)
+    @staticmethod
+    def fit(trials, labels, s_rate, frequencies):
+        n_samples = min(np.shape(trial)[1] for trial in trials)
+        data = np.array([np.asarray(trial, dtype=np.float64)[:, :n_samples] for trial in trials])
+        data -= np.mean(data, axis=2, keepdims=True)
+        labels = np.asarray(labels)
+
+        filters = np.array([trca_filter(data[labels == target]) for target in range(len(frequencies))]).T
+        averages = np.array([np.mean(data[labels == target], axis=0) for target in range(len(frequencies))])
+        templates = np.matmul(filters.T, averages)
+        return TrcaModel(filters, templates, s_rate, frequencies)
+
+    # True if the model can classify the trial
+    # (same number of channels, sampling rate and targets)
+    def matches(self, eeg_data, s_rate, frequencies):
+        return np.shape(eeg_data)[0] == self.filters.shape[0] and s_rate == self.s_rate and \
+            list(frequencies) == self.frequencies
+
+    # Correlations of the trial with all templates (targets)
+    # eeg_data - channels x samples; longer trials are cut to the template length,
+    # shorter ones are compared with the beginning of the templates
+    def classify(self, eeg_data):
+        n_samples = min(np.shape(eeg_data)[1], self.templates.shape[2])
+        projected = np.dot(self.filters.T, np.asarray(eeg_data, dtype=np.float64)[:, :n_samples])
+        projected = projected - np.mean(projected, axis=1, keepdims=True)
+        templates = self.templates[:, :, :n_samples]
+        templates = templates - np.mean(templates, axis=2, keepdims=True)
+
+        products = np.einsum('ts,kts->k', projected, templates)
+        norms = np.sqrt(np.sum(projected ** 2) * np.sum(templates ** 2, axis=(1, 2)))
+        return products / np.maximum(norms, np.finfo(float).tiny)
+
+    def save(self, path):
+        np.savez(path, filters=self.filters, templates=self.templates, s_rate=self.s_rate,
+                 frequencies=self.frequencies)
+
+    @staticmethod
+    def load(path):
+        with np.load(path) as content:
+            return TrcaModel(content['filters'], content['templates'], float(content['s_rate']),
+                             content['frequencies'].tolist())
+
+
+# Labelled trials collected during the calibration
+class TrcaCalibration:
+
+    def __init__(self, frequencies, per_target):
+        if per_target < 2:
+            raise ValueError('TRCA calibration requires at least two trials per target (trca_calibration_trials = %s)'
+                             % per_target)
+        self.frequencies = list(frequencies)
+        self.per_target = per_target
+        self.trials = []
+        self.labels = []
+
+    def add(self, eeg_data, label):
+        self.trials.append(np.array(eeg_data, dtype=np.float32))
+        self.labels.append(label)
+
+    # Number of trials still missing for each target
+    def missing(self):
+        counts = np.bincount(np.array(self.labels, dtype=int), minlength=len(self.frequencies))
+        return np.maximum(self.per_target - counts[:len(self.frequencies)], 0)
+
+    def ready(self):
+        return not np.any(self.missing())
+
+    def fit(self, s_rate):
+        return TrcaModel.fit(self.trials, self.labels, s_rate, self.frequencies)
@@ -0,0 +1,86 @@
+import queue
+import time
+from collections import namedtuple
+from src.engine.signal import Signal
+from src.engine.thread import Thread
+import src.data.config as config
+
+
+# One trial to be classified
+# trial_id - sequential number of the trial
+# eeg_data - channels x samples (owned by the job)
+# s_rate - sampling rate
+# start_timestamp, stop_timestamp - LSL timestamps of the start / stop markers
+# received - time.perf_counter() when the stop marker was handled
+# artifacts - True for samples contaminated by artifacts (None = no artifacts)
+TrialJob = namedtuple('TrialJob', ['trial_id', 'eeg_data', 's_rate', 'start_timestamp', 'stop_timestamp',
+                                   'received', 'artifacts'], defaults=(None,))
+
+
+# Classifies trials in a separate thread, so that marker
+# reception is never blocked by processing
+# Jobs wait in a bounded queue; when it is full, the configured
+# policy decides whether to block the caller, drop the oldest
+# queued job or drop the new one. Replayed sessions are never
+# time-critical, their jobs are always queued without dropping.
+# On-line BASIL SSVEP BCI
+class ProcessingWorker(Thread):
+
+    def __init__(self, eeg_processor, settings=None):
+        super(ProcessingWorker, self).__init__()
+        self.config = settings if settings is not None else config
+        # status message (str), classified job (TrialJob, latency [ms]), dropped job (TrialJob)
+        self.add_status_signal = Signal()
+        self.job_done = Signal()
+        self.job_dropped = Signal()
+        self.eeg_processor = eeg_processor
+        self.jobs = queue.Queue(maxsize=self.config.processing_queue_size)
+        self.running = False
+
+    # Enqueue a job, returns False if a job has been dropped
+    def submit(self, job):
+        if self.config.replay_session:
+            self.jobs.put(job)
+            return True
+
+        policy = self.config.processing_queue_policy
+        try:
+            if policy == 'block':
+                self.jobs.put(job, timeout=self.config.processing_block_timeout)
+            else:
+                self.jobs.put_nowait(job)
+            return True
+        except queue.Full:
+            pass
+
+        if policy == 'drop_oldest':
+            try:
+                dropped = self.jobs.get_nowait()
+            except queue.Empty:
+                dropped = None
+            self.jobs.put_nowait(job)
+        else:
+            dropped = job
+
+        if dropped is not None:
+            self.job_dropped.emit(dropped)
+            self.add_status_signal.emit('Processing queue full, trial %d dropped.' % dropped.trial_id)
+        return False
+
+    def run(self):
+        self.running = True
+        # remaining jobs are finished before stopping
+        while self.running or not self.jobs.empty():
+            try:
+                job = self.jobs.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+            self.add_status_signal.emit('Processing received data package..')
+            self.eeg_processor.process(job.eeg_data, job.s_rate, job.trial_id, job.artifacts)
+            latency = 1000 * (time.perf_counter() - job.received)
+            self.add_status_signal.emit('Processing took %.1f ms' % latency)
+            self.job_done.emit(job, latency)
+
+    def stop(self):
+        self.running = False
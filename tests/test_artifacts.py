@@ -0,0 +1,33 @@
+import numpy as np
+import src.data.config as config
+from src.processing.artifacts import ArtifactDetector
+
+
+# A spike contaminates only its own segment, also when the chunks
+# do not align with the segments
+def test_spike_mask(monkeypatch):
+    monkeypatch.setattr(config, 'artifact_segment', 0.25)
+    monkeypatch.setattr(config, 'artifact_threshold', 150)
+    monkeypatch.setattr(config, 'artifact_channels', None)
+    s_rate = 200
+    data = np.random.RandomState(0).randn(2 * s_rate, 4) * 5
+    data[120:125] += 400
+    timestamps = np.arange(data.shape[0]) / float(s_rate)
+
+    detector = ArtifactDetector(4, s_rate)
+    for first in range(0, data.shape[0], 33):
+        detector.process(data[first:first + 33], timestamps[first:first + 33])
+
+    mask = detector.mask(timestamps)
+    assert np.array_equal(np.flatnonzero(mask), np.arange(100, 150))
+
+
+# Clean data give no mask
+def test_clean_data(monkeypatch):
+    monkeypatch.setattr(config, 'artifact_threshold', 150)
+    monkeypatch.setattr(config, 'artifact_channels', None)
+    data = np.random.RandomState(0).randn(400, 4) * 5
+    timestamps = np.arange(400) / 200.0
+    detector = ArtifactDetector(4, 200)
+    detector.process(data, timestamps)
+    assert detector.mask(timestamps) is None
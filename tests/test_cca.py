@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+import src.processing.cca as cca
+
+
+# Noisy SSVEP trial (channels x samples) and sin / cos references
+# (targets x 2 * harmonics x samples)
+def make_data(n_channels=8, s_rate=250, length=2, frequencies=(10, 12, 15), n_harmonics=2, seed=0):
+    rng = np.random.RandomState(seed)
+    t = np.arange(int(length * s_rate)) / float(s_rate)
+    eeg_data = rng.randn(n_channels, t.size) + 0.3 * np.sin(2 * np.pi * frequencies[0] * t)
+    references = [[function(2 * np.pi * harmonic * frequency * t) for harmonic in range(1, n_harmonics + 1)
+                   for function in (np.sin, np.cos)] for frequency in frequencies]
+    return eeg_data, np.array(references)
+
+
+# The largest canonical correlation equals the former sklearn CCA fit
+def test_matches_sklearn():
+    cross_decomposition = pytest.importorskip('sklearn.cross_decomposition')
+    eeg_data, references = make_data()
+    expected = []
+    for reference in references:
+        model = cross_decomposition.CCA(1, max_iter=5000, tol=1e-10)
+        x_scores, y_scores = model.fit(eeg_data.T, reference.T).transform(eeg_data.T, reference.T)
+        expected.append(np.corrcoef(x_scores[:, 0], y_scores[:, 0])[0, 1])
+
+    corr = cca.cca(eeg_data, references)[:, 0]
+    assert np.allclose(corr, expected, atol=1e-4)
+    assert np.argmax(corr) == 0
+
+
+# Stacked data sets give the same correlations as one by one
+def test_stacked_equals_single():
+    eeg_data, references = make_data()
+    stacked = np.stack([eeg_data, 2 * eeg_data[::-1], eeg_data + 1])
+    bases = cca.reference_bases(references)
+    corr = cca.stacked_canonical_correlations(stacked, bases, 2)
+    for data, data_corr in zip(stacked, corr):
+        assert np.allclose(data_corr, cca.cca(data, references, 2))
+
+
+# Rank-deficient EEG (e.g. after re-referencing) is handled
+def test_rank_deficient():
+    eeg_data, references = make_data()
+    eeg_data = eeg_data - np.mean(eeg_data, axis=0)
+    corr = cca.cca(eeg_data, references, 2)
+    assert np.all(np.isfinite(corr)) and np.all((corr >= 0) & (corr <= 1))
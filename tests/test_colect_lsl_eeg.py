@@ -0,0 +1,83 @@
+import numpy as np
+import src.data.config as config
+from src.data.colect_lsl_eeg import ClockOffsets, CollectLslEeg
+from src.data.ring_buffer import RingBuffer
+from src.processing.artifacts import ArtifactDetector
+from src.processing.streaming import StreamingClassifier
+
+
+# Chunks of s_rate / 10 samples with timestamps from the given time [s]
+def chunks(start, n_chunks, n_channels=8, s_rate=250):
+    chunk_size = s_rate // 10
+    for i in range(n_chunks):
+        timestamps = start + (np.arange(chunk_size) + i * chunk_size) / float(s_rate)
+        samples = np.random.randn(chunk_size, n_channels).astype(np.float32)
+        yield samples, timestamps
+
+
+# Collector cutting epochs by timestamps with the running classification
+# and the artifact detection on
+def collector(n_channels=8, s_rate=250):
+    eeg_collector = CollectLslEeg()
+    eeg_collector.s_rate = s_rate
+    eeg_collector.ring_buffer = RingBuffer(n_channels, 60 * s_rate)
+    eeg_collector.stream_classifier = StreamingClassifier()
+    eeg_collector.artifact_detector = ArtifactDetector(n_channels, s_rate, config)
+    return eeg_collector
+
+
+# Samples received before the first start marker are only buffered
+# (regression: the running classification was updated before its reset)
+def test_chunks_before_first_start_marker():
+    eeg_collector = collector()
+    estimates = []
+    eeg_collector.stream_classifier.set_stream_results.connect(lambda *args: estimates.append(args))
+
+    for samples, timestamps in chunks(0, 20):
+        eeg_collector.append_continuous(samples, timestamps, 8)
+    assert eeg_collector.stream_classifier.dft is None
+    assert estimates == []
+
+    eeg_collector.start_trial(2.0)
+    for samples, timestamps in chunks(2.0, 20):
+        eeg_collector.append_continuous(samples, timestamps, 8)
+    assert len(estimates) > 0
+
+    eeg_data, timestamps = eeg_collector.get_epoch(2.0, 3.0)
+    assert eeg_data.shape == (8, 250)
+    assert timestamps[0] == 2.0
+
+
+# The stop marker waits for the samples up to its timestamp
+def test_wait_for_samples():
+    eeg_collector = collector()
+    eeg_collector.running = True
+    for samples, timestamps in chunks(0, 10):
+        eeg_collector.append_continuous(samples, timestamps, 8)
+    assert eeg_collector.wait_for_samples(0.5, 0.01)
+    assert not eeg_collector.wait_for_samples(5.0, 0.01)
+
+
+# Inlet with the given clock offset (None = no estimate yet)
+class Inlet:
+
+    def __init__(self, offset):
+        self.offset = offset
+
+    def time_correction(self, timeout=None):
+        if self.offset is None:
+            raise TimeoutError()
+        return self.offset
+
+
+# Marker timestamps are converted into the EEG clock only
+# once both streams have an offset estimate
+def test_clock_offsets():
+    clock_offsets = ClockOffsets()
+    clock_offsets.update('markers', Inlet(0.5))
+    clock_offsets.update('eeg', Inlet(None))
+    assert clock_offsets.marker_to_eeg(10.0) == 10.0
+
+    clock_offsets.updated.clear()
+    clock_offsets.update('eeg', Inlet(0.2))
+    assert clock_offsets.marker_to_eeg(10.0) == 10.0 + 0.5 - 0.2
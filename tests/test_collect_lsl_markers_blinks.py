@@ -0,0 +1,51 @@
+import numpy as np
+import src.data.collect_lsl_markers_blinks as collect_lsl_markers_blinks
+from src.data.colect_lsl_eeg import CollectLslEeg
+from src.data.ring_buffer import RingBuffer
+
+S_RATE = 250
+
+
+# Marker inlet returning the given markers, then stopping the collector
+class MarkerInlet:
+
+    def __init__(self, markers, collector):
+        self.markers = list(markers)
+        self.collector = collector
+
+    def pull_sample(self, timeout=None):
+        marker, timestamp = self.markers.pop(0)
+        if not self.markers:
+            self.collector.running = False
+        return [marker], timestamp
+
+
+class Processor:
+
+    def __init__(self):
+        self.trials = []
+
+    def process(self, eeg_data, s_rate, marker):
+        self.trials.append((marker[0], eeg_data.shape[1]))
+
+
+# Every trial holds the data since the previous marker only
+# (the buffer of the EEG collector keeps all samples)
+def test_trials_between_markers(monkeypatch):
+    eeg_collector = CollectLslEeg()
+    eeg_collector.s_rate = S_RATE
+    eeg_collector.running = True
+    eeg_collector.ring_buffer = RingBuffer(4, 60 * S_RATE)
+    for first in range(0, 10 * S_RATE, 25):
+        timestamps = (first + np.arange(25)) / float(S_RATE)
+        eeg_collector.append_continuous(np.zeros((25, 4), dtype=np.float32), timestamps, 4)
+    monkeypatch.setattr(eeg_collector, 'cuts_epochs', lambda: True)
+
+    processor = Processor()
+    collector = collect_lsl_markers_blinks.CollectLslMarkersBlinks(eeg_collector, processor)
+    inlet = MarkerInlet([('a', 1.0), ('b', 3.0), ('c', 6.0), ('end', 7.0)], collector)
+    monkeypatch.setattr(collect_lsl_markers_blinks, 'resolve_stream', lambda *args: [None])
+    monkeypatch.setattr(collect_lsl_markers_blinks, 'StreamInlet', lambda info: inlet)
+    collector.run()
+
+    assert processor.trials == [('a', 2 * S_RATE), ('b', 3 * S_RATE), ('c', S_RATE)]
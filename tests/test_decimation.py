@@ -0,0 +1,40 @@
+import numpy as np
+import src.data.config as config
+from src.processing.decimation import StreamDecimator, decimation_factor, design_filter
+
+
+# Decimating chunk by chunk equals scipy.signal.decimate with the same FIR filter
+# (zero initial conditions: the signal starts at zero)
+def test_matches_scipy_decimate():
+    from scipy.signal import decimate, dlti
+    factor = 4
+    data = np.random.RandomState(0).randn(1000, 3)
+    data[0] = 0
+    timestamps = np.arange(1000) / 1000.0
+
+    decimator = StreamDecimator(3, factor)
+    pieces = [decimator.process(data[first:first + 37], timestamps[first:first + 37])
+              for first in range(0, 1000, 37)]
+    decimated = np.vstack([piece[0] for piece in pieces])
+    kept_timestamps = np.concatenate([piece[1] for piece in pieces])
+
+    taps = design_filter(factor)
+    expected = decimate(data, factor, ftype=dlti(taps, np.r_[1, np.zeros(taps.size - 1)]), zero_phase=False,
+                        axis=0)
+    assert np.allclose(decimated, expected, atol=1e-4)
+    assert np.array_equal(kept_timestamps, timestamps[::factor])
+
+
+# The automatic factor keeps the classification band and divides the sampling rate
+def test_automatic_factor(monkeypatch):
+    monkeypatch.setattr(config, 'decimation_factor', 0)
+    monkeypatch.setattr(config, 'preprocess_bandpass', None)
+    monkeypatch.setattr(config, 'weights_classifier', dict(config.weights_classifier, fbcca=0))
+    monkeypatch.setattr(config, 'frequencies', [10, 12, 15])
+    monkeypatch.setattr(config, 'n_harmonics', 2)
+    factor = decimation_factor(1000)
+    assert factor > 1 and 1000 % factor == 0
+    assert config.decimation_passband * 1000.0 / factor / 2 >= 2 * 15
+
+    monkeypatch.setattr(config, 'decimation_factor', 1)
+    assert decimation_factor(1000) == 1
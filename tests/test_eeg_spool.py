@@ -0,0 +1,39 @@
+import numpy as np
+from src.data.eeg_spool import EegSpool, load_spool
+
+
+def chunk(first, n_samples, n_channels=3):
+    samples = np.arange(first, first + n_samples, dtype=np.float32)
+    return np.tile(samples[:, np.newaxis], (1, n_channels)), samples.astype(np.float64)
+
+
+# All samples of a session are kept in the file across trials and remapping
+def test_spool_keeps_all_samples(tmp_path):
+    path = str(tmp_path / 'eeg')
+    spool = EegSpool(path, 3, 250, block_size=8)
+    first = 0
+    for n_samples in [5, 7, 20, 3]:
+        spool.append(*chunk(first, n_samples))
+        first += n_samples
+    assert np.array_equal(spool.view()[0], np.arange(first))
+
+    trial = spool.view()
+    spool.clear()
+    spool.append(*chunk(first, 10))
+    assert len(spool) == 10 and np.array_equal(spool.timestamps_view(), np.arange(first, first + 10))
+    # views of the previous trial stay valid
+    assert np.array_equal(trial[1], np.arange(first))
+    spool.close()
+
+    data, timestamps, s_rate = load_spool(path)
+    assert data.shape == (3, first + 10) and s_rate == 250
+    assert np.array_equal(data[2], np.arange(first + 10)) and np.array_equal(timestamps, np.arange(first + 10))
+
+
+def test_empty_spool(tmp_path):
+    path = str(tmp_path / 'eeg')
+    spool = EegSpool(path, 3, 250, block_size=8)
+    assert spool.view().shape == (3, 0)
+    spool.close()
+    data, timestamps, s_rate = load_spool(path)
+    assert data.shape == (3, 0) and timestamps.size == 0
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+from src.data.eeg_spool import EegSpool
+from src.data.ring_buffer import RingBuffer
+
+
+@pytest.fixture(params=['ring_buffer', 'spool'])
+def buffer(request, tmp_path):
+    if request.param == 'ring_buffer':
+        yield RingBuffer(2, 50)
+    else:
+        spool = EegSpool(str(tmp_path / 'eeg'), 2, 10, block_size=16)
+        yield spool
+        spool.close()
+
+
+# 80 samples at 10 Hz (timestamp = sample / 10, data = timestamp), in chunks of 7
+def fill(buffer):
+    for first in range(0, 80, 7):
+        timestamps = np.arange(first, min(first + 7, 80)) / 10.0
+        buffer.append(np.tile(timestamps[:, np.newaxis], (1, 2)).astype(np.float32), timestamps)
+
+
+# Epochs hold exactly the samples with first <= timestamp < last
+def test_epoch_boundaries(buffer):
+    fill(buffer)
+    data, timestamps = buffer.epoch(5.0, 6.0)
+    assert data.shape == (2, 10)
+    assert np.allclose(timestamps, np.arange(50, 60) / 10.0)
+    assert np.allclose(data[1], timestamps)
+
+    data, timestamps = buffer.epoch(5.05, 5.25)
+    assert np.allclose(timestamps, [5.1, 5.2])
+    data, timestamps = buffer.epoch(9.0, 10.0)
+    assert data.shape == (2, 0)
+
+
+# Releasing drops the samples before the timestamp only
+def test_release(buffer):
+    fill(buffer)
+    buffer.release(7.0)
+    assert len(buffer) == 10
+    assert np.allclose(buffer.timestamps_view(), np.arange(70, 80) / 10.0)
+    data, timestamps = buffer.epoch(6.0, 7.5)
+    assert np.allclose(timestamps, np.arange(70, 75) / 10.0)
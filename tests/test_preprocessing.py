@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+import src.data.config as config
+from src.processing.preprocessing import StreamPreprocessor, design_filters
+
+
+# Filtering chunk by chunk equals filtering the whole signal at once
+# (from the steady state for the first sample)
+def test_chunks_equal_whole_signal(monkeypatch):
+    from scipy.signal import sosfilt, sosfilt_zi
+    monkeypatch.setattr(config, 'preprocess_bandpass', (5, 40))
+    monkeypatch.setattr(config, 'preprocess_notch', 50)
+    monkeypatch.setattr(config, 'preprocess_car', False)
+    data = np.random.RandomState(0).randn(1000, 4)
+
+    preprocessor = StreamPreprocessor(4, 250)
+    filtered = np.vstack([preprocessor.process(data[first:first + 37]) for first in range(0, 1000, 37)])
+    sos = design_filters(250)
+    expected, state = sosfilt(sos, data, axis=0, zi=sosfilt_zi(sos)[:, :, np.newaxis] * data[0])
+    assert np.allclose(filtered, expected, atol=1e-4)
+
+
+# Common average reference: the channels sum to zero
+def test_common_average_reference(monkeypatch):
+    monkeypatch.setattr(config, 'preprocess_bandpass', None)
+    monkeypatch.setattr(config, 'preprocess_notch', None)
+    monkeypatch.setattr(config, 'preprocess_car', True)
+    filtered = StreamPreprocessor(4, 250).process(np.random.RandomState(0).randn(100, 4))
+    assert np.allclose(np.sum(filtered, axis=1), 0, atol=1e-5)
+
+
+# A filter above the Nyquist frequency (e.g. after decimation) is an error, not skipped
+def test_filter_above_nyquist(monkeypatch):
+    monkeypatch.setattr(config, 'preprocess_bandpass', None)
+    monkeypatch.setattr(config, 'preprocess_notch', 50)
+    with pytest.raises(ValueError):
+        design_filters(100)
+    monkeypatch.setattr(config, 'preprocess_notch', None)
+    monkeypatch.setattr(config, 'preprocess_bandpass', (5, 60))
+    with pytest.raises(ValueError):
+        design_filters(100)
@@ -0,0 +1,31 @@
+import numpy as np
+from src.processing.references import ReferenceCache, make_reference_signals
+
+
+def test_reference_signals():
+    signals = make_reference_signals(250, 250.0, 10, 3)
+    t = np.arange(250) / 250.0
+    assert signals.shape == (6, 250)
+    assert np.allclose(signals[4], np.sin(2 * np.pi * 30 * t))
+    assert np.allclose(signals[5], np.cos(2 * np.pi * 30 * t))
+
+
+# Templates are generated once per key, the least recently used are evicted
+def test_cache_reuse_and_eviction():
+    cache = ReferenceCache(2)
+    first = cache.get(500, 250, 10, 2)
+    assert cache.get(500, 250.0, 10.0, 2) is first
+    cache.get(500, 250, 12, 2)
+    cache.get(500, 250, 10, 2)
+    cache.get(500, 250, 15, 2)
+    assert len(cache.entries) == 2
+    assert (500, 250.0, 12.0, 2) not in cache.entries
+    assert cache.get(500, 250, 10, 2) is first
+
+
+# The bases are orthonormal and span the reference signals
+def test_bases_orthonormal():
+    bases = ReferenceCache(8).get_bases(500, 250, [10, 12, 15], 2)
+    assert bases.shape == (3, 500, 4)
+    for basis in bases:
+        assert np.allclose(np.dot(basis.T, basis), np.eye(4), atol=1e-10)
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+import src.data.config as config
+from src.data.results_log import ResultsLogger, load_results
+
+
+def log_trials(path, trial_ids):
+    logger = ResultsLogger(path, methods=['cca', 'fbcca'], n_targets=3)
+    for trial_id in trial_ids:
+        logger.log({'trial_id': trial_id, 'cca': [0.1, 0.5, 0.2], 'result': [0.2, 1, 0.4], 'predicted_class': 2,
+                    'confidence': 0.6, 'total_ms': 12.5, 'unknown': 'ignored'})
+    logger.close()
+
+
+# Records are read back by column; missing values are empty (NaN for timestamps and latencies)
+def test_round_trip(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, 'results_batch_size', 2)
+    path = str(tmp_path / 'results.bres')
+    log_trials(path, [1, 2, 3])
+    results = load_results(path)
+
+    assert list(results['trial_id']) == [1, 2, 3]
+    assert np.allclose(results['cca'][0], [0.1, 0.5, 0.2]) and np.all(results['fbcca'] == 0)
+    assert np.all(results['predicted_class'] == 2) and np.allclose(results['total_ms'], 12.5)
+    assert np.all(np.isnan(results['start_timestamp'])) and np.all(np.isnan(results['cca_ms']))
+
+
+# Logs with the same columns are merged, others are rejected
+def test_merge(tmp_path):
+    log_trials(str(tmp_path / 'a.bres'), [1, 2])
+    log_trials(str(tmp_path / 'b.bres'), [3])
+    assert list(load_results(str(tmp_path / '*.bres'))['trial_id']) == [1, 2, 3]
+
+    other = ResultsLogger(str(tmp_path / 'c.bres'), methods=['cca'], n_targets=3)
+    other.close()
+    with pytest.raises(ValueError):
+        load_results(str(tmp_path / '*.bres'))
@@ -0,0 +1,40 @@
+import numpy as np
+from src.data.ring_buffer import RingBuffer
+
+
+# Samples x channels chunk holding the sample numbers
+def chunk(first, n_samples, n_channels=3):
+    samples = np.arange(first, first + n_samples, dtype=np.float32)
+    return np.tile(samples[:, np.newaxis], (1, n_channels)), samples.astype(np.float64)
+
+
+# The latest samples stay one view (no copy) in order after wrapping around
+def test_wrap_around_stays_contiguous():
+    ring_buffer = RingBuffer(3, 10)
+    first = 0
+    for n_samples in [4, 7, 3, 9, 5]:
+        samples, timestamps = chunk(first, n_samples)
+        ring_buffer.append(samples, timestamps)
+        first += n_samples
+
+        view = ring_buffer.view()
+        expected = np.arange(max(0, first - 10), first)
+        assert np.shares_memory(view, ring_buffer.data)
+        assert np.array_equal(view, np.tile(expected, (3, 1)))
+        assert np.array_equal(ring_buffer.timestamps_view(), expected)
+        assert np.array_equal(ring_buffer.view(2)[0], expected[-2:])
+
+
+# A chunk longer than the buffer keeps its latest samples
+def test_chunk_longer_than_capacity():
+    ring_buffer = RingBuffer(3, 10)
+    ring_buffer.append(*chunk(0, 25))
+    assert len(ring_buffer) == 10
+    assert np.array_equal(ring_buffer.timestamps_view(), np.arange(15, 25))
+
+
+def test_clear():
+    ring_buffer = RingBuffer(3, 10)
+    ring_buffer.append(*chunk(0, 5))
+    ring_buffer.clear()
+    assert len(ring_buffer) == 0 and ring_buffer.view().shape == (3, 0)
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+from src.data.session import EEG_CHUNK, MARKER, SessionRecorder, SessionReplay, read_session
+
+
+def record(path):
+    rng = np.random.RandomState(0)
+    chunks = [(rng.randn(n_samples, 3).astype(np.float32), 100 + np.arange(first, first + n_samples) / 250.0)
+              for first, n_samples in [(0, 10), (10, 25), (35, 1)]]
+    recorder = SessionRecorder(path)
+    recorder.write_stream_info(3, 250.0)
+    recorder.write_chunk(*chunks[0])
+    recorder.write_marker('S  1', 100.01)
+    recorder.write_chunk(*chunks[1])
+    recorder.write_marker('S  2', 100.1)
+    recorder.write_chunk(*chunks[2])
+    recorder.close()
+    return chunks
+
+
+# Stream info, chunks and markers are read back unchanged and in order
+def test_write_read_round_trip(tmp_path):
+    path = str(tmp_path / 'session.bssn')
+    chunks = record(path)
+    n_channels, s_rate, events = read_session(path)
+    assert (n_channels, s_rate) == (3, 250.0)
+    assert [event[0] for event in events] == [EEG_CHUNK, MARKER, EEG_CHUNK, MARKER, EEG_CHUNK]
+
+    read_chunks = [event[2] for event in events if event[0] == EEG_CHUNK]
+    for (samples, timestamps), (read_samples, read_timestamps) in zip(chunks, read_chunks):
+        assert np.array_equal(samples, read_samples) and np.array_equal(timestamps, read_timestamps)
+    assert [event[1:] for event in events if event[0] == MARKER] == [(100.01, 'S  1'), (100.1, 'S  2')]
+
+
+def test_not_a_session(tmp_path):
+    path = tmp_path / 'other.bin'
+    path.write_bytes(b'not a session')
+    with pytest.raises(ValueError):
+        read_session(str(path))
+
+
+# The replay inlets deliver the samples and markers in the recorded order
+# (long chunks are split by max_samples)
+def test_replay_inlets(tmp_path):
+    path = str(tmp_path / 'session.bssn')
+    chunks = record(path)
+    replay = SessionReplay(path, speed=0, hold_markers=False)
+    eeg_inlet, marker_inlet = replay.eeg_inlet(), replay.marker_inlet()
+    assert eeg_inlet.info().nominal_srate() == 250.0 and eeg_inlet.info().channel_count() == 3
+
+    samples, timestamps = eeg_inlet.pull_chunk(timeout=0.1)
+    assert np.array_equal(samples, chunks[0][0]) and np.array_equal(timestamps, chunks[0][1])
+    assert marker_inlet.pull_sample(timeout=0.1) == (['S  1'], 100.01)
+    assert marker_inlet.pull_sample(timeout=0.1) == (None, None)
+
+    first, first_timestamps = eeg_inlet.pull_chunk(timeout=0.1, max_samples=20)
+    rest, rest_timestamps = eeg_inlet.pull_chunk(timeout=0.1, max_samples=20)
+    assert np.array_equal(np.vstack((first, rest)), chunks[1][0])
+    assert (len(first_timestamps), len(rest_timestamps)) == (20, 5)
+    assert marker_inlet.pull_sample(timeout=0.1) == (['S  2'], 100.1)
+
+    destination = np.zeros((8, 3), dtype=np.float32)
+    samples, timestamps = eeg_inlet.pull_chunk(timeout=0.1, dest_obj=destination)
+    assert samples is None and np.array_equal(destination[:1], chunks[2][0])
+    assert eeg_inlet.pull_chunk(timeout=0.1) == ([], [])
@@ -0,0 +1,68 @@
+import numpy as np
+import src.data.config as config
+import src.data.results_log as results_log
+from src.data.session import SessionRecorder
+from src.data.synthetic_source import SyntheticEeg, make_script
+from src.engine.engine import Engine
+
+S_RATE = 250
+N_CHANNELS = 8
+LABELS = [0, 1, 2, 0, 1, 2]
+
+
+# Records a synthetic session (markers are written after the chunk
+# containing their sample, like on-line)
+def record_session(path, chunk_size=25):
+    generator = SyntheticEeg(N_CHANNELS, S_RATE, config.frequencies, noise='white', seed=1)
+    segments, markers = make_script(LABELS, 3, 0.5, S_RATE)
+    targets = np.full(segments[-1][1], -1)
+    for first, last, target in segments:
+        if target is not None:
+            targets[first:last] = target
+
+    recorder = SessionRecorder(path)
+    recorder.write_stream_info(N_CHANNELS, S_RATE)
+    next_marker = 0
+    for first in range(0, targets.size, chunk_size):
+        # (trials start at chunk boundaries)
+        target = targets[first]
+        recorder.write_chunk(generator.chunk(chunk_size, None if target < 0 else target),
+                             (first + np.arange(chunk_size)) / float(S_RATE))
+        while next_marker < len(markers) and markers[next_marker][0] < first + chunk_size:
+            sample, marker = markers[next_marker]
+            recorder.write_marker(marker, sample / float(S_RATE))
+            next_marker += 1
+    recorder.close()
+
+
+def replay(results_directory):
+    engine = Engine()
+    engine.run()
+    engine.close_logs()
+    return results_log.load_results(str(results_directory / '*.bres'))
+
+
+# A replay at full speed keeps every trial, even with slow methods
+# and a queue that would drop trials of live input
+def test_replay_keeps_all_trials(tmp_path, monkeypatch):
+    path = str(tmp_path / 'session.bssn')
+    record_session(path)
+    weights = dict(config.weights_classifier, fbcca=0.5)
+    monkeypatch.setattr(config, 'weights_classifier', weights)
+    monkeypatch.setattr(config, 'replay_session', path)
+    monkeypatch.setattr(config, 'replay_speed', 0)
+    monkeypatch.setattr(config, 'processing_queue_size', 1)
+    monkeypatch.setattr(config, 'processing_queue_policy', 'drop_newest')
+
+    results = []
+    for run in range(2):
+        results_directory = tmp_path / ('results_%d' % run)
+        monkeypatch.setattr(config, 'results_directory', str(results_directory))
+        results.append(replay(results_directory))
+
+    for trials in results:
+        assert list(trials['trial_id']) == list(range(1, len(LABELS) + 1))
+        assert not np.any(trials['dropped'])
+    assert list(results[0]['predicted_class']) == [label + 1 for label in LABELS]
+    # replay is deterministic
+    assert np.array_equal(results[0]['result'], results[1]['result'])
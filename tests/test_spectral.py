@@ -0,0 +1,63 @@
+import numpy as np
+import src.data.config as config
+import src.processing.spectral as spectral
+
+
+# The former per-channel power spectrum (full FFT, ordered frequencies)
+def baseline_psd(eeg_signal, s_rate):
+    ps = np.abs(np.fft.fft(eeg_signal)) ** 2
+    freqs = np.fft.fftfreq(eeg_signal.size, 1.0 / s_rate)
+    order = np.argsort(freqs)
+    return freqs[order], ps[order]
+
+
+# The former spectral scoring (loops over bins and targets)
+def baseline_scores(freqs, ps):
+    energy = np.zeros(len(config.frequencies))
+    for i in range(len(freqs)):
+        for j in range(len(config.frequencies)):
+            if abs(config.frequencies[j] - freqs[i]) < config.fq_interval:
+                energy[j] += ps[i] * ps[i]
+    return energy / max(energy)
+
+
+def eeg(n_channels=4, s_rate=250, n_samples=613, seed=0):
+    t = np.arange(n_samples) / float(s_rate)
+    return np.random.RandomState(seed).randn(n_channels, n_samples) + np.sin(2 * np.pi * 12 * t)
+
+
+# The batched rfft spectra equal the non-negative half of the former full spectra
+def test_psd_matches_full_fft(monkeypatch):
+    monkeypatch.setattr(config, 'psd_fast_length', False)
+    monkeypatch.setattr(config, 'psd_welch', False)
+    eeg_data = eeg()
+    freqs, ps = spectral.calc_psd(eeg_data, 250)
+    for channel in range(eeg_data.shape[0]):
+        full_freqs, full_ps = baseline_psd(eeg_data[channel], 250)
+        positive = full_freqs >= 0
+        assert np.allclose(freqs, full_freqs[positive])
+        assert np.allclose(ps[channel, :positive.sum()], full_ps[positive])
+
+
+# Spectral scores of the batched spectra equal the former scores
+def test_spectral_scores_match_baseline(monkeypatch):
+    monkeypatch.setattr(config, 'psd_fast_length', False)
+    monkeypatch.setattr(config, 'psd_welch', False)
+    eeg_data = eeg()
+    freqs, ps = spectral.calc_psd(eeg_data, 250)
+    interval, baseline = spectral.band_masks(freqs, 250)
+    scores = spectral.spectral_scores(ps, interval)
+    for channel in range(eeg_data.shape[0]):
+        assert np.allclose(scores[channel], baseline_scores(*baseline_psd(eeg_data[channel], 250)))
+    assert np.all(np.argmax(scores, axis=1) == 1)
+
+
+# Zero padding to a fast FFT length (longer than the signal)
+def test_fast_length(monkeypatch):
+    monkeypatch.setattr(config, 'psd_fast_length', True)
+    monkeypatch.setattr(config, 'psd_welch', False)
+    eeg_data = eeg()
+    freqs, ps = spectral.calc_psd(eeg_data, 250)
+    n_fft = spectral.fft_length(eeg_data.shape[1])
+    assert n_fft >= eeg_data.shape[1] and freqs.size == n_fft // 2 + 1
+    assert np.allclose(freqs[1] - freqs[0], 250.0 / n_fft)
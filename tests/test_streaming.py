@@ -0,0 +1,37 @@
+import numpy as np
+import src.data.config as config
+from src.processing.streaming import SlidingDft, StreamingClassifier
+
+
+# The sliding DFT equals the direct DFT of the latest window after every chunk
+def test_sliding_dft_matches_direct_dft():
+    s_rate, window, frequencies = 250, 100, [10, 12.5, 31]
+    data = np.random.RandomState(0).randn(3, 700)
+    dft = SlidingDft(frequencies, s_rate, window)
+    dft.reset(3)
+    omega = 2 * np.pi * np.array(frequencies) / s_rate
+
+    n = 0
+    for n_new in [1, 7, 50, 99, 100, 101, 13, 250, 79]:
+        n += n_new
+        dft.update(data[:, max(0, n - window - n_new):n], n_new)
+        first = max(0, n - window)
+        direct = np.dot(data[:, first:n], np.exp(-1j * np.outer(np.arange(first, n), omega)))
+        assert np.allclose(dft.power(), np.sum(np.abs(direct) ** 2, axis=0))
+
+
+# The running estimate finds the stimulation frequency
+def test_streaming_classifier_estimate():
+    s_rate = 250
+    t = np.arange(4 * s_rate) / float(s_rate)
+    data = np.random.RandomState(0).randn(4, t.size) + 2 * np.sin(2 * np.pi * config.frequencies[2] * t)
+    classifier = StreamingClassifier()
+    classifier.reset(4, s_rate)
+    estimates = []
+    classifier.set_stream_results.connect(lambda *args: estimates.append(args))
+    for n in range(25, t.size + 1, 25):
+        classifier.update(data[:, max(0, n - classifier.window - 25):n], 25)
+
+    assert len(estimates) == t.size // classifier.interval
+    elapsed, predicted_class, result, confidence = estimates[-1]
+    assert predicted_class == 3 and np.isclose(elapsed, 4)
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+from src.processing.trca import TrcaCalibration, TrcaModel
+
+
+# The TRCA filters need at least two trials per target
+def test_calibration_requires_two_trials_per_target():
+    with pytest.raises(ValueError):
+        TrcaCalibration([10, 12, 15], 1)
+
+
+# Trained on noisy trials of known frequencies, the model recognizes new trials
+def test_fit_and_classify():
+    s_rate, frequencies = 250, [10, 12, 15]
+    rng = np.random.RandomState(0)
+    t = np.arange(2 * s_rate) / float(s_rate)
+
+    def trial(target):
+        signal = np.sin(2 * np.pi * frequencies[target] * t + rng.uniform(0, 0.3))
+        return np.outer(np.linspace(0.5, 1, 4), signal) + rng.randn(4, t.size)
+
+    calibration = TrcaCalibration(frequencies, 2)
+    for target in [0, 1, 2, 0, 1, 2]:
+        calibration.add(trial(target), target)
+    assert calibration.ready()
+    model = calibration.fit(s_rate)
+    for target in range(3):
+        assert np.argmax(model.classify(trial(target))) == target
+
+
+# The model is saved and loaded unchanged
+def test_save_load(tmp_path):
+    model = TrcaModel(np.ones((4, 3)), np.zeros((3, 3, 10)), 250.0, [10, 12, 15])
+    model.save(str(tmp_path / 'model.npz'))
+    loaded = TrcaModel.load(str(tmp_path / 'model.npz'))
+    assert np.array_equal(loaded.filters, model.filters) and loaded.matches(np.zeros((4, 10)), 250, [10, 12, 15])
@@ -0,0 +1,57 @@
+import threading
+import src.data.config as config
+from src.processing.worker import ProcessingWorker, TrialJob
+
+
+# Processor blocked until released
+class BlockedProcessor:
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.processed = []
+
+    def process(self, eeg_data, s_rate, trial_id=0, artifacts=None):
+        self.release.wait(5)
+        self.processed.append(trial_id)
+
+
+def job(trial_id):
+    return TrialJob(trial_id, None, 250, 0.0, 1.0, 0.0)
+
+
+# Live input: a full queue drops the oldest job and reports it
+def test_live_queue_drops_oldest(monkeypatch):
+    monkeypatch.setattr(config, 'replay_session', None)
+    monkeypatch.setattr(config, 'processing_queue_size', 2)
+    monkeypatch.setattr(config, 'processing_queue_policy', 'drop_oldest')
+    processor = BlockedProcessor()
+    worker = ProcessingWorker(processor)
+    dropped = []
+    worker.job_dropped.connect(lambda dropped_job: dropped.append(dropped_job.trial_id))
+
+    assert worker.submit(job(1)) and worker.submit(job(2))
+    assert not worker.submit(job(3))
+    assert dropped == [1]
+
+
+# Replayed trials are queued without dropping
+def test_replay_queue_blocks(monkeypatch):
+    monkeypatch.setattr(config, 'replay_session', 'session.bssn')
+    monkeypatch.setattr(config, 'processing_queue_size', 1)
+    monkeypatch.setattr(config, 'processing_queue_policy', 'drop_newest')
+    processor = BlockedProcessor()
+    worker = ProcessingWorker(processor)
+    dropped = []
+    worker.job_dropped.connect(dropped.append)
+    worker.start()
+
+    submitter = threading.Thread(target=lambda: [worker.submit(job(trial_id)) for trial_id in range(1, 5)])
+    submitter.start()
+    submitter.join(0.2)
+    assert submitter.is_alive()
+    processor.release.set()
+    submitter.join(5)
+    worker.stop()
+    worker.wait(5)
+    assert dropped == []
+    assert processor.processed == [1, 2, 3, 4]